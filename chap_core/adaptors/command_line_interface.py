@@ -25,7 +25,7 @@ def generate_app(estimator):
             The path to save the trained model
         """
         logger.info(f"Loading data from {training_data_filename} as {dc}")
-        dataset = DataSet.from_csv(training_data_filename, dc)
+        dataset = DataSet.from_file(training_data_filename, dc)
         predictor = estimator.train(dataset)
         predictor.save(model_path)
 
@@ -43,11 +43,11 @@ def generate_app(estimator):
         future_data_filename: str
             The path to the future data file, i.e. forecasted predictors for the future
         """
-        dataset = DataSet.from_csv(historic_data_filename, dc)
+        dataset = DataSet.from_file(historic_data_filename, dc)
         future_dc = remove_field(dc, "disease_cases")
-        future_data = DataSet.from_csv(future_data_filename, future_dc)
+        future_data = DataSet.from_file(future_data_filename, future_dc)
         predictor = estimator.load_predictor(model_filename)
         forecasts = predictor.predict(dataset, future_data)
-        forecasts.to_csv(output_filename)
+        forecasts.to_file(output_filename)
 
     return app
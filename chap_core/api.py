@@ -10,6 +10,7 @@ import numpy as np
 
 from .assessment.dataset_splitting import train_test_split_with_weather
 from .datatypes import (
+    ClimateHealthData,
     HealthData,
     ClimateData,
     HealthPopulationData,
@@ -154,23 +155,28 @@ def train_on_prediction_data(
     if control is None:
         control = DummyControl()
     control.set_status("Preprocessing")
+    missing_climate = set(data.health_data.keys()) - set(data.climate_data.keys())
+    if missing_climate:
+        raise KeyError(f"Locations {missing_climate} not in climate data: {list(data.climate_data.keys())}")
     if model_name == "external":
         model = get_model_from_directory_or_github_url(model_path)
     else:
         model = get_model(model_name)()
-    start_timestamp = min(data.health_data.start_timestamp, data.climate_data.start_timestamp)
-    end_timestamp = max(data.health_data.end_timestamp, data.climate_data.end_timestamp)
-    new_dict = {}
-    for location in data.health_data.locations():
-        health = data.health_data.get_location(location).fill_to_range(start_timestamp, end_timestamp)
-        climate = data.climate_data.get_location(location).fill_to_range(start_timestamp, end_timestamp)
-        assert (
-            location in data.population_data
-        ), f"Location {location} not in population data: {data.population_data.keys()}"
-        population = data.population_data[location]
-        new_dict[location] = FullData.combine(health.data(), climate.data(), population)
-
-    climate_health_data = DataSet(new_dict)
+    joined = DataSet.join(
+        ClimateHealthData,
+        {
+            "disease_cases": (data.health_data, "disease_cases"),
+            "rainfall": (data.climate_data, "rainfall"),
+            "mean_temperature": (data.climate_data, "mean_temperature"),
+        },
+    )
+    locations = list(joined.keys())
+    missing_locations = set(locations) - set(data.population_data)
+    assert not missing_locations, f"Locations {missing_locations} not in population data: {data.population_data.keys()}"
+    population = np.array([data.population_data[location] for location in locations], dtype=float)
+    fields = {name: joined.field_array(name) for name in ("rainfall", "mean_temperature", "disease_cases")}
+    fields["population"] = np.repeat(population[:, None], len(joined.period_range), axis=1)
+    climate_health_data = DataSet.from_columns(FullData, joined.period_range, locations, fields)
     prediction_start = Month(climate_health_data.end_timestamp) - n_months * delta_month
     train_data, _, future_weather = train_test_split_with_weather(climate_health_data, prediction_start)
     logger.info(f"Training model {model_name} on {len(train_data.items())} locations")
@@ -73,30 +73,34 @@ def train_test_generator(
 ) -> tuple[DataSet, Iterable[tuple[DataSet, DataSet]]]:
     """
     Genereate a train set along with an iterator of test data that contains tuples of full data up until a
-    split point and data without target variables for the remaining steps
+    split point and data without target variables for the remaining steps.
+    The test sets are created one at a time as the iterator is consumed
     """
     split_idx = -(prediction_length + n_test_sets)
     train_set = dataset.restrict_time_period(slice(None, dataset.period_range[split_idx]))
-    historic_data = [
-        dataset.restrict_time_period(slice(None, dataset.period_range[split_idx + i])) for i in range(n_test_sets)
-    ]
-    future_data = [
-        dataset.restrict_time_period(
+    return train_set, _test_sets(dataset, prediction_length, n_test_sets, future_weather_provider)
+
+
+def _test_sets(
+    dataset: DataSet,
+    prediction_length: int,
+    n_test_sets: int,
+    future_weather_provider: FutureWeatherFetcher | None = None,
+) -> Iterable[tuple[DataSet, DataSet, DataSet]]:
+    split_idx = -(prediction_length + n_test_sets)
+    for i in range(n_test_sets):
+        historic_data = dataset.restrict_time_period(slice(None, dataset.period_range[split_idx + i]))
+        future_data = dataset.restrict_time_period(
             slice(
                 dataset.period_range[split_idx + i + 1],
                 dataset.period_range[split_idx + i + prediction_length],
             )
         )
-        for i in range(n_test_sets)
-    ]
-    if future_weather_provider is not None:
-        masked_future_data = [
-            future_weather_provider(hd).get_future_weather(fd.period_range)
-            for (hd, fd) in zip(historic_data, future_data)
-        ]
-    else:
-        masked_future_data = (dataset.remove_field("disease_cases") for dataset in future_data)
-    return train_set, zip(historic_data, masked_future_data, future_data)
+        if future_weather_provider is not None:
+            masked_future_data = future_weather_provider(historic_data).get_future_weather(future_data.period_range)
+        else:
+            masked_future_data = future_data.remove_field("disease_cases")
+        yield historic_data, masked_future_data, future_data
 
 
 def train_test_split_with_weather(
@@ -110,11 +114,11 @@ def train_test_split_with_weather(
         (loc, temporal_data.data()) for loc, temporal_data in test_set.items()
     )
     future_weather = test_set.remove_field("disease_cases")  # SpatioTemporalDict(
-    train_periods = {str(period) for data in train_set.data() for period in data.data().time_period}
-    future_periods = {str(period) for data in future_weather.data() for period in data.data().time_period}
-    assert (
-        train_periods & future_periods == set()
-    ), f"Train and future weather data overlap: {train_periods & future_periods}"
+    train_periods = DataSet._covering_period_range(data.time_period for data in train_set.values())
+    future_periods = DataSet._covering_period_range(data.time_period for data in future_weather.values())
+    assert not train_periods.overlaps(future_periods), (
+        f"Train and future weather data overlap: {train_periods.intersection(future_periods)}"
+    )
     return train_set, test_set, future_weather
 
 
@@ -1,5 +1,9 @@
-from collections import defaultdict
-from typing import Protocol, TypeVar, Iterable, Dict
+import subprocess
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Protocol, TypeVar, Iterable, Iterator, Dict
 
 from gluonts.evaluation import Evaluator
 from gluonts.model import Forecast
@@ -8,16 +12,10 @@ from matplotlib.backends.backend_pdf import PdfPages
 from sklearn.metrics import root_mean_squared_error
 import pandas as pd
 import plotly.express as px
-from chap_core.assessment.dataset_splitting import (
-    get_split_points_for_data_set,
-    split_test_train_on_period,
-    train_test_generator,
-)
-from chap_core.assessment.multi_location_evaluator import MultiLocationEvaluator
+from chap_core.assessment.dataset_splitting import train_test_generator
 from chap_core.data.gluonts_adaptor.dataset import ForecastAdaptor
 from chap_core.datatypes import TimeSeriesData, Samples
-from chap_core.predictor.naive_predictor import MultiRegionPoissonModel
-from chap_core.reports import HTMLReport, HTMLSummaryReport
+from chap_core.worker.interface import Job, Worker
 import logging
 
 from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
@@ -25,6 +23,18 @@ from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
 logger = logging.getLogger(__name__)
 
 
+class PredictionJobError(RuntimeError):
+    """A prediction job on a worker ended without finishing"""
+
+
+# The errors that skip_failed skips by default: failures at the boundary to the model, of the external
+# command, process or job running it, or a prediction timing out. Other errors are raised
+PREDICTION_ERRORS = (subprocess.SubprocessError, PredictionJobError, BrokenProcessPool, TimeoutError)
+
+# The rq JobStatus values of jobs that have ended without finishing. Deferred jobs are still waiting
+_FAILED_JOB_STATUSES = ("failed", "stopped", "canceled")
+
+
 class AssessmentReport:
     def __init__(self, rmse_dict):
         self.rmse_dict = rmse_dict
@@ -55,57 +65,6 @@ def plot_rmse(rmse_dict, do_show=True):
     return fig
 
 
-def evaluate_model(
-    data_set,
-    external_model,
-    max_splits=5,
-    start_offset=20,
-    return_table=False,
-    naive_model_cls=None,
-    callback=None,
-    mode="predict",
-    run_naive_predictor=True,
-):
-    """
-    Evaluate a model on a dataset using forecast cross validation
-    """
-    if naive_model_cls is None:
-        naive_model_cls = MultiRegionPoissonModel
-    model_name = external_model.__class__.__name__
-    naive_model_name = naive_model_cls.__name__
-    evaluator = MultiLocationEvaluator(model_names=[model_name, naive_model_name], truth=data_set)
-    split_points = get_split_points_for_data_set(data_set, max_splits=max_splits, start_offset=start_offset)
-    logger.info(f"Split points: {split_points}")
-    splitted_data = split_test_train_on_period(data_set, split_points, future_length=None, include_future_weather=True)
-
-    for train_data, future_truth, future_climate_data in splitted_data:
-        if hasattr(external_model, "setup"):
-            external_model.setup()
-        external_model.train(train_data)
-        predictions = getattr(external_model, mode)(future_climate_data)
-        logger.info(f"Predictions: {predictions}")
-        if callback:
-            callback("predictions", predictions)
-        evaluator.add_predictions(model_name, predictions)
-        if run_naive_predictor:
-            naive_predictor = naive_model_cls()
-            naive_predictor.train(train_data)
-            naive_predictions = getattr(naive_predictor, mode)(future_climate_data)
-            evaluator.add_predictions(naive_model_name, naive_predictions)
-
-        results: dict[str, pd.DataFrame] = evaluator.get_results()
-    report_class = HTMLReport if mode == "predict" else HTMLSummaryReport
-
-    report_class.error_measure = "mle"
-    report = report_class.from_results(results)
-    if return_table:
-        for name, t in results.items():
-            t["model"] = name
-        results = pd.concat(results.values())
-        return report, results
-    return report
-
-
 FetureType = TypeVar("FeatureType", bound=TimeSeriesData)
 
 
@@ -132,10 +91,19 @@ def evaluate_model(
     n_test_sets=4,
     report_filename=None,
     weather_provider=None,
+    n_jobs: int = 1,
+    executor: Executor | Worker | None = None,
+    skip_failed: bool = False,
+    timeout: float | None = None,
+    skip_errors: tuple[type[Exception], ...] = PREDICTION_ERRORS,
 ):
     """
     Evaluate a model on a dataset on a held out test set, making multiple predictions on the test set
-    using the same trained model
+    using the same trained model.
+
+    The predictions for the test sets are independent, and can be made in parallel by giving n_jobs or
+    an executor. The trained predictor and the test sets are then pickled and sent to the workers, and
+    the results are gathered in the order of the test sets.
 
     Parameters
     ----------
@@ -147,6 +115,19 @@ def evaluate_model(
         The number of periods to predict ahead
     n_test_sets : int
         The number of test sets to evaluate on
+    n_jobs : int
+        The number of test sets to predict at the same time. If larger than 1 and no executor is given,
+        the predictions are made in a pool of n_jobs processes
+    executor : Executor | Worker, optional
+        A concurrent.futures executor, or a worker such as RedisQueue that queues the predictions as
+        jobs on the worker fleet, to make the n_jobs predictions on instead of a process pool
+    skip_failed : bool
+        If True, a test set for which the prediction fails with one of skip_errors is logged and left
+        out of the evaluation, instead of the error being raised. By default False
+    timeout : float, optional
+        The number of seconds to wait for the prediction of a test set made on an executor or worker
+    skip_errors : tuple[type[Exception], ...]
+        The errors that skip_failed skips, by default PREDICTION_ERRORS
 
     Returns
     -------
@@ -169,12 +150,133 @@ def evaluate_model(
             data, prediction_length, n_test_sets, future_weather_provider=weather_provider
         )
         plot_forecasts(predictor, plot_test_generatro, truth_data, report_filename)
-    forecast_list, tss = _get_forecast_generators(predictor, test_generator, truth_data)
+    forecast_list, tss = _get_forecast_generators(
+        predictor, test_generator, truth_data, n_jobs, executor, skip_failed, timeout, skip_errors
+    )
     evaluator = Evaluator(quantiles=[0.1, 0.5, 0.9])
     results = evaluator(tss, forecast_list)
     return results
 
 
+def _predict(predictor: Predictor, historic_data: DataSet, future_data: DataSet) -> DataSet:
+    return predictor.predict(historic_data, future_data)
+
+
+def _wait_for_job(job: Job, poll_interval: float, timeout: float | None = None):
+    """
+    Poll a job until it is finished and return its result. Raises PredictionJobError if the job ends
+    in any other terminal status, and TimeoutError if it has not finished after timeout seconds
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        status = job.status
+        if status in _FAILED_JOB_STATUSES:
+            raise PredictionJobError(f"Prediction job ended with status {status}")
+        if job.is_finished:
+            return job.result
+        if deadline is not None and time.monotonic() > deadline:
+            job.cancel()
+            raise TimeoutError(f"Prediction job not finished after {timeout} seconds, status {status}")
+        time.sleep(poll_interval)
+
+
+class _QueuedPrediction:
+    """A prediction queued as a job on a Worker, with the result and cancel methods of a Future"""
+
+    def __init__(self, job: Job, poll_interval: float):
+        self._job = job
+        self._poll_interval = poll_interval
+
+    def result(self, timeout: float | None = None):
+        return _wait_for_job(self._job, self._poll_interval, timeout)
+
+    def cancel(self):
+        self._job.cancel()
+
+
+def _submit(executor: Executor | Worker, poll_interval: float, *args):
+    """Start a prediction on the executor, returning a Future or a _QueuedPrediction for its result"""
+    if isinstance(executor, Executor):
+        return executor.submit(_predict, *args)
+    return _QueuedPrediction(executor.queue(_predict, *args), poll_interval)
+
+
+def predict_test_sets(
+    predictor: Predictor,
+    test_generator: Iterable[tuple[DataSet, DataSet, DataSet]],
+    n_jobs: int = 1,
+    executor: Executor | Worker | None = None,
+    skip_failed: bool = False,
+    timeout: float | None = None,
+    poll_interval: float = 1.0,
+    skip_errors: tuple[type[Exception], ...] = PREDICTION_ERRORS,
+) -> Iterator[DataSet | Exception]:
+    """
+    Predict each test set of a test generator, giving the predictions in the order of the test sets.
+
+    With n_jobs larger than 1 the predictions are made in parallel, in a process pool unless an executor
+    is given. At most n_jobs test sets are taken from test_generator and sent to the workers at a time, so
+    the test sets are not all created up front.
+
+    Parameters
+    ----------
+    predictor : Predictor
+        The predictor to predict with
+    test_generator : Iterable[tuple[DataSet, DataSet, DataSet]]
+        The (historic data, future data, truth) test sets
+    n_jobs : int
+        The number of test sets to predict at the same time
+    executor : Executor | Worker, optional
+        A concurrent.futures executor or a worker to make the predictions on
+    skip_failed : bool
+        If True, the error is logged and given instead of the predictions for a test set where the
+        prediction fails with one of skip_errors. By default the error is raised
+    timeout : float, optional
+        The number of seconds to wait for each prediction made on an executor or worker
+    poll_interval : float
+        The number of seconds between checks of the status of a job on a worker
+    skip_errors : tuple[type[Exception], ...]
+        The errors that skip_failed skips, by default PREDICTION_ERRORS. Other errors are raised
+    """
+    if executor is None and n_jobs > 1:
+        with ProcessPoolExecutor(n_jobs) as pool:
+            yield from predict_test_sets(
+                predictor, test_generator, n_jobs, pool, skip_failed, timeout, poll_interval, skip_errors
+            )
+        return
+    caught = skip_errors if skip_failed else ()
+    if executor is None:
+        for i, (historic_data, future_data, *_) in enumerate(test_generator):
+            try:
+                predictions = _predict(predictor, historic_data, future_data)
+            except caught as e:
+                logger.warning(f"Prediction failed for test set {i}, skipping it", exc_info=e)
+                predictions = e
+            yield predictions
+        return
+    pending = deque()
+    test_sets = iter(test_generator)
+    i = 0
+    try:
+        while True:
+            for historic_data, future_data, *_ in test_sets:
+                pending.append(_submit(executor, poll_interval, predictor, historic_data, future_data))
+                if len(pending) >= n_jobs:
+                    break
+            if not pending:
+                return
+            try:
+                predictions = pending.popleft().result(timeout)
+            except caught as e:
+                logger.warning(f"Prediction failed for test set {i}, skipping it", exc_info=e)
+                predictions = e
+            yield predictions
+            i += 1
+    finally:
+        for prediction in pending:
+            prediction.cancel()
+
+
 def evaluate_multi_model(
     estimator: Estimator,
     data: list[DataSet],
@@ -208,10 +310,16 @@ def _get_forecast_generators(
     predictor: Predictor,
     test_generator: Iterable[tuple[DataSet, DataSet, DataSet]],
     truth_data: Dict[str, pd.DataFrame],
+    n_jobs: int = 1,
+    executor: Executor | Worker | None = None,
+    skip_failed: bool = False,
+    timeout: float | None = None,
+    skip_errors: tuple[type[Exception], ...] = PREDICTION_ERRORS,
 ) -> tuple[list[Forecast], list[pd.DataFrame]]:
     """
     Get the forecast and truth data for a predictor and test generator.
-    One entry is a combination of prediction start period and location
+    One entry is a combination of prediction start period and location.
+    With skip_failed, test sets for which the prediction fails are logged and skipped, unless all of them fail
 
     Parameters
     ----------
@@ -221,17 +329,34 @@ def _get_forecast_generators(
         The test generator to generate test data
     truth_data : dict[str, pd.DataFrame]
         The truth data for the locations
+    n_jobs : int
+        The number of test sets to predict at the same time, see predict_test_sets
+    executor : Executor | Worker, optional
+        The executor or worker to make the predictions on, see predict_test_sets
+    skip_failed : bool
+        If True, skip test sets where the prediction fails instead of raising, see predict_test_sets
+    timeout : float, optional
+        The number of seconds to wait for each prediction on an executor or worker
+    skip_errors : tuple[type[Exception], ...]
+        The errors that skip_failed skips, see predict_test_sets
     """
     tss = []
     forecast_list = []
-    for historic_data, future_data, _ in test_generator:
-        forecasts = predictor.predict(historic_data, future_data)
+    failures = []
+    predictions = predict_test_sets(
+        predictor, test_generator, n_jobs, executor, skip_failed, timeout, skip_errors=skip_errors
+    )
+    for forecasts in predictions:
+        if isinstance(forecasts, Exception):
+            failures.append(forecasts)
+            continue
         for location, samples in forecasts.items():
             forecast = ForecastAdaptor.from_samples(samples)
             t = truth_data[location]
             tss.append(t)
             forecast_list.append(forecast)
-
+    if failures and not forecast_list:
+        raise failures[0]
     return forecast_list, tss
 
 
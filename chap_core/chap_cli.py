@@ -42,7 +42,7 @@ def harmonize(input_filename: Path, output_filename: Path):
     input_filename: Path
         The path to the input json-file downloaded from the CHAP-app
     output_filename: Path
-        The path to the output csv-file with climate data and health data harmonized
+        The path to the output csv or parquet file with climate data and health data harmonized
     """
 
     logger.info(f"Converting {input_filename} to {output_filename}")
@@ -51,7 +51,7 @@ def harmonize(input_filename: Path, output_filename: Path):
         text = f.read()
     request_data = RequestV1.model_validate_json(text)
     dataset = dataset_from_request_v1(request_data, target_name="disease", usecwd_for_credentials=True)
-    dataset.to_csv(output_filename)
+    dataset.to_file(output_filename)
 
 
 def evaluate(
@@ -77,7 +77,7 @@ def evaluate(
     n_test_sets: int
         The number of test sets to evaluate on. Defaults to a value so that the lenght of the test set is one year
     """
-    data_set = DataSet.from_csv(data_filename, FullData)
+    data_set = DataSet.from_file(data_filename, FullData)
     if prediction_length is None:
         prediction_length = 3 if data_set.period_range.delta == delta_month else 12
     if n_test_sets is None:
@@ -110,20 +110,20 @@ def predict(
     data_filename: Path
         The path to the dataset to predict ahead on, typically created by chap-cli harmonize
     output_filename: Path
-        The path to the output csv-file with the predictions
+        The path to the output csv or parquet file with the predictions
     model_id: str
         The id of the model to predict with. Currently supports 'naive_model' and 'chap_ewars'
     """
-    data_set = DataSet.from_csv(data_filename, FullData)
+    data_set = DataSet.from_file(data_filename, FullData)
     if prediction_length is None:
         prediction_length = 3 if data_set.period_range.delta == delta_month else 12
     model = registry.get_model(model_id)
     samples = forecast_ahead(model, data_set, prediction_length)
     if do_summary:
-        predictions = DataSet({location: samples.summaries() for location, samples in samples.items()})
+        predictions = samples.summaries()
     else:
         predictions = samples
-    predictions.to_csv(output_filename)
+    predictions.to_file(output_filename)
 
 
 def main():
@@ -47,9 +47,11 @@ def evaluate(
     n_splits: int = 7,
     report_filename: Optional[str] = "report.pdf",
     ignore_environment: bool = False,
+    n_jobs: int = 1,
 ):
     """
-    Evaluate a model on a dataset using forecast cross validation
+    Evaluate a model on a dataset using forecast cross validation.
+    With n_jobs > 1, the test sets are predicted in parallel in n_jobs processes
     """
     logging.basicConfig(level=logging.INFO)
     dataset = datasets[dataset_name]
@@ -71,6 +73,7 @@ def evaluate(
             prediction_length=prediction_length,
             n_test_sets=n_splits,
             report_filename=report_filename,
+            n_jobs=n_jobs,
         )
     except NoPredictionsError as e:
         logging.error(f"No predictions were made: {e}")
@@ -5,6 +5,7 @@ import numpy as np
 from sklearn import linear_model
 
 from .datatypes import ClimateData, SimpleClimateData
+from chap_core.spatio_temporal_data.features import SeasonOneHot, season_one_hot
 from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
 from chap_core.time_period import PeriodRange, Month, Week
 
@@ -25,19 +26,20 @@ class MonthlyClimatePredictor:
         self._cls = None
 
     def _feature_matrix(self, time_period: PeriodRange):
-        return time_period.month[:, None] == np.arange(1, 13)
+        return season_one_hot(time_period)
 
     def train(self, train_data: DataSet[ClimateData]):
-        train_data = train_data.remove_field("disease_cases")
-        for location, data in train_data.items():
+        train_data = train_data.remove_field("disease_cases").to_columnar()
+        features = train_data.feature_array([SeasonOneHot()])
+        for x, (location, data) in zip(features, train_data.items()):
             self._cls = data.__class__
-            x = self._feature_matrix(data.time_period)
             for field in dataclasses.fields(data):
                 if field.name in ("time_period"):
                     continue
                 y = getattr(data, field.name)
+                valid = ~np.isnan(y)
                 model = linear_model.LinearRegression()
-                model.fit(x, y[:, None])
+                model.fit(x[valid], y[valid, None])
                 self._models[location][field.name] = model
 
     def predict(self, time_period: PeriodRange):
@@ -52,10 +54,7 @@ class MonthlyClimatePredictor:
 
 
 class WeeklyClimatePredictor(MonthlyClimatePredictor):
-    def _feature_matrix(self, time_period: PeriodRange):
-        t = time_period.week[:, None] == np.arange(1, 53)
-        t[..., -1] |= time_period.week == 53
-        return t
+    """The seasons are the weeks of the year, with week 53 counted as week 52"""
 
 
 class FutureWeatherFetcher:
@@ -6,6 +6,8 @@ import pandas as pd
 from bionumpy.bnpdataclass import BNPDataClass
 from pydantic import BaseModel, validator
 import dataclasses
+import functools
+import importlib
 
 from typing_extensions import deprecated
 
@@ -18,15 +20,68 @@ from .util import interpolate_nans
 tsdataclass = bnp.bnpdataclass.bnpdataclass
 
 
+def nan_capable_dtype(dtype) -> np.dtype:
+    """The dtype to use for values of dtype that can be missing: float dtypes are kept, others become float64"""
+    dtype = np.dtype(dtype)
+    return dtype if dtype.kind == "f" else np.dtype(float)
+
+
+def nan_capable(values: np.ndarray) -> np.ndarray:
+    """values as an array that can hold nan, converted only if it is not already float"""
+    values = np.asanyarray(values)
+    return values.astype(nan_capable_dtype(values.dtype), copy=False)
+
+
+@dataclasses.dataclass(frozen=True)
+class DtypePolicy:
+    """
+    The dtypes to store the fields of time series dataclasses with, applied once when data is read.
+
+    Features are fields annotated as float, counts fields annotated as int, and samples the samples of
+    Samples. Missing values are nan throughout, so counts (and integer samples) that have missing or
+    non-integer values are stored with the feature dtype instead.
+    """
+
+    feature: type = np.float64
+    count: type = np.int64
+    sample: type = np.float64
+
+    def field_dtype(self, dataclass: type, field_name: str, values: np.ndarray) -> np.dtype:
+        values = np.asanyarray(values)
+        if issubclass(dataclass, Samples) and field_name == "samples":
+            target = np.dtype(self.sample)
+        else:
+            annotation = dataclass.__dataclass_fields__[field_name].type
+            if annotation is int:
+                target = np.dtype(self.count)
+            elif annotation is float:
+                target = np.dtype(self.feature)
+            else:
+                return values.dtype
+        if target.kind in "iu" and values.dtype.kind == "f" and not np.array_equal(values, np.round(values)):
+            return np.dtype(self.feature)
+        return target
+
+    def convert(self, dataclass: type, field_name: str, values: np.ndarray) -> np.ndarray:
+        return np.asanyarray(values).astype(self.field_dtype(dataclass, field_name, values), copy=False)
+
+
+DEFAULT_DTYPES = DtypePolicy()
+COMPACT_DTYPES = DtypePolicy(feature=np.float32, count=np.int32, sample=np.float32)
+
+
 @tsdataclass
 class TimeSeriesData:
     time_period: Period
 
-    def __getstate__(self):
-        return self.todict()
-
-    def __setstate__(self, state):
-        self.__dict__.update(state)
+    def __reduce__(self):
+        # pickle can not save the classes made by tsdataclass itself, so the class is pickled as a
+        # DataclassReference. The field arrays are pickled by numpy (out-of-band with protocol 5)
+        values = {
+            field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.name != "time_period"
+        }
+        field_dtypes = {name: np.asarray(field_values).dtype.str for name, field_values in values.items()}
+        return _time_series_from_state, (dataclass_reference(self.__class__, field_dtypes), self.time_period, values)
 
     def topandas(self):
         data_dict = {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
@@ -53,7 +108,7 @@ class TimeSeriesData:
         if len(missing_indices) == 0:
             return data
         l = len(data) + len(missing_indices)
-        filled_data = np.full(l, np.nan)
+        filled_data = np.full(l, np.nan, dtype=nan_capable_dtype(data.dtype))
         mask = np.full(l, True)
         mask[missing_indices] = False
         filled_data[mask] = data
@@ -110,34 +165,39 @@ class TimeSeriesData:
     def fill_to_endpoint(self, end_time_stamp: TimeStamp) -> "TimeSeriesData":
         if self.end_timestamp == end_time_stamp:
             return self
-        n_missing = (end_time_stamp - self.end_timestamp) // self.time_period.delta
-        assert n_missing >= 0, (f"{n_missing} < 0", end_time_stamp, self.end_timestamp)
         old_time_period = self.time_period
-        new_time_period = PeriodRange(old_time_period.start_timestamp, end_time_stamp, old_time_period.delta)
-        d = {field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.name != "time_period"}
-
-        for name, data in d.items():
-            d[name] = np.pad(data.astype(float), (0, n_missing), constant_values=np.nan)
-        return self.__class__(new_time_period, **d)
+        return self.fill_to_period_range(
+            PeriodRange(old_time_period.start_timestamp, end_time_stamp, old_time_period.delta)
+        )
 
     def fill_to_range(self, start_timestamp, end_timestamp):
         if self.end_timestamp == end_timestamp and self.start_timestamp == start_timestamp:
             return self
-        n_missing_start = (self.start_timestamp - start_timestamp) // self.time_period.delta
-        n_missing = (end_timestamp - self.end_timestamp) // self.time_period.delta
-        assert n_missing >= 0, (f"{n_missing} < 0", end_timestamp, self.end_timestamp)
-        assert n_missing_start >= 0, (
-            f"{n_missing} < 0",
-            end_timestamp,
-            self.end_timestamp,
-        )
+        return self.fill_to_period_range(PeriodRange(start_timestamp, end_timestamp, self.time_period.delta))
+
+    def fill_to_period_range(self, period_range: PeriodRange) -> "TimeSeriesData":
+        """Pad all fields with nan so that the data covers period_range, which must contain the current time periods"""
         old_time_period = self.time_period
-        new_time_period = PeriodRange(start_timestamp, end_timestamp, old_time_period.delta)
+        assert period_range.contains(old_time_period), (period_range, old_time_period)
+        n_missing_start = period_range.index_of(old_time_period[0])
+        n_missing = len(period_range) - len(old_time_period) - n_missing_start
+        if n_missing_start == 0 and n_missing == 0:
+            return self
         d = {field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.name != "time_period"}
 
         for name, data in d.items():
-            d[name] = np.pad(data.astype(float), (n_missing_start, n_missing), constant_values=np.nan)
-        return self.__class__(new_time_period, **d)
+            pad_width = [(n_missing_start, n_missing)] + [(0, 0)] * (np.ndim(data) - 1)
+            d[name] = np.pad(nan_capable(data), pad_width, constant_values=np.nan)
+        return self.__class__(period_range, **d)
+
+    def with_dtypes(self, dtypes: "DtypePolicy") -> "TimeSeriesData":
+        """The data with each field converted to the dtype given by the policy"""
+        fields = {
+            field.name: dtypes.convert(self.__class__, field.name, getattr(self, field.name))
+            for field in dataclasses.fields(self)
+            if field.name != "time_period"
+        }
+        return self.__class__(self.time_period, **fields)
 
     def to_array(self):
         return np.array(
@@ -257,6 +317,9 @@ class Location(Shape):
     longitude: float
 
 
+DEFAULT_QUANTILE_LEVELS = (0.25, 0.75)
+
+
 @tsdataclass
 class SummaryStatistics(TimeSeriesData):
     mean: float
@@ -268,6 +331,40 @@ class SummaryStatistics(TimeSeriesData):
     quantile_high: float
     # quantile_size: -> Maybe add this later
 
+    quantile_levels = DEFAULT_QUANTILE_LEVELS
+
+    @classmethod
+    def with_quantiles(cls, quantile_levels: tuple[float, ...]) -> type["SummaryStatistics"]:
+        """
+        SummaryStatistics with a field for each of the given quantile levels, named as given by
+        quantile_field_name. quantile_low and quantile_high are the lowest and highest of the levels.
+        The default levels (0.25, 0.75) give SummaryStatistics itself.
+        """
+        return summary_statistics_class(tuple(sorted(quantile_levels)))
+
+
+def quantile_field_name(level: float) -> str:
+    """The field name for a quantile level, e.g. 'quantile_2_5' for 0.025 and 'quantile_90' for 0.9"""
+    return "quantile_" + f"{level * 100:g}".replace(".", "_")
+
+
+@functools.lru_cache
+def summary_statistics_class(quantile_levels: tuple[float, ...]) -> type[SummaryStatistics]:
+    if not quantile_levels or not all(0 <= level <= 1 for level in quantile_levels):
+        raise ValueError(f"Quantile levels must be between 0 and 1, got {quantile_levels}")
+    if quantile_levels == DEFAULT_QUANTILE_LEVELS:
+        return SummaryStatistics
+    new_class = tsdataclass(
+        dataclasses.make_dataclass(
+            "SummaryStatistics",
+            [(quantile_field_name(level), float) for level in quantile_levels],
+            bases=(SummaryStatistics,),
+        )
+    )
+    new_class.quantile_levels = quantile_levels
+    new_class._class_factory = (summary_statistics_class, (quantile_levels,))
+    return new_class
+
 
 @tsdataclass
 class Samples(TimeSeriesData):
@@ -289,17 +386,61 @@ class Samples(TimeSeriesData):
 
     to_pandas = topandas
 
-    def summaries(self):
-        return SummaryStatistics(
-            self.time_period,
-            mean=np.mean(self.samples, axis=-1),
-            median=np.median(self.samples, axis=-1),
-            std=np.std(self.samples, axis=-1),
-            min=np.min(self.samples, axis=-1),
-            max=np.max(self.samples, axis=-1),
-            quantile_low=np.quantile(self.samples, 0.25, axis=-1),
-            quantile_high=np.quantile(self.samples, 0.75, axis=-1),
-        )
+    def summaries(self, quantile_levels: tuple[float, ...] = DEFAULT_QUANTILE_LEVELS) -> SummaryStatistics:
+        summary_class = SummaryStatistics.with_quantiles(quantile_levels)
+        return summary_class(self.time_period, **summarize_samples(self.samples, summary_class.quantile_levels))
+
+
+def _interpolate(low: np.ndarray, high: np.ndarray, weight: float) -> np.ndarray:
+    """Linear interpolation between low and high, computed from the closest end as np.quantile does"""
+    difference = high - low
+    if weight >= 0.5:
+        return high - difference * (1 - weight)
+    return low + difference * weight
+
+
+def summarize_samples(
+    samples: np.ndarray, quantile_levels: tuple[float, ...] = DEFAULT_QUANTILE_LEVELS
+) -> dict[str, np.ndarray]:
+    """
+    The fields of SummaryStatistics.with_quantiles(quantile_levels), computed over the last axis of samples.
+
+    All order statistics (min, max, median and the quantiles, with the linear interpolation of np.quantile)
+    come from a single np.partition at the sample positions they need, instead of one sort for each of them.
+    Works for any number of leading axes, e.g. (locations, periods, samples).
+    """
+    quantile_levels = tuple(sorted(quantile_levels))
+    n_samples = samples.shape[-1]
+    positions = {level: level * (n_samples - 1) for level in (0.5,) + quantile_levels}
+    kth = sorted(
+        {0, n_samples - 1}
+        | {int(np.floor(p)) for p in positions.values()}
+        | {int(np.ceil(p)) for p in positions.values()}
+    )
+    partitioned = np.partition(samples, kth, axis=-1)
+    has_nan = np.isnan(samples).any(axis=-1)
+
+    def order_statistic(level):
+        position = positions[level]
+        low, high = int(np.floor(position)), int(np.ceil(position))
+        value = _interpolate(partitioned[..., low], partitioned[..., high], position - low)
+        return np.where(has_nan, np.nan, value)
+
+    quantiles = {level: order_statistic(level) for level in quantile_levels}
+    middle_low, middle_high = (n_samples - 1) // 2, n_samples // 2
+    median = (partitioned[..., middle_low] + partitioned[..., middle_high]) / 2
+    summary = {
+        "mean": np.mean(samples, axis=-1),
+        "median": np.where(has_nan, np.nan, median),
+        "std": np.std(samples, axis=-1),
+        "min": np.where(has_nan, np.nan, partitioned[..., 0]),
+        "max": np.where(has_nan, np.nan, partitioned[..., -1]),
+        "quantile_low": quantiles[quantile_levels[0]],
+        "quantile_high": quantiles[quantile_levels[-1]],
+    }
+    if quantile_levels != DEFAULT_QUANTILE_LEVELS:
+        summary |= {quantile_field_name(level): value for level, value in quantiles.items()}
+    return summary
 
 
 @dataclasses.dataclass
@@ -312,22 +453,139 @@ class Quantile:
 ResultType = pd.DataFrame
 
 
-def add_field(data: BNPDataClass, new_class: type, **field_data):
+def derived_dataclass(
+    base: type[TimeSeriesData], added_fields: tuple[tuple[str, type], ...] = (), removed_fields: tuple[str, ...] = ()
+) -> type[TimeSeriesData]:
+    """
+    The dataclass with the fields of base without removed_fields and with added_fields, given as (name, type)
+    pairs. Creating a class with tsdataclass is slow and the classes are never freed, so each derived class
+    is created once and cached by (base, added_fields, removed_fields).
+    """
+    return _derived_dataclass(base, tuple(added_fields), tuple(removed_fields))
+
+
+@functools.cache
+def _derived_dataclass(
+    base: type[TimeSeriesData], added_fields: tuple[tuple[str, type], ...], removed_fields: tuple[str, ...]
+) -> type[TimeSeriesData]:
+    fields = [(field.name, field.type) for field in dataclasses.fields(base) if field.name not in removed_fields]
+    new_class = tsdataclass(
+        dataclasses.make_dataclass(base.__name__, fields + list(added_fields), bases=(TimeSeriesData,))
+    )
+    new_class._class_factory = (_derived_dataclass, (base, added_fields, removed_fields))
+    return new_class
+
+
+def add_field(data: BNPDataClass, new_class: type | None = None, **field_data):
+    if new_class is None:
+        added_fields = tuple((name, float) for name in field_data)
+        new_class = derived_dataclass(data.__class__, added_fields=added_fields)
     return new_class(**{field.name: getattr(data, field.name) for field in dataclasses.fields(data)} | field_data)
 
 
 def remove_field(data: BNPDataClass, field_name, new_class=None):
     is_type = isinstance(data, type)
     if new_class is None:
-        new_class = tsdataclass(
-            dataclasses.make_dataclass(
-                data.__class__.__name__,
-                [(field.name, field.type) for field in dataclasses.fields(data) if field.name != field_name],
-                bases=(TimeSeriesData,),
-            )
-        )
+        new_class = derived_dataclass(data if is_type else data.__class__, removed_fields=(field_name,))
         if is_type:
             return new_class
     return new_class(
         **{field.name: getattr(data, field.name) for field in dataclasses.fields(data) if field.name != field_name}
     )
+
+
+def dataclass_from_schema(name: str, field_dtypes: dict[str, str]) -> type[TimeSeriesData]:
+    """
+    The dataclass in this module with the given name and fields, or a new dataclass with the given fields
+    (int for integer dtypes, float otherwise). Used to restore stored and serialized data.
+    """
+    dataclass = globals().get(name)
+    if isinstance(dataclass, type) and issubclass(dataclass, TimeSeriesData):
+        field_names = [field.name for field in dataclasses.fields(dataclass) if field.name != "time_period"]
+        if field_names == list(field_dtypes):
+            return dataclass
+    field_types = tuple(
+        (field_name, int if np.dtype(dtype).kind in "iu" else float) for field_name, dtype in field_dtypes.items()
+    )
+    return _schema_dataclass(name, field_types)
+
+
+@functools.cache
+def _schema_dataclass(name: str, field_types: tuple[tuple[str, type], ...]) -> type[TimeSeriesData]:
+    return tsdataclass(dataclasses.make_dataclass(name, list(field_types), bases=(TimeSeriesData,)))
+
+
+# The modules of the classes tsdataclass creates around the decorated class
+_GENERATED_MODULES = ("bionumpy.bnpdataclass.bnpdataclass", "npstructures.npdataclasses")
+
+
+@dataclasses.dataclass(frozen=True)
+class DataclassReference:
+    """
+    A picklable reference to a dataclass, made by dataclass_reference.
+
+    kind is 'import' (args are the module and qualname), 'factory' (args are the function that made the
+    class and its arguments, with dataclasses among them as references) or 'schema' (args are the name
+    and field dtypes, given to dataclass_from_schema).
+    """
+
+    kind: str
+    args: tuple
+
+    def resolve(self) -> type[TimeSeriesData]:
+        if self.kind == "import":
+            return _import_qualname(*self.args)
+        if self.kind == "factory":
+            function, args = self.args
+            return function(*(arg.resolve() if isinstance(arg, DataclassReference) else arg for arg in args))
+        return dataclass_from_schema(*self.args)
+
+
+def _import_qualname(module_name: str, qualname: str):
+    obj = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _field_dtypes(dataclass: type[TimeSeriesData]) -> dict[str, str]:
+    return {
+        field.name: np.dtype(int if field.type is int else float).str
+        for field in dataclasses.fields(dataclass)
+        if field.name != "time_period"
+    }
+
+
+def dataclass_reference(
+    dataclass: type[TimeSeriesData], field_dtypes: dict[str, str] | None = None
+) -> DataclassReference:
+    """
+    A picklable reference to a dataclass. pickle can not save the classes made by tsdataclass, as their
+    __module__ is bionumpy's. Classes importable from the module of the decorated class are referenced
+    by module and qualname, and classes made by derived_dataclass or SummaryStatistics.with_quantiles by
+    the function and arguments that made them. Other classes (e.g. defined in a function) are recreated
+    from their name and field dtypes, by default given by the field types.
+    """
+    factory = dataclass.__dict__.get("_class_factory")
+    if factory is not None:
+        function, args = factory
+        args = tuple(
+            dataclass_reference(arg) if isinstance(arg, type) and issubclass(arg, TimeSeriesData) else arg
+            for arg in args
+        )
+        return DataclassReference("factory", (function, args))
+    module_name = next((c.__module__ for c in dataclass.__mro__ if c.__module__ not in _GENERATED_MODULES), None)
+    try:
+        if _import_qualname(module_name, dataclass.__qualname__) is dataclass:
+            return DataclassReference("import", (module_name, dataclass.__qualname__))
+    except (ImportError, AttributeError, TypeError):
+        pass
+    if field_dtypes is None:
+        field_dtypes = _field_dtypes(dataclass)
+    return DataclassReference("schema", (dataclass.__name__, field_dtypes))
+
+
+def _time_series_from_state(
+    reference: DataclassReference, time_period: PeriodRange, values: dict[str, np.ndarray]
+) -> TimeSeriesData:
+    return reference.resolve()(time_period, **values)
@@ -182,7 +182,7 @@ class ExternalModel(Generic[FeatureType]):
                     new_val = data["time_period"].dt.week
                     data[to_name] = new_val
                 else:
-                    data[to_name] = [int(str(p).split("W")[-1]) for p in data["time_period"]]  # .dt.week
+                    data[to_name] = data["time_period"].astype(str).str.split("W").str[-1].astype(int)
 
             elif from_name == "month":
                 data[to_name] = data["time_period"].dt.month
@@ -190,9 +190,7 @@ class ExternalModel(Generic[FeatureType]):
                 if hasattr(data["time_period"], "dt"):
                     data[to_name] = data["time_period"].dt.year
                 else:
-                    data[to_name] = [
-                        int(str(p).split("W")[0]) for p in data["time_period"]
-                    ]  # data['time_period'].dt.year
+                    data[to_name] = data["time_period"].astype(str).str.split("W").str[0].astype(int)
             else:
                 data[to_name] = data[from_name]
         return data
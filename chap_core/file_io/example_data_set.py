@@ -16,12 +16,13 @@ class ExampleDataSet:
         self._dataclass = dataclass
 
     def filepath(self):
+        parquet_path = self.base_path / self._name.with_suffix(".parquet")
+        if parquet_path.exists():
+            return parquet_path
         return self.base_path / self._name.with_suffix(".csv")
 
     def load(self) -> DataSet:
-        filename = self._name.with_suffix(".csv")
-        filepath = self.base_path / filename
-        return DataSet.from_csv(filepath, dataclass=self._dataclass)
+        return DataSet.from_file(self.filepath(), dataclass=self._dataclass)
 
 
 class RemoteExampleDataSet:
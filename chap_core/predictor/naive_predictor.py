@@ -9,6 +9,7 @@ from chap_core.spatio_temporal_data.temporal_dataclass import (
     TemporalDataclass,
 )
 from chap_core.datatypes import HealthData, ClimateHealthTimeSeries, ClimateData
+from chap_core.spatio_temporal_data.features import Lag, SeasonOneHot, season_one_hot
 
 
 class NaivePredictor:
@@ -58,16 +59,21 @@ class MultiRegionPoissonModel:
         self._models = {}
         self._saved_state = {}
 
+    _features = (Lag("disease_cases", 1), SeasonOneHot())
+
     def _create_feature_matrix(self, data: ClimateHealthTimeSeries):
         data = data.data()
         lagged_values = data.disease_cases[:-1, None]
-        month = np.array([period.month for period in data.time_period])
-        season = month[1:, None] == np.arange(1, 13)
+        season = season_one_hot(data.time_period)[1:]
         return np.hstack([lagged_values, season])
 
     def train(self, data: IsSpatioTemporalDataSet[ClimateHealthTimeSeries]):
-        for location, location_data in data.items():
-            X = self._create_feature_matrix(location_data)
+        columnar = data.to_columnar()
+        features = columnar.feature_array(self._features)
+        for location_features, (location, location_data) in zip(features, data.items()):
+            # The rows of the location's own periods, as the locations may be padded to a common range
+            start = columnar.period_range.index_of(location_data.data().time_period[0])
+            X = location_features[start + 1 : start + len(location_data.data())]
             y = location_data.data().disease_cases[1:]
             mask = ~np.isnan(X).any(axis=1) & ~np.isnan(y)
             assert mask[-1]
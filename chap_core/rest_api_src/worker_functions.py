@@ -5,7 +5,7 @@ from chap_core.api import read_zip_folder, train_on_prediction_data
 from chap_core.api_types import RequestV1, PredictionRequest
 from chap_core.assessment.forecast import forecast_with_predicted_weather, forecast_ahead
 from chap_core.climate_data.seasonal_forecasts import SeasonalForecast
-from chap_core.datatypes import FullData, TimeSeriesArray
+from chap_core.datatypes import FullData
 from chap_core.dhis2_interface.json_parsing import predictions_to_datavalue
 from chap_core.dhis2_interface.pydantic_to_spatiotemporal import v1_conversion
 from chap_core.external.external_model import (
@@ -51,7 +51,7 @@ def predict(json_data: PredictionRequest):
     target_id = get_target_id(json_data, ["disease", "diseases"])
     train_data = dataset_from_request_v1(json_data)
     predictions = forecast_ahead(estimator, train_data, json_data.n_periods)
-    summaries = DataSet({location: samples.summaries() for location, samples in predictions.items()})
+    summaries = predictions.summaries()
     attrs = ["median", "quantile_high", "quantile_low"]
     data_values = predictions_to_datavalue(summaries, attribute_mapping=dict(zip(attrs, attrs)))
     json_body = [dataclasses.asdict(element) for element in data_values]
@@ -70,7 +70,7 @@ def train_on_json_data(json_data: RequestV1, model_name, model_path, control=Non
 
     predictor = model.train(train_data)  # , extra_args=data.area_polygons)
     predictions = forecast_with_predicted_weather(predictor, train_data, 3)
-    summaries = DataSet({location: samples.summaries() for location, samples in predictions.items()})
+    summaries = predictions.summaries()
     attrs = ["median", "quantile_high", "quantile_low"]
     data_values = predictions_to_datavalue(summaries, attribute_mapping=dict(zip(attrs, attrs)))
     json_body = [dataclasses.asdict(element) for element in data_values]
@@ -97,18 +97,10 @@ def dataset_from_request_v1(
     }
     gee_client = initialize_gee_client(usecwd=usecwd_for_credentials)
     period_range = data["disease_cases"].period_range
-    locations = list(data["disease_cases"].keys())
     climate_data = gee_client.get_historical_era5(json_data.orgUnitsGeoJson.model_dump(), periodes=period_range)
-    field_dict = {
-        field_name: DataSet(
-            {
-                location: TimeSeriesArray(period_range, getattr(climate_data[location], field_name))
-                for location in locations
-            }
-        )
-        for field_name in ("mean_temperature", "rainfall")
-    }
-    train_data = DataSet.from_fields(FullData, data | field_dict)
+    sources = {name: (field, "value") for name, field in data.items()}
+    sources |= {field_name: (climate_data, field_name) for field_name in ("mean_temperature", "rainfall")}
+    train_data = DataSet.join(FullData, sources)
     train_data = train_data.interpolate(["population"])
     return train_data
 
@@ -0,0 +1,103 @@
+"""
+Streaming csv reader for columnar DataSets.
+
+The file is read twice in chunks. The first pass reads only the 'location' and 'time_period'
+columns and collects their distinct values, which gives the locations and the period range covering
+all of them, and so the shape of the field arrays. The second pass scatters the fields of each
+chunk into the preallocated arrays. Apart from the field arrays themselves, memory use is bounded
+by the chunk size and the number of distinct locations and periods.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..datatypes import TimeSeriesData
+from ..time_period import PeriodRange
+from ..time_period.period_parsing import parse_period_strings
+from .columnar import ColumnarData, get_field_names
+
+
+def _scan_keys(file_name, chunk_size: int, **kwargs) -> tuple[pd.Index, pd.Index]:
+    """The sorted distinct locations and the distinct period strings in the file"""
+    locations, period_strings = [], []
+    for chunk in pd.read_csv(file_name, usecols=["location", "time_period"], chunksize=chunk_size, **kwargs):
+        locations.append(pd.unique(chunk["location"].dropna().to_numpy(dtype=object)))
+        period_strings.append(pd.unique(chunk["time_period"].astype(str).to_numpy(dtype=object)))
+    if not locations:
+        raise ValueError(f"No rows in {file_name}")
+    _, unique_locations = pd.factorize(np.concatenate(locations), sort=True)
+    return pd.Index(unique_locations), pd.Index(pd.unique(np.concatenate(period_strings)))
+
+
+def _check_periods(location_codes, period_indices, last_indices, fill_missing, locations):
+    """
+    Check that the periods of each location are increasing and, unless fill_missing, consecutive,
+    continuing from the last period seen for the location in earlier chunks. Updates last_indices.
+    """
+    order = np.argsort(location_codes, kind="stable")
+    codes, indices = location_codes[order], period_indices[order]
+    is_first = np.r_[True, codes[1:] != codes[:-1]]
+    previous = np.where(is_first, last_indices[codes], np.r_[-1, indices[:-1]])
+    step = indices - previous
+    seen_before = previous >= 0
+    invalid = seen_before & ((step <= 0) | ((step > 1) & (not fill_missing)))
+    if invalid.any():
+        location = locations[codes[np.flatnonzero(invalid)[0]]]
+        raise ValueError(f"Periods must be consecutive. Invalid periods for location {location}")
+    is_last = np.r_[codes[1:] != codes[:-1], True]
+    last_indices[codes[is_last]] = indices[is_last]
+
+
+def read_csv_chunked(
+    file_name: str | Path, dataclass: type[TimeSeriesData], chunk_size: int = 100_000, fill_missing=False, **kwargs
+) -> ColumnarData:
+    """
+    Read a long csv file chunk by chunk into columnar data, with the same result as
+    ColumnarData.from_pandas on the whole file.
+
+    Parameters
+    ----------
+    file_name : str | Path
+        The csv file, with 'location' and 'time_period' columns and one column per field
+    dataclass : type[TimeSeriesData]
+        The dataclass of the data for each location
+    chunk_size : int, optional
+        The number of rows to read at a time, by default 100 000
+    fill_missing : bool, optional
+        If missing periods within a location should be filled with nan, by default False
+    **kwargs
+        Passed on to pd.read_csv
+
+    Returns
+    -------
+    ColumnarData
+        The data, with locations sorted and padded with nan to the range covering all of them
+    """
+    locations, period_strings = _scan_keys(file_name, chunk_size, **kwargs)
+    period_class, unique_ordinals = parse_period_strings(period_strings)
+    period_range, _ = PeriodRange.from_ordinals(period_class, np.unique(unique_ordinals), fill_missing=True)
+    period_index_of_string = (unique_ordinals - period_range._start_ordinal) // period_class._ordinal_step
+    shape = (len(locations), len(period_range))
+    field_names = get_field_names(dataclass)
+    fields = {name: np.full(shape, np.nan) for name in field_names}
+    is_filled = np.zeros(shape, dtype=bool)
+    last_indices = np.full(len(locations), -1)
+    field_dtypes = {name: [] for name in field_names}
+    columns = ["location", "time_period"] + field_names
+    for chunk in pd.read_csv(file_name, usecols=columns, chunksize=chunk_size, **kwargs):
+        chunk = chunk[chunk["location"].notna()]
+        location_codes = locations.get_indexer(chunk["location"].to_numpy(dtype=object))
+        period_indices = period_index_of_string[period_strings.get_indexer(chunk["time_period"].astype(str))]
+        _check_periods(location_codes, period_indices, last_indices, fill_missing, locations)
+        is_filled[location_codes, period_indices] = True
+        for name in field_names:
+            column = chunk[name].to_numpy()
+            field_dtypes[name].append(column.dtype)
+            fields[name][location_codes, period_indices] = column
+    if is_filled.all():
+        fields = {
+            name: values.astype(np.result_type(*field_dtypes[name]), copy=False) for name, values in fields.items()
+        }
+    return ColumnarData(dataclass, period_range, locations.tolist(), fields)
@@ -0,0 +1,333 @@
+"""
+Columnar storage for DataSet.
+
+All locations share one PeriodRange, and every field is stored as one dense array with locations
+along the first axis and periods along the second (fields such as samples keep their extra axes
+after these). Per-location data is returned as TimeSeriesData backed by views into these arrays.
+"""
+
+import dataclasses
+import functools
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..datatypes import DtypePolicy, Location, TimeSeriesData, nan_capable_dtype
+from ..time_period import PeriodRange
+from ..time_period.period_parsing import parse_period_strings
+from ..time_period.resampling import group_by_period_range
+
+
+def covering_period_range(period_ranges: Iterable[PeriodRange]) -> PeriodRange:
+    """The smallest period range containing all the given period ranges"""
+    return functools.reduce(lambda covering, other: covering.union(other, fill_gap=True), period_ranges)
+
+
+def get_field_names(dataclass: type[TimeSeriesData]) -> list[str]:
+    return [field.name for field in dataclasses.fields(dataclass) if field.name != "time_period"]
+
+
+class ColumnarData:
+    """
+    Field arrays of shape (n_locations, n_periods, ...) sharing one period range.
+
+    Parameters
+    ----------
+    dataclass : type[TimeSeriesData]
+        The dataclass of the data for each location
+    period_range : PeriodRange
+        The periods shared by all locations
+    locations : Sequence[Location]
+        The location names, in the order of the first axis of the field arrays
+    fields : dict[str, np.ndarray]
+        One array for each field of the dataclass
+    """
+
+    def __init__(
+        self,
+        dataclass: type[TimeSeriesData],
+        period_range: PeriodRange,
+        locations: Sequence[Location],
+        fields: dict[str, np.ndarray],
+    ):
+        self.dataclass = dataclass
+        self.period_range = period_range
+        self.locations = list(locations)
+        self.location_index = {location: i for i, location in enumerate(self.locations)}
+        if len(self.location_index) != len(self.locations):
+            raise ValueError("Locations must be unique")
+        field_names = get_field_names(dataclass)
+        if set(fields) != set(field_names):
+            raise ValueError(f"Expected the fields {field_names} of {dataclass.__name__}, got {list(fields)}")
+        self.fields = {name: np.asanyarray(fields[name]) for name in field_names}
+        for name, values in self.fields.items():
+            if values.shape[:2] != self.shape:
+                raise ValueError(f"Field {name} has shape {values.shape}, expected (locations, periods) = {self.shape}")
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.locations), len(self.period_range)
+
+    @property
+    def field_names(self) -> list[str]:
+        return list(self.fields)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        The long data frame with one row per location and period, built without per-location frames.
+        The location column is categorical, and the time_period column is built from the ordinals.
+        """
+        n_locations, n_periods = self.shape
+        data = {"time_period": self.period_range._pandas_array(n_repeats=n_locations)}
+        data |= {name: values.reshape(n_locations * n_periods) for name, values in self.fields.items()}
+        location_codes = np.repeat(np.arange(n_locations), n_periods)
+        data["location"] = pd.Categorical.from_codes(location_codes, categories=pd.Index(self.locations, dtype=object))
+        return pd.DataFrame(data, index=np.tile(np.arange(n_periods), n_locations))
+
+    def location_data(self, index: int) -> TimeSeriesData:
+        """The data for the location at index, as a dataclass backed by views of the field arrays"""
+        return self.dataclass(self.period_range, **{name: values[index] for name, values in self.fields.items()})
+
+    def replace(self, dataclass=None, period_range=None, locations=None, fields=None) -> "ColumnarData":
+        return ColumnarData(
+            self.dataclass if dataclass is None else dataclass,
+            self.period_range if period_range is None else period_range,
+            self.locations if locations is None else locations,
+            self.fields if fields is None else fields,
+        )
+
+    def with_dtypes(self, dtypes: DtypePolicy) -> "ColumnarData":
+        """The data with each field converted to the dtype given by the policy"""
+        return self.replace(
+            fields={name: dtypes.convert(self.dataclass, name, values) for name, values in self.fields.items()}
+        )
+
+    def take_locations(self, locations: Iterable[Location]) -> "ColumnarData":
+        """
+        Restrict to the given locations. The field arrays of the result are views if the locations
+        are evenly spaced in the same order, and copies of only the selected rows otherwise.
+        """
+        locations = list(locations)
+        indices = np.array([self.location_index[location] for location in locations], dtype=int)
+        steps = np.unique(np.diff(indices))
+        if len(indices) and len(steps) <= 1 and (not len(steps) or steps[0] > 0):
+            step = int(steps[0]) if len(steps) else 1
+            selection = slice(indices[0], indices[-1] + 1, step)
+        else:
+            selection = indices
+        return self.replace(
+            locations=locations, fields={name: values[selection] for name, values in self.fields.items()}
+        )
+
+    def slice_locations(self, start: int | None, stop: int | None) -> "ColumnarData":
+        """Restrict to the locations start:stop. The field arrays of the result are views"""
+        location_slice = slice(start, stop)
+        return self.replace(
+            locations=self.locations[location_slice],
+            fields={name: values[location_slice] for name, values in self.fields.items()},
+        )
+
+    def slice_periods(self, start: int | None, stop: int | None) -> "ColumnarData":
+        """Restrict to the periods start:stop. The field arrays of the result are views"""
+        period_slice = slice(start, stop)
+        return self.replace(
+            period_range=self.period_range[period_slice],
+            fields={name: values[:, period_slice] for name, values in self.fields.items()},
+        )
+
+    @classmethod
+    def from_location_data(cls, data_dict: dict[Location, TimeSeriesData]) -> "ColumnarData":
+        """
+        Stack per-location data into field arrays. If the locations have different period ranges,
+        all fields are padded with nan to the range covering all of them.
+        """
+        locations = list(data_dict)
+        data_list = list(data_dict.values())
+        dataclass = data_list[0].__class__
+        if not all(data.__class__ is dataclass for data in data_list):
+            raise ValueError(f"All locations must have the same dataclass, expected {dataclass.__name__}")
+        field_names = get_field_names(dataclass)
+        groups = group_by_period_range(data.time_period for data in data_list)
+        if len(groups) == 1:
+            fields = {name: np.stack([getattr(data, name) for data in data_list]) for name in field_names}
+            return cls(dataclass, groups[0][0], locations, fields)
+        period_range = covering_period_range(group_range for group_range, _ in groups)
+        fields = {}
+        for name in field_names:
+            trailing_shape = np.shape(getattr(data_list[0], name))[1:]
+            dtype = nan_capable_dtype(np.result_type(*(getattr(data, name) for data in data_list)))
+            values = np.full((len(locations), len(period_range)) + trailing_shape, np.nan, dtype=dtype)
+            for group_range, indices in groups:
+                offset = period_range.index_of(group_range[0])
+                values[indices, offset : offset + len(group_range)] = [getattr(data_list[i], name) for i in indices]
+            fields[name] = values
+        return cls(dataclass, period_range, locations, fields)
+
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame, dataclass: type[TimeSeriesData], fill_missing=False) -> "ColumnarData":
+        """
+        Read a long data frame with 'location' and 'time_period' columns in one pass.
+        As before, the periods of each location must be sorted and unique, and consecutive unless
+        fill_missing is True. Locations with different period ranges are padded with nan.
+        """
+        columns = {name: df[name].to_numpy() for name in get_field_names(dataclass)}
+        return cls.from_long_arrays(dataclass, df["location"], df["time_period"].astype(str), columns, fill_missing)
+
+    @classmethod
+    def from_long_arrays(
+        cls,
+        dataclass: type[TimeSeriesData],
+        locations: Sequence[Location],
+        time_periods: Sequence[str],
+        columns: dict[str, np.ndarray],
+        fill_missing=False,
+    ) -> "ColumnarData":
+        """
+        Build the field arrays from one entry per row, as in a long table.
+
+        The locations are factorized and the distinct period strings parsed once, giving each row a
+        (location, period) index into the range covering all locations. Every column is then scattered
+        into a dense array; columns with more than one dimension (such as samples) keep their trailing
+        axes. Cells without a row are nan, in which case the field is float, as when padding each
+        location separately.
+        """
+        unique_locations, period_range, location_codes, period_indices, columns = index_long_arrays(
+            locations, time_periods, columns, fill_missing
+        )
+        shape = (len(unique_locations), len(period_range))
+        is_dense = len(location_codes) == shape[0] * shape[1]
+        fields = {}
+        for name in get_field_names(dataclass):
+            column = columns[name]
+            field_shape = shape + column.shape[1:]
+            if is_dense:
+                values = np.empty(field_shape, dtype=column.dtype)
+            else:
+                values = np.full(field_shape, np.nan, dtype=nan_capable_dtype(column.dtype))
+            values[location_codes, period_indices] = column
+            fields[name] = values
+        return cls(dataclass, period_range, unique_locations, fields)
+
+
+def _check_location_periods(location_codes, period_indices, period_class, ordinals, fill_missing):
+    """Raise the error PeriodRange.from_ordinals gives for the first location with invalid periods"""
+    order = np.argsort(location_codes, kind="stable")
+    sorted_codes, sorted_indices = location_codes[order], period_indices[order]
+    same_location = sorted_codes[1:] == sorted_codes[:-1]
+    step = np.diff(sorted_indices)
+    invalid = same_location & ((step <= 0) | ((step > 1) & (not fill_missing)))
+    if invalid.any():
+        location_code = sorted_codes[np.flatnonzero(invalid)[0]]
+        PeriodRange.from_ordinals(period_class, ordinals[location_codes == location_code], fill_missing)
+
+
+def index_long_arrays(
+    locations: Sequence[Location], time_periods: Sequence[str], columns: dict[str, np.ndarray], fill_missing=False
+) -> tuple[list[Location], PeriodRange, np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """
+    Factorize the locations and parse the distinct period strings of a long table once.
+
+    Returns the sorted locations, the period range covering all rows, and for each row the index of its
+    location and of its period in that range, with the columns (rows without a location are dropped).
+    The periods of each location must be increasing, and consecutive unless fill_missing.
+    """
+    location_codes, unique_locations = pd.factorize(np.asarray(locations, dtype=object), sort=True)
+    has_location = location_codes >= 0
+    if not has_location.all():
+        location_codes = location_codes[has_location]
+        time_periods = np.asarray(time_periods, dtype=object)[has_location]
+        columns = {name: column[has_location] for name, column in columns.items()}
+    period_class, ordinals = parse_period_strings(time_periods)
+    period_range, _ = PeriodRange.from_ordinals(period_class, np.unique(ordinals), fill_missing=True)
+    period_indices = (ordinals - period_range._start_ordinal) // period_class._ordinal_step
+    _check_location_periods(location_codes, period_indices, period_class, ordinals, fill_missing)
+    return unique_locations.tolist(), period_range, location_codes, period_indices, columns
+
+
+JoinSource = ColumnarData | dict[Location, TimeSeriesData]
+
+
+def _source_locations(source: JoinSource) -> list[Location]:
+    return source.locations if isinstance(source, ColumnarData) else list(source)
+
+
+def _source_period_ranges(source: JoinSource) -> list[PeriodRange]:
+    if isinstance(source, ColumnarData):
+        return [source.period_range]
+    return [group_range for group_range, _ in group_by_period_range(data.time_period for data in source.values())]
+
+
+def _join_field(
+    source: JoinSource, field_name: str, row_index: dict[Location, int], period_range: PeriodRange
+) -> np.ndarray:
+    """One field of the joined data, allocated once and filled with one slice assignment per source block"""
+    n_locations, n_periods = len(row_index), len(period_range)
+    if isinstance(source, ColumnarData):
+        values = source.fields[field_name]
+        source_rows = [i for i, location in enumerate(source.locations) if location in row_index]
+        rows = np.array([row_index[source.locations[i]] for i in source_rows], dtype=int)
+        blocks = [(source.period_range, rows, values if len(source_rows) == len(values) else values[source_rows])]
+        dtype, trailing_shape = values.dtype, values.shape[2:]
+    else:
+        blocks = [
+            (data.time_period, row_index[location], getattr(data, field_name))
+            for location, data in source.items()
+            if location in row_index
+        ]
+        dtype = np.result_type(*{np.asarray(values).dtype for _, _, values in blocks} or {float})
+        trailing_shape = np.shape(blocks[0][2])[1:] if blocks else ()
+    n_filled = sum(np.size(rows) * len(block_range) for block_range, rows, _ in blocks)
+    shape = (n_locations, n_periods) + trailing_shape
+    if n_filled == n_locations * n_periods:
+        joined = np.empty(shape, dtype=dtype)
+    else:
+        joined = np.full(shape, np.nan, dtype=nan_capable_dtype(dtype))
+    for block_range, rows, values in blocks:
+        offset = period_range.index_of(block_range[0])
+        joined[rows, offset : offset + len(block_range)] = values
+    return joined
+
+
+def join_columns(
+    dataclass: type[TimeSeriesData], sources: dict[str, tuple[JoinSource, str]], how: str = "inner"
+) -> ColumnarData:
+    """
+    Join fields from several sources into columnar data, aligned on location and period.
+
+    The locations are the intersection ('inner') or the union ('outer') of the locations of the sources,
+    in the order they first appear, and the periods are the range covering all the sources. Each field
+    is allocated once and periods or locations missing from its source are filled with nan.
+
+    Parameters
+    ----------
+    dataclass : type[TimeSeriesData]
+        The dataclass of the joined data
+    sources : dict[str, tuple[JoinSource, str]]
+        For each field of dataclass, the source to take it from and the name of the field in the source.
+        A source is columnar data or a dict of data for each location
+    how : str, optional
+        'inner' or 'outer', by default 'inner'
+
+    Returns
+    -------
+    ColumnarData
+        The joined data
+    """
+    if how not in ("inner", "outer"):
+        raise ValueError(f"Unknown join {how}, expected 'inner' or 'outer'")
+    distinct_sources = list({id(source): source for source, _ in sources.values()}.values())
+    location_lists = [_source_locations(source) for source in distinct_sources]
+    if how == "inner":
+        common = set.intersection(*(set(locations) for locations in location_lists))
+        locations = [location for location in location_lists[0] if location in common]
+    else:
+        locations = list(dict.fromkeys(location for locations in location_lists for location in locations))
+    row_index = {location: i for i, location in enumerate(locations)}
+    period_range = covering_period_range(
+        period_range for source in distinct_sources for period_range in _source_period_ranges(source)
+    )
+    fields = {
+        name: _join_field(source, field_name, row_index, period_range) for name, (source, field_name) in sources.items()
+    }
+    return ColumnarData(dataclass, period_range, locations, fields)
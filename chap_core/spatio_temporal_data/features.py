@@ -0,0 +1,179 @@
+"""
+Feature engineering on whole DataSets.
+
+Features are computed for all locations at once from the columnar field arrays and the period range,
+as arrays of shape (locations, periods, features), so models and adapters do not rebuild them per
+location. DataSet.feature_array stacks a list of features and caches the result on the data set.
+
+- Field(field): the field itself
+- Lag(field, lag): the field lag periods earlier, nan for the first lag periods
+- RollingSum(field, window) / RollingMean(field, window): over the window periods ending at each
+  period, nan if the window starts before the data or has a missing value
+- SeasonOneHot(): one column per season (month of the year, week of the year or day of the year)
+- SeasonCyclical(): the sine and cosine of the position of the period in the year
+- Anomaly(field): the field minus its climatology, the mean of the same location and season
+
+Week 53 is counted as week 52, so weekly data has 52 seasons.
+"""
+
+import dataclasses
+
+import numpy as np
+
+from ..datatypes import nan_capable
+from ..time_period import PeriodRange, Week
+from .columnar import ColumnarData
+from .imputation import season_indices, seasonal_means
+
+
+def feature_seasons(period_range: PeriodRange) -> tuple[np.ndarray, int]:
+    """The season of each period, from 0, and the number of seasons, with week 53 counted as week 52"""
+    seasons, n_seasons = season_indices(period_range)
+    if period_range._period_class is Week:
+        return np.minimum(seasons, 51), 52
+    return seasons, n_seasons
+
+
+def season_one_hot(period_range: PeriodRange) -> np.ndarray:
+    """A (periods, seasons) boolean array with the season of each period"""
+    seasons, n_seasons = feature_seasons(period_range)
+    return seasons[:, None] == np.arange(n_seasons)
+
+
+def lag(values: np.ndarray, n_periods: int) -> np.ndarray:
+    """The values n_periods earlier along the second axis, nan for the first n_periods periods"""
+    if n_periods < 0:
+        raise ValueError(f"Lag must be at least 0, got {n_periods}")
+    values = nan_capable(values)
+    lagged = np.full_like(values, np.nan)
+    lagged[:, n_periods:] = values[:, : max(values.shape[1] - n_periods, 0)]
+    return lagged
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    The sum over the window periods ending at each period along the second axis, from cumulative sums.
+    nan where the window starts before the first period or contains a nan
+    """
+    if window < 1:
+        raise ValueError(f"Window must be at least 1, got {window}")
+    values = nan_capable(values)
+    missing = np.isnan(values)
+    shape = (values.shape[0], 1) + values.shape[2:]
+    sums = np.concatenate([np.zeros(shape), np.cumsum(np.where(missing, 0, values), axis=1, dtype=float)], axis=1)
+    n_missing = np.concatenate([np.zeros(shape, dtype=int), np.cumsum(missing, axis=1)], axis=1)
+    window_sums = sums[:, window:] - sums[:, :-window]
+    has_missing = (n_missing[:, window:] - n_missing[:, :-window]) > 0
+    result = np.full_like(values, np.nan)
+    result[:, window - 1 :] = np.where(has_missing, np.nan, window_sums)
+    return result
+
+
+class Feature:
+    """A feature computed from columnar data, with one or more columns"""
+
+    def names(self, period_range: PeriodRange) -> list[str]:
+        raise NotImplementedError
+
+    def compute(self, columns: ColumnarData) -> np.ndarray:
+        """The feature as a (locations, periods, columns) array"""
+        raise NotImplementedError
+
+
+@dataclasses.dataclass(frozen=True)
+class Field(Feature):
+    field: str
+
+    def names(self, period_range):
+        return [self.field]
+
+    def compute(self, columns):
+        return columns.fields[self.field][..., None]
+
+
+@dataclasses.dataclass(frozen=True)
+class Lag(Feature):
+    field: str
+    lag: int = 1
+
+    def __post_init__(self):
+        if self.lag < 0:
+            raise ValueError(f"Lag must be at least 0, got {self.lag}")
+
+    def names(self, period_range):
+        return [f"{self.field}_lag_{self.lag}"]
+
+    def compute(self, columns):
+        return lag(columns.fields[self.field], self.lag)[..., None]
+
+
+@dataclasses.dataclass(frozen=True)
+class RollingSum(Feature):
+    field: str
+    window: int
+
+    def __post_init__(self):
+        if self.window < 1:
+            raise ValueError(f"Window must be at least 1, got {self.window}")
+
+    def names(self, period_range):
+        return [f"{self.field}_sum_{self.window}"]
+
+    def compute(self, columns):
+        return rolling_sum(columns.fields[self.field], self.window)[..., None]
+
+
+@dataclasses.dataclass(frozen=True)
+class RollingMean(RollingSum):
+    def names(self, period_range):
+        return [f"{self.field}_mean_{self.window}"]
+
+    def compute(self, columns):
+        return super().compute(columns) / self.window
+
+
+@dataclasses.dataclass(frozen=True)
+class SeasonOneHot(Feature):
+    def names(self, period_range):
+        return [f"season_{i + 1}" for i in range(feature_seasons(period_range)[1])]
+
+    def compute(self, columns):
+        one_hot = season_one_hot(columns.period_range)
+        return np.broadcast_to(one_hot, (len(columns.locations),) + one_hot.shape)
+
+
+@dataclasses.dataclass(frozen=True)
+class SeasonCyclical(Feature):
+    def names(self, period_range):
+        return ["season_sin", "season_cos"]
+
+    def compute(self, columns):
+        seasons, n_seasons = feature_seasons(columns.period_range)
+        angle = 2 * np.pi * seasons / n_seasons
+        cyclical = np.stack([np.sin(angle), np.cos(angle)], axis=-1)
+        return np.broadcast_to(cyclical, (len(columns.locations),) + cyclical.shape)
+
+
+@dataclasses.dataclass(frozen=True)
+class Anomaly(Feature):
+    field: str
+
+    def names(self, period_range):
+        return [f"{self.field}_anomaly"]
+
+    def compute(self, columns):
+        values = nan_capable(columns.fields[self.field])
+        seasons, n_seasons = feature_seasons(columns.period_range)
+        climatology = np.take(seasonal_means(values, seasons, n_seasons), seasons, axis=1)
+        return (values - climatology)[..., None]
+
+
+def feature_names(features: list[Feature], period_range: PeriodRange) -> list[str]:
+    """The names of the columns of feature_array(columns, features)"""
+    return [name for feature in features for name in feature.names(period_range)]
+
+
+def feature_array(columns: ColumnarData, features: list[Feature]) -> np.ndarray:
+    """The features stacked as one float (locations, periods, features) array"""
+    arrays = [feature.compute(columns) for feature in features]
+    return np.concatenate([np.asarray(array, dtype=float) for array in arrays], axis=-1)
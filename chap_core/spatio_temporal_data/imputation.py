@@ -0,0 +1,149 @@
+"""
+Imputation of missing values (nan) in columnar DataSets.
+
+Every strategy works on whole field arrays with locations along the first axis and periods along
+the second, so all locations are filled in the same numpy operations:
+
+- 'linear': linear interpolation between the closest valid values, with leading and trailing
+  missing values set to the first and last valid value (as DataSet.interpolate)
+- 'ffill': the last valid value before each missing value. Leading missing values are left
+- 'seasonal_mean': the mean of the valid values of the same location in the same season, i.e. the
+  same month of the year for monthly data, week of the year for weekly data and day of the year for
+  daily data
+
+Locations without any valid values in a field (or in a season) are left missing.
+"""
+
+import dataclasses
+
+import numpy as np
+
+from ..time_period import Day, Month, PeriodRange, Week
+from ..util import interpolate_nans_along_last_axis
+
+STRATEGIES = ("linear", "ffill", "seasonal_mean")
+
+
+@dataclasses.dataclass
+class ImputationReport:
+    """The number of values filled, and still missing, for each imputed field"""
+
+    strategy: str
+    n_filled: dict[str, int]
+    n_missing: dict[str, int]
+
+    @property
+    def total_filled(self) -> int:
+        return sum(self.n_filled.values())
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Replace nans by the last valid value before them along the second axis"""
+    n_periods = values.shape[1]
+    valid = ~np.isnan(values)
+    positions = np.where(valid, np.arange(n_periods).reshape((1, n_periods) + (1,) * (values.ndim - 2)), 0)
+    last_valid = np.maximum.accumulate(positions, axis=1)
+    return np.take_along_axis(values, last_valid, axis=1)
+
+
+def season_indices(period_range: PeriodRange) -> tuple[np.ndarray, int]:
+    """The season of each period (month, week or day of the year, from 0) and the number of seasons"""
+    period_class = period_range._period_class
+    if period_class is Month:
+        return period_range.month - 1, 12
+    if period_class is Week:
+        return period_range.week - 1, 53
+    if period_class is Day:
+        days = period_range._start_days()
+        year_starts = days.astype("datetime64[D]").astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+        return days - year_starts, 366
+    raise ValueError(f"Seasonal imputation needs periods shorter than a year, got {period_class.__name__}")
+
+
+def seasonal_means(values: np.ndarray, seasons: np.ndarray, n_seasons: int) -> np.ndarray:
+    """
+    The mean of the valid values of each location in each season, with seasons along the second axis
+    instead of periods. nan for seasons without valid values
+    """
+    membership = np.zeros((len(seasons), n_seasons), dtype=values.dtype)
+    membership[np.arange(len(seasons)), seasons] = 1
+    valid = ~np.isnan(values)
+    moved = np.moveaxis(values, 1, -1)
+    sums = np.moveaxis(np.where(np.moveaxis(valid, 1, -1), moved, values.dtype.type(0)) @ membership, -1, 1)
+    counts = np.moveaxis(np.moveaxis(valid, 1, -1).astype(values.dtype) @ membership, -1, 1)
+    return np.divide(sums, counts, out=np.full(sums.shape, np.nan, dtype=values.dtype), where=counts > 0)
+
+
+def seasonal_mean_fill(values: np.ndarray, period_range: PeriodRange) -> np.ndarray:
+    """Replace nans by the mean of the valid values in the same season and location"""
+    seasons, n_seasons = season_indices(period_range)
+    means = seasonal_means(values, seasons, n_seasons)
+    return np.where(np.isnan(values), np.take(means, seasons, axis=1), values)
+
+
+def impute_array(values: np.ndarray, strategy: str, period_range: PeriodRange) -> np.ndarray:
+    """Impute one field array with locations along the first axis and periods along the second"""
+    if strategy == "linear":
+        return np.moveaxis(interpolate_nans_along_last_axis(np.moveaxis(values, 1, -1)), -1, 1)
+    if strategy == "ffill":
+        return forward_fill(values)
+    if strategy == "seasonal_mean":
+        return seasonal_mean_fill(values, period_range)
+    raise ValueError(f"Unknown imputation strategy {strategy}, expected one of {STRATEGIES}")
+
+
+def impute_fields(
+    fields: dict[str, np.ndarray],
+    period_range: PeriodRange,
+    strategy: str = "linear",
+    field_names: list[str] | None = None,
+    copy: bool = True,
+) -> tuple[dict[str, np.ndarray], ImputationReport]:
+    """
+    Impute the missing values of the given fields (all fields by default).
+
+    Parameters
+    ----------
+    fields : dict[str, np.ndarray]
+        The field arrays, with locations along the first axis and periods along the second
+    period_range : PeriodRange
+        The periods of the second axis
+    strategy : str, optional
+        'linear', 'ffill' or 'seasonal_mean', by default 'linear'
+    field_names : list[str], optional
+        The fields to impute, by default all of them
+    copy : bool, optional
+        If False, the field arrays with missing values are filled in place, by default True
+
+    Returns
+    -------
+    tuple[dict[str, np.ndarray], ImputationReport]
+        The field arrays, and the number of values filled and still missing for each imputed field
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown imputation strategy {strategy}, expected one of {STRATEGIES}")
+    if field_names is None:
+        field_names = list(fields)
+    unknown_fields = set(field_names) - set(fields)
+    if unknown_fields:
+        raise ValueError(f"Cannot impute unknown fields {unknown_fields}, fields are {list(fields)}")
+    new_fields = dict(fields)
+    n_filled, n_missing = {}, {}
+    for name in field_names:
+        values = fields[name]
+        if values.dtype.kind != "f":
+            n_filled[name] = n_missing[name] = 0
+            continue
+        missing = np.isnan(values)
+        n_before = int(missing.sum())
+        if n_before == 0:
+            n_filled[name] = n_missing[name] = 0
+            continue
+        imputed = impute_array(values, strategy, period_range)
+        n_missing[name] = int(np.isnan(imputed).sum())
+        n_filled[name] = n_before - n_missing[name]
+        if copy:
+            new_fields[name] = imputed
+        else:
+            values[missing] = imputed[missing]
+    return new_fields, ImputationReport(strategy, n_filled, n_missing)
@@ -0,0 +1,152 @@
+"""
+Parquet storage for DataSet.
+
+A data set is written as a long table with 'time_period' and 'location' columns as in the csv files,
+and one column per field. Periods are written as their ids ('2020W01', '202001', ...), which parse back
+to the same periods, and also as the integer 'period_start_day', the number of days from 1970-01-01 to
+the first day of the period, which sorts in time order whatever the period strings look like. Fields
+with samples are written as a fixed size list column, so that a Samples data set is one column of
+floats instead of one text column per sample.
+
+The rows are written in row groups that each hold a block of consecutive periods for a block of
+locations, so the minimum and maximum period_start_day of each row group bound a time range. Reading
+a time range filters on period_start_day and only decodes the row groups that overlap it, and reading
+a subset of locations skips the row groups without them.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..datatypes import Location, TimeSeriesData
+from ..time_period import TimePeriod
+from .columnar import ColumnarData, get_field_names
+
+PERIOD_START_DAY = "period_start_day"
+
+
+def _field_array(values: np.ndarray) -> pa.Array:
+    flat = pa.array(values.reshape(-1))
+    if values.ndim == 2:
+        return flat
+    return pa.FixedSizeListArray.from_arrays(flat, int(np.prod(values.shape[2:])))
+
+
+def _to_table(columns: ColumnarData) -> pa.Table:
+    n_locations, n_periods = columns.shape
+    period_strings = np.array([period.id for period in columns.period_range])
+    location_codes = pa.array(np.repeat(np.arange(n_locations, dtype=np.int32), n_periods))
+    data = {
+        "time_period": pa.array(np.tile(period_strings, n_locations)),
+        PERIOD_START_DAY: pa.array(np.tile(columns.period_range._start_days(), n_locations)),
+        "location": pa.DictionaryArray.from_arrays(location_codes, pa.array(columns.locations)),
+    }
+    data |= {name: _field_array(values) for name, values in columns.fields.items()}
+    return pa.table(data)
+
+
+def write_parquet(columns: ColumnarData, file_name: str | Path, row_group_size: int = 100_000):
+    """
+    Write columnar data as a parquet file, with row groups of about row_group_size rows.
+
+    Parameters
+    ----------
+    columns : ColumnarData
+        The data to write
+    file_name : str | Path
+        The parquet file
+    row_group_size : int, optional
+        The approximate number of rows per row group, by default 100 000. Each row group holds
+        a block of consecutive periods, for all locations if they fit
+    """
+    n_locations, n_periods = columns.shape
+    periods_per_group = max(1, min(n_periods, row_group_size // max(n_locations, 1)))
+    locations_per_group = max(1, row_group_size // periods_per_group)
+    writer = None
+    try:
+        for period_start in range(0, max(n_periods, 1), periods_per_group):
+            period_block = columns.slice_periods(period_start, period_start + periods_per_group)
+            for location_start in range(0, max(n_locations, 1), locations_per_group):
+                table = _to_table(period_block.slice_locations(location_start, location_start + locations_per_group))
+                if writer is None:
+                    writer = pq.ParquetWriter(file_name, table.schema)
+                writer.write_table(table, row_group_size=len(table))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _column_values(column: pa.ChunkedArray) -> np.ndarray:
+    if pa.types.is_fixed_size_list(column.type):
+        array = column.combine_chunks()
+        return array.flatten().to_numpy(zero_copy_only=False).reshape(len(array), column.type.list_size)
+    return column.to_numpy()
+
+
+def _start_day(period: TimePeriod) -> int:
+    return period.start_timestamp._days
+
+
+def _slice_time_period(columns: ColumnarData, time_period: slice) -> ColumnarData:
+    start = 0 if time_period.start is None else columns.period_range.searchsorted(time_period.start)
+    stop = None if time_period.stop is None else columns.period_range.searchsorted(time_period.stop, side="right")
+    return columns.slice_periods(start, stop)
+
+
+def read_parquet(
+    file_name: str | Path,
+    dataclass: type[TimeSeriesData],
+    locations: Iterable[Location] | None = None,
+    time_period: slice | None = None,
+    fill_missing=False,
+) -> ColumnarData:
+    """
+    Read a parquet file written by write_parquet, or any parquet file with the same columns as a csv file.
+    A time period is filtered on period_start_day when reading a file written by write_parquet, and
+    after reading for other files.
+
+    Parameters
+    ----------
+    file_name : str | Path
+        The parquet file
+    dataclass : type[TimeSeriesData]
+        The dataclass of the data for each location
+    locations : Iterable[Location], optional
+        Only read these locations
+    time_period : slice, optional
+        Only read the periods from time_period.start to time_period.stop, both inclusive
+    fill_missing : bool, optional
+        If missing periods within a location should be filled with nan, by default False
+
+    Returns
+    -------
+    ColumnarData
+        The data, with locations sorted as when reading a csv file
+    """
+    filters = []
+    if locations is not None:
+        filters.append(("location", "in", list(locations)))
+    if time_period is not None:
+        assert time_period.step is None
+    filter_periods = time_period is not None and PERIOD_START_DAY in pq.read_schema(file_name).names
+    if filter_periods:
+        if time_period.start is not None:
+            filters.append((PERIOD_START_DAY, ">=", _start_day(time_period.start)))
+        if time_period.stop is not None:
+            filters.append((PERIOD_START_DAY, "<=", _start_day(time_period.stop)))
+    field_names = get_field_names(dataclass)
+    table = pq.read_table(file_name, columns=["location", "time_period"] + field_names, filters=filters or None)
+    columns = {name: _column_values(table.column(name)) for name in field_names}
+    columns = ColumnarData.from_long_arrays(
+        dataclass,
+        table.column("location").to_numpy(),
+        table.column("time_period").to_numpy(),
+        columns,
+        fill_missing,
+    )
+    if time_period is not None and not filter_periods:
+        columns = _slice_time_period(columns, time_period)
+    return columns
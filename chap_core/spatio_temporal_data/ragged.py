@@ -0,0 +1,261 @@
+"""
+Ragged storage for DataSet, for locations with different period ranges.
+
+Each field is stored as one flat array with the periods of all locations after each other, as the
+data of an npstructures.RaggedArray with one row per location, so nothing is padded. Location i
+covers the periods starts[i]:starts[i] + lengths[i] of the period range covering all locations,
+and its values are the rows offsets[i]:offsets[i + 1] of each field (fields such as samples keep
+their extra axes after the first). Per-location data is returned as TimeSeriesData backed by views
+of the flat arrays, and to_dense gives the padded ColumnarData when a consumer needs it.
+"""
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from npstructures import RaggedArray
+
+from ..datatypes import DtypePolicy, Location, TimeSeriesData, nan_capable_dtype
+from ..time_period import PeriodRange
+from .columnar import ColumnarData, covering_period_range, get_field_names, index_long_arrays
+
+
+class RaggedData:
+    """
+    Flat field arrays for locations with their own consecutive period ranges.
+
+    Parameters
+    ----------
+    dataclass : type[TimeSeriesData]
+        The dataclass of the data for each location
+    period_range : PeriodRange
+        The range covering the periods of all locations
+    locations : Sequence[Location]
+        The location names
+    starts : np.ndarray
+        The index in period_range of the first period of each location
+    lengths : np.ndarray
+        The number of periods of each location
+    fields : dict[str, np.ndarray]
+        One array for each field of the dataclass, with sum(lengths) rows
+    """
+
+    def __init__(
+        self,
+        dataclass: type[TimeSeriesData],
+        period_range: PeriodRange,
+        locations: Sequence[Location],
+        starts: np.ndarray,
+        lengths: np.ndarray,
+        fields: dict[str, np.ndarray],
+    ):
+        self.dataclass = dataclass
+        self.period_range = period_range
+        self.locations = list(locations)
+        self.location_index = {location: i for i, location in enumerate(self.locations)}
+        if len(self.location_index) != len(self.locations):
+            raise ValueError("Locations must be unique")
+        self.starts = np.asarray(starts, dtype=int)
+        self.lengths = np.asarray(lengths, dtype=int)
+        if self.starts.shape != (len(self.locations),) or self.lengths.shape != (len(self.locations),):
+            raise ValueError("Expected one start and one length for each location")
+        if np.any(self.starts < 0) or np.any(self.starts + self.lengths > len(period_range)):
+            raise ValueError(f"The periods of each location must be within {period_range}")
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+        field_names = get_field_names(dataclass)
+        if set(fields) != set(field_names):
+            raise ValueError(f"Expected the fields {field_names} of {dataclass.__name__}, got {list(fields)}")
+        self.fields = {name: np.asanyarray(fields[name]) for name in field_names}
+        for name, values in self.fields.items():
+            if len(values) != self.offsets[-1]:
+                raise ValueError(f"Field {name} has {len(values)} rows, expected {self.offsets[-1]}")
+
+    def location_period_range(self, index: int) -> PeriodRange:
+        start = self.starts[index]
+        return self.period_range[start : start + self.lengths[index]]
+
+    def location_data(self, index: int) -> TimeSeriesData:
+        """The data for the location at index, as a dataclass backed by views of the flat arrays"""
+        rows = slice(self.offsets[index], self.offsets[index + 1])
+        return self.dataclass(
+            self.location_period_range(index), **{name: values[rows] for name, values in self.fields.items()}
+        )
+
+    def ragged_field(self, field_name: str) -> RaggedArray:
+        """A one-dimensional field as a RaggedArray with one row per location, sharing the flat array"""
+        return RaggedArray(self.fields[field_name], self.lengths)
+
+    def _location_codes(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.locations)), self.lengths)
+
+    def _period_indices(self) -> np.ndarray:
+        """The index in period_range of the period of each row"""
+        return np.arange(self.offsets[-1]) - np.repeat(self.offsets[:-1] - self.starts, self.lengths)
+
+    @property
+    def has_shared_period_range(self) -> bool:
+        return bool(np.all(self.starts == 0) and np.all(self.lengths == len(self.period_range)))
+
+    def replace(self, period_range=None, locations=None, starts=None, lengths=None, fields=None) -> "RaggedData":
+        return RaggedData(
+            self.dataclass,
+            self.period_range if period_range is None else period_range,
+            self.locations if locations is None else locations,
+            self.starts if starts is None else starts,
+            self.lengths if lengths is None else lengths,
+            self.fields if fields is None else fields,
+        )
+
+    def with_dtypes(self, dtypes: DtypePolicy) -> "RaggedData":
+        """The data with each field converted to the dtype given by the policy"""
+        return self.replace(
+            fields={name: dtypes.convert(self.dataclass, name, values) for name, values in self.fields.items()}
+        )
+
+    def to_dense(self) -> ColumnarData:
+        """The data padded with nan to the covering period range, as ColumnarData"""
+        shape = (len(self.locations), len(self.period_range))
+        if self.has_shared_period_range:
+            fields = {name: values.reshape(shape + values.shape[1:]) for name, values in self.fields.items()}
+            return ColumnarData(self.dataclass, self.period_range, self.locations, fields)
+        location_codes, period_indices = self._location_codes(), self._period_indices()
+        fields = {}
+        for name, values in self.fields.items():
+            dense = np.full(shape + values.shape[1:], np.nan, dtype=nan_capable_dtype(values.dtype))
+            dense[location_codes, period_indices] = values
+            fields[name] = dense
+        return ColumnarData(self.dataclass, self.period_range, self.locations, fields)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        The long data frame with one row per location and period of that location, without padding.
+        The location column is categorical, and the index is the position within each location.
+        """
+        n_rows = self.offsets[-1]
+        data = {"time_period": self.period_range._pandas_array().take(self._period_indices())}
+        data |= {name: values for name, values in self.fields.items()}
+        data["location"] = pd.Categorical.from_codes(
+            self._location_codes(), categories=pd.Index(self.locations, dtype=object)
+        )
+        index = np.arange(n_rows) - np.repeat(self.offsets[:-1], self.lengths)
+        return pd.DataFrame(data, index=index)
+
+    def slice_locations(self, start: int | None, stop: int | None) -> "RaggedData":
+        """Restrict to the locations start:stop. The field arrays of the result are views"""
+        start, stop, _ = slice(start, stop).indices(len(self.locations))
+        stop = max(start, stop)
+        location_slice = slice(start, stop)
+        rows = slice(self.offsets[start], self.offsets[stop])
+        return self.replace(
+            locations=self.locations[location_slice],
+            starts=self.starts[location_slice],
+            lengths=self.lengths[location_slice],
+            fields={name: values[rows] for name, values in self.fields.items()},
+        )
+
+    def take_locations(self, locations: Iterable[Location]) -> "RaggedData":
+        """Restrict to the given locations, copying their rows"""
+        locations = list(locations)
+        indices = np.array([self.location_index[location] for location in locations], dtype=int)
+        lengths = self.lengths[indices]
+        rows = np.repeat(self.offsets[indices] - (np.cumsum(lengths) - lengths), lengths)
+        rows = rows + np.arange(len(rows))
+        return self.replace(
+            locations=locations,
+            starts=self.starts[indices],
+            lengths=lengths,
+            fields={name: values[rows] for name, values in self.fields.items()},
+        )
+
+    def slice_periods(self, start: int | None, stop: int | None) -> "RaggedData":
+        """
+        Restrict to the periods start:stop of the covering range. Locations without periods in the new
+        range are kept with no periods
+        """
+        start, stop, _ = slice(start, stop).indices(len(self.period_range))
+        stop = max(start, stop)
+        new_starts = np.clip(self.starts, start, stop)
+        new_stops = np.clip(self.starts + self.lengths, start, stop)
+        lengths = new_stops - new_starts
+        if np.array_equal(lengths, self.lengths):
+            fields = self.fields
+        else:
+            period_indices = self._period_indices()
+            keep = (period_indices >= start) & (period_indices < stop)
+            fields = {name: values[keep] for name, values in self.fields.items()}
+        return self.replace(
+            period_range=self.period_range[start:stop],
+            starts=np.where(lengths > 0, new_starts - start, 0),
+            lengths=lengths,
+            fields=fields,
+        )
+
+    @classmethod
+    def from_columnar(cls, columns: ColumnarData) -> "RaggedData":
+        """Ragged data with every location covering the whole period range, sharing contiguous field arrays"""
+        n_locations, n_periods = columns.shape
+        fields = {
+            name: values.reshape((n_locations * n_periods,) + values.shape[2:])
+            for name, values in columns.fields.items()
+        }
+        starts, lengths = np.zeros(n_locations, dtype=int), np.full(n_locations, n_periods)
+        return cls(columns.dataclass, columns.period_range, columns.locations, starts, lengths, fields)
+
+    @classmethod
+    def from_location_data(cls, data_dict: dict[Location, TimeSeriesData]) -> "RaggedData":
+        """Concatenate per-location data into flat field arrays, without padding"""
+        locations = list(data_dict)
+        data_list = list(data_dict.values())
+        dataclass = data_list[0].__class__
+        if not all(data.__class__ is dataclass for data in data_list):
+            raise ValueError(f"All locations must have the same dataclass, expected {dataclass.__name__}")
+        period_range = covering_period_range(data.time_period for data in data_list)
+        starts = [period_range.index_of(data.time_period[0]) if len(data) else 0 for data in data_list]
+        lengths = [len(data) for data in data_list]
+        fields = {
+            name: np.concatenate([getattr(data, name) for data in data_list]) for name in get_field_names(dataclass)
+        }
+        return cls(dataclass, period_range, locations, starts, lengths, fields)
+
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame, dataclass: type[TimeSeriesData], fill_missing=False) -> "RaggedData":
+        """Read a long data frame with 'location' and 'time_period' columns, as ColumnarData.from_pandas but unpadded"""
+        columns = {name: df[name].to_numpy() for name in get_field_names(dataclass)}
+        return cls.from_long_arrays(dataclass, df["location"], df["time_period"].astype(str), columns, fill_missing)
+
+    @classmethod
+    def from_long_arrays(
+        cls,
+        dataclass: type[TimeSeriesData],
+        locations: Sequence[Location],
+        time_periods: Sequence[str],
+        columns: dict[str, np.ndarray],
+        fill_missing=False,
+    ) -> "RaggedData":
+        """
+        Build the flat field arrays from one entry per row, as in a long table. Each location gets the
+        range from its first to its last period; with fill_missing, periods missing within it are nan.
+        """
+        unique_locations, period_range, location_codes, period_indices, columns = index_long_arrays(
+            locations, time_periods, columns, fill_missing
+        )
+        n_locations = len(unique_locations)
+        starts = np.full(n_locations, len(period_range))
+        np.minimum.at(starts, location_codes, period_indices)
+        stops = np.zeros(n_locations, dtype=int)
+        np.maximum.at(stops, location_codes, period_indices + 1)
+        lengths = stops - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        rows = offsets[location_codes] + period_indices - starts[location_codes]
+        is_dense = len(rows) == offsets[-1]
+        fields = {}
+        for name in get_field_names(dataclass):
+            column = columns[name]
+            field_shape = (offsets[-1],) + column.shape[1:]
+            if is_dense:
+                values = np.empty(field_shape, dtype=column.dtype)
+            else:
+                values = np.full(field_shape, np.nan, dtype=nan_capable_dtype(column.dtype))
+            values[rows] = column
+            fields[name] = values
+        return cls(dataclass, period_range, unique_locations, starts, lengths, fields)
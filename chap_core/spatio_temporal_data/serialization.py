@@ -0,0 +1,124 @@
+"""
+Binary serialization of columnar DataSets, for passing data sets between processes.
+
+A data set is serialized as the header of a store (see store.py), describing the period range, the
+locations and the dataclass schema, and one raw contiguous buffer per field. dumps writes them as a
+single frame:
+
+- the magic bytes and the length of the header, as a little endian uint64
+- the header as json
+- the field buffers in header order, each starting at a multiple of 64 bytes
+
+so writing a data set costs one copy of each field and loads gives read-only views of the frame.
+DataSet pickles through to_buffers, so with pickle protocol 5 the field buffers are passed as
+PickleBuffers, out-of-band if a buffer_callback is given. The dataclass is pickled along as a
+DataclassReference, so unpickling gives the same class.
+"""
+
+import json
+import pickle
+import struct
+
+import numpy as np
+
+from ..datatypes import DataclassReference, TimeSeriesData
+from .columnar import ColumnarData
+from .ragged import RaggedData
+from .store import columns_from_header, make_header, ragged_from_header
+
+MAGIC = b"CHAPDS01"
+ALIGNMENT = 64
+_LENGTH = struct.Struct("<Q")
+
+
+def to_buffers(columns: ColumnarData | RaggedData) -> tuple[dict, list[np.ndarray]]:
+    """
+    The header and the C-contiguous field arrays of columnar data. For ragged data the header also has
+    the start and length of the periods of each location
+    """
+    header = make_header(columns)
+    if isinstance(columns, RaggedData):
+        header |= {"starts": columns.starts.tolist(), "lengths": columns.lengths.tolist()}
+    return header, [np.ascontiguousarray(values) for values in columns.fields.values()]
+
+
+def from_buffers(
+    header: dict, buffers: list, dataclass: type[TimeSeriesData] | None = None
+) -> ColumnarData | RaggedData:
+    """Columnar or ragged data from a header and the field buffers given by to_buffers, without copying the buffers"""
+    fields = {
+        name: np.frombuffer(buffer, dtype=field["dtype"]).reshape(field["shape"])
+        for (name, field), buffer in zip(header["fields"].items(), buffers)
+    }
+    if "starts" in header:
+        return ragged_from_header(header, fields, dataclass)
+    return columns_from_header(header, fields, dataclass)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _buffer_offsets(header: dict, start: int) -> list[tuple[int, int]]:
+    offsets = []
+    for field in header["fields"].values():
+        start = _aligned(start)
+        n_bytes = int(np.prod(field["shape"])) * np.dtype(field["dtype"]).itemsize
+        offsets.append((start, start + n_bytes))
+        start += n_bytes
+    return offsets
+
+
+def dumps(columns: ColumnarData) -> bytes:
+    """Serialize columnar data as a single binary frame"""
+    header, buffers = to_buffers(columns)
+    header_bytes = json.dumps(header).encode()
+    parts = [MAGIC, _LENGTH.pack(len(header_bytes)), header_bytes]
+    position = len(MAGIC) + _LENGTH.size + len(header_bytes)
+    for (start, end), buffer in zip(_buffer_offsets(header, position), buffers):
+        parts += [bytes(start - position), buffer.reshape(-1).view(np.uint8)]
+        position = end
+    return b"".join(parts)
+
+
+def loads(data, dataclass: type[TimeSeriesData] | None = None) -> ColumnarData:
+    """
+    Read a frame written by dumps. The field arrays are views of data, and so read-only if data is bytes.
+
+    Parameters
+    ----------
+    data : bytes-like
+        The frame
+    dataclass : type[TimeSeriesData], optional
+        The dataclass to use. By default the serialized dataclass is looked up in chap_core.datatypes,
+        or created from the serialized field names
+
+    Returns
+    -------
+    ColumnarData
+        The deserialized data
+    """
+    view = memoryview(data).cast("B")
+    if bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a serialized DataSet, or written by an unsupported version")
+    (header_length,) = _LENGTH.unpack_from(view, len(MAGIC))
+    header_start = len(MAGIC) + _LENGTH.size
+    header = json.loads(bytes(view[header_start : header_start + header_length]))
+    offsets = _buffer_offsets(header, header_start + header_length)
+    return from_buffers(header, [view[start:end] for start, end in offsets], dataclass)
+
+
+def pickle_buffers(columns: ColumnarData | RaggedData, protocol: int) -> tuple[dict, list]:
+    """The header and field buffers to pickle, as PickleBuffers for protocol 5 and above"""
+    header, buffers = to_buffers(columns)
+    if protocol >= 5:
+        buffers = [pickle.PickleBuffer(buffer) for buffer in buffers]
+    return header, buffers
+
+
+def data_set_from_buffers(data_set_class: type, header: dict, buffers: list, dataclass: DataclassReference = None):
+    """Unpickle a DataSet pickled with pickle_buffers, with the dataclass pickled as a DataclassReference"""
+    data = from_buffers(header, buffers, dataclass and dataclass.resolve())
+    if isinstance(data, RaggedData):
+        return data_set_class._from_ragged(data)
+    return data_set_class._from_columnar(data)
@@ -0,0 +1,129 @@
+"""
+On-disk store for columnar DataSets.
+
+A store is a directory with one .npy file per field, of shape (locations, periods, ...), and a
+header.json describing the period range, the locations and the dataclass schema. Opening a store
+memory-maps the field files read-only, so only the pages that are actually used are read, and
+processes on the same host that open the same store share the page cache instead of each holding
+its own copy. Restricting the time period of an opened store, or selecting a consecutive run of
+locations, gives views of the mapped files.
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ..datatypes import TimeSeriesData, dataclass_from_schema
+from ..time_period import PeriodRange, TimePeriod
+from .columnar import ColumnarData, get_field_names
+from .ragged import RaggedData
+
+HEADER_FILE_NAME = "header.json"
+FORMAT_VERSION = 1
+
+
+def make_header(columns: ColumnarData | RaggedData) -> dict:
+    """The header describing the period range, the locations and the dataclass schema of columnar (or ragged) data"""
+    period_range = columns.period_range
+    if not len(period_range):
+        raise ValueError("Cannot make a header for data with an empty period range")
+    return {
+        "format_version": FORMAT_VERSION,
+        "dataclass": columns.dataclass.__name__,
+        "frequency": period_range._period_class.__name__.lower(),
+        "start_period": period_range[0].id,
+        "n_periods": len(period_range),
+        "locations": columns.locations,
+        "fields": {
+            name: {"dtype": values.dtype.str, "shape": list(values.shape)} for name, values in columns.fields.items()
+        },
+    }
+
+
+def columns_from_header(
+    header: dict, fields: dict[str, np.ndarray], dataclass: type[TimeSeriesData] | None = None
+) -> ColumnarData:
+    """Columnar data with the field arrays and the period range, locations and dataclass of a header"""
+    dataclass, period_range = _dataclass_and_period_range(header, dataclass)
+    return ColumnarData(dataclass, period_range, header["locations"], fields)
+
+
+def ragged_from_header(
+    header: dict, fields: dict[str, np.ndarray], dataclass: type[TimeSeriesData] | None = None
+) -> RaggedData:
+    """Ragged data with the flat field arrays and the period range, locations, starts and lengths of a header"""
+    dataclass, period_range = _dataclass_and_period_range(header, dataclass)
+    return RaggedData(dataclass, period_range, header["locations"], header["starts"], header["lengths"], fields)
+
+
+def _dataclass_and_period_range(header: dict, dataclass: type[TimeSeriesData] | None = None):
+    if dataclass is None:
+        dataclass = dataclass_from_schema(
+            header["dataclass"], {name: field["dtype"] for name, field in header["fields"].items()}
+        )
+    period_range = PeriodRange.from_start_and_n_periods(TimePeriod.from_id(header["start_period"]), header["n_periods"])
+    return dataclass, period_range
+
+
+def write_store(columns: ColumnarData, path: str | Path):
+    """
+    Write columnar data as a store directory. The store is written to a temporary directory next to
+    path and renamed into place when complete, so an existing store at path is replaced as a whole
+    and a partially written store is never seen. Processes that have the old store open keep their
+    mapped files.
+    """
+    path = Path(path)
+    header = make_header(columns)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new_path = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+    old_path = None
+    try:
+        for name, values in columns.fields.items():
+            np.save(new_path / f"{name}.npy", values, allow_pickle=False)
+        (new_path / HEADER_FILE_NAME).write_text(json.dumps(header, indent=2))
+        if path.exists():
+            old_path = Path(tempfile.mkdtemp(prefix=f".{path.name}.old.", dir=path.parent))
+            path.rename(old_path / path.name)
+        new_path.rename(path)
+    except BaseException:
+        shutil.rmtree(new_path, ignore_errors=True)
+        if old_path is not None and not path.exists():
+            (old_path / path.name).rename(path)
+        raise
+    finally:
+        if old_path is not None:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_header(path: str | Path) -> dict:
+    header = json.loads((Path(path) / HEADER_FILE_NAME).read_text())
+    if header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported store format version {header.get('format_version')} in {path}")
+    return header
+
+
+def open_store(path: str | Path, dataclass: type[TimeSeriesData] | None = None) -> ColumnarData:
+    """
+    Memory-map a store written by write_store.
+
+    Parameters
+    ----------
+    path : str | Path
+        The store directory
+    dataclass : type[TimeSeriesData], optional
+        The dataclass to use. By default the stored dataclass is looked up in chap_core.datatypes,
+        or created from the stored field names
+
+    Returns
+    -------
+    ColumnarData
+        Columnar data with read-only memory-mapped field arrays
+    """
+    path = Path(path)
+    header = read_header(path)
+    field_names = get_field_names(dataclass) if dataclass is not None else list(header["fields"])
+    fields = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in field_names}
+    return columns_from_header(header, fields, dataclass)
@@ -1,4 +1,5 @@
-from typing import Generic, Iterable, Tuple, Type, Callable
+from pathlib import Path
+from typing import Generic, Iterable, Tuple, Callable
 
 import numpy as np
 import pandas as pd
@@ -6,15 +7,25 @@ import pandas as pd
 from ..api_types import PeriodObservation
 from .._legacy_dataset import TemporalIndexType, FeaturesT
 from ..datatypes import (
+    DEFAULT_QUANTILE_LEVELS,
+    DtypePolicy,
     Location,
     add_field,
+    dataclass_reference,
+    derived_dataclass,
     remove_field,
+    summarize_samples,
+    SummaryStatistics,
     TimeSeriesArray,
     TimeSeriesData,
 )
-from ..time_period import PeriodRange
+from .columnar import ColumnarData, covering_period_range, get_field_names, join_columns
+from .features import Feature, feature_array, feature_names
+from .imputation import ImputationReport, impute_fields
+from .ragged import RaggedData
+from ..time_period import PeriodRange, TimePeriod
 from ..time_period.date_util_wrapper import TimeStamp
-import dataclasses
+from ..time_period.resampling import group_by_period_range, resample_values
 
 
 class TemporalDataclass(Generic[FeaturesT]):
@@ -41,44 +52,21 @@ class TemporalDataclass(Generic[FeaturesT]):
     def fill_to_endpoint(self, end_time_stamp: TimeStamp) -> "TemporalDataclass[FeaturesT]":
         if self.end_timestamp == end_time_stamp:
             return self
-        n_missing = self._data.time_period.delta.n_periods(self.end_timestamp, end_time_stamp)
-        # n_missing = (end_time_stamp - self.end_timestamp) // self._data.time_period.delta
-        assert n_missing >= 0, (f"{n_missing} < 0", end_time_stamp, self.end_timestamp)
         old_time_period = self._data.time_period
-        new_time_period = PeriodRange(old_time_period.start_timestamp, end_time_stamp, old_time_period.delta)
-        d = {
-            field.name: getattr(self._data, field.name)
-            for field in dataclasses.fields(self._data)
-            if field.name != "time_period"
-        }
-
-        for name, data in d.items():
-            d[name] = np.pad(data.astype(float), (0, n_missing), constant_values=np.nan)
-        return TemporalDataclass(self._data.__class__(new_time_period, **d))
+        return self.fill_to_period_range(
+            PeriodRange(old_time_period.start_timestamp, end_time_stamp, old_time_period.delta)
+        )
 
     def fill_to_range(self, start_timestamp, end_timestamp):
         if self.end_timestamp == end_timestamp and self.start_timestamp == start_timestamp:
             return self
-        n_missing_start = self._data.time_period.delta.n_periods(start_timestamp, self.start_timestamp)
-        # n_missing_start = (self.start_timestamp - start_timestamp) // self._data.time_period.delta
-        n_missing = (end_timestamp - self.end_timestamp) // self._data.time_period.delta
-        assert n_missing >= 0, (f"{n_missing} < 0", end_timestamp, self.end_timestamp)
-        assert n_missing_start >= 0, (
-            f"{n_missing} < 0",
-            end_timestamp,
-            self.end_timestamp,
-        )
-        old_time_period = self._data.time_period
-        new_time_period = PeriodRange(start_timestamp, end_timestamp, old_time_period.delta)
-        d = {
-            field.name: getattr(self._data, field.name)
-            for field in dataclasses.fields(self._data)
-            if field.name != "time_period"
-        }
+        return self.fill_to_period_range(PeriodRange(start_timestamp, end_timestamp, self._data.time_period.delta))
 
-        for name, data in d.items():
-            d[name] = np.pad(data.astype(float), (n_missing_start, n_missing), constant_values=np.nan)
-        return TemporalDataclass(self._data.__class__(new_time_period, **d))
+    def fill_to_period_range(self, period_range: PeriodRange) -> "TemporalDataclass[FeaturesT]":
+        filled = self._data.fill_to_period_range(period_range)
+        if filled is self._data:
+            return self
+        return TemporalDataclass(filled)
 
     def restrict_time_period(self, period_range: TemporalIndexType) -> "TemporalDataclass[FeaturesT]":
         assert isinstance(period_range, slice)
@@ -117,21 +105,169 @@ class Polygon:
 class DataSet(Generic[FeaturesT]):
     """
     Class representing severeal time series at different locations.
+
+    The data is either stored as one TemporalDataclass per location, or in columnar form where all
+    locations share one PeriodRange and each field is a dense (n_locations, n_periods) array. The
+    columnar form is created by DataSet.from_columns, to_columnar and from_pandas, and operations on
+    the whole data set are then done on the field arrays directly. Indexing a columnar data set by
+    location returns a dataclass backed by views of the field arrays.
+
+    Locations with different period ranges can instead be stored ragged (see DataSet.to_ragged and
+    from_pandas(..., ragged=True)), with each field as one flat array of the periods of all locations
+    after each other. Nothing is padded, and the data is only converted to dense columnar arrays when
+    an operation needs them.
     """
 
     def __init__(self, data_dict: dict[str, FeaturesT], polygon_dict: dict[str, Polygon] = None):
-        self._data_dict = {
+        self._columns = None
+        self._ragged = None
+        self._feature_cache = {}
+        self._location_dict = {
             loc: TemporalDataclass(data) if not isinstance(data, TemporalDataclass) else data
             for loc, data in data_dict.items()
         }
 
+    @classmethod
+    def _from_columnar(cls, columns: ColumnarData) -> "DataSet[FeaturesT]":
+        data_set = cls.__new__(cls)
+        data_set._columns = columns
+        data_set._ragged = None
+        data_set._location_dict = None
+        data_set._feature_cache = {}
+        return data_set
+
+    @classmethod
+    def _from_ragged(cls, ragged: RaggedData) -> "DataSet[FeaturesT]":
+        data_set = cls.__new__(cls)
+        data_set._columns = None
+        data_set._ragged = ragged
+        data_set._location_dict = None
+        data_set._feature_cache = {}
+        return data_set
+
+    @classmethod
+    def from_columns(
+        cls,
+        dataclass: type[FeaturesT],
+        period_range: PeriodRange,
+        locations: Iterable[Location],
+        fields: dict[str, np.ndarray],
+    ) -> "DataSet[FeaturesT]":
+        """
+        Create a columnar DataSet from one array per field with locations along the first axis and
+        periods along the second. The arrays are used as they are, without copying.
+
+        Parameters
+        ----------
+        dataclass : Type[FeaturesT]
+            The dataclass of the data for each location
+        period_range : PeriodRange
+            The periods shared by all locations
+        locations : Iterable[Location]
+            The location names, in the order of the first axis
+        fields : dict[str, np.ndarray]
+            One (n_locations, n_periods) array for each field of the dataclass
+
+        Returns
+        -------
+        DataSet[FeaturesT]
+            The columnar DataSet
+        """
+        return cls._from_columnar(ColumnarData(dataclass, period_range, locations, fields))
+
+    @property
+    def is_columnar(self) -> bool:
+        return self._columns is not None
+
+    def to_columnar(self) -> "DataSet[FeaturesT]":
+        """Convert to columnar storage, padding with nan if the locations have different period ranges"""
+        if self.is_columnar:
+            return self
+        if self.is_ragged:
+            return self._from_columnar(self._ragged.to_dense())
+        return self._from_columnar(ColumnarData.from_location_data(dict(self.items())))
+
+    @property
+    def is_ragged(self) -> bool:
+        return self._ragged is not None
+
+    def to_ragged(self) -> "DataSet[FeaturesT]":
+        """Convert to ragged storage, where each location keeps its own period range without padding"""
+        if self.is_ragged:
+            return self
+        if self.is_columnar:
+            return self._from_ragged(RaggedData.from_columnar(self._columns))
+        return self._from_ragged(RaggedData.from_location_data(dict(self.items())))
+
+    def field_array(self, field_name: str) -> np.ndarray:
+        """The values of a field for all locations, as a (n_locations, n_periods) array"""
+        return self.to_columnar()._columns.fields[field_name]
+
+    def feature_array(self, features: Iterable[Feature]) -> np.ndarray:
+        """
+        The features (see spatio_temporal_data.features) for all locations, as a read-only
+        (n_locations, n_periods, n_features) float array. Locations with different period ranges are
+        padded with nan as in to_columnar. The array is computed once for each list of features and
+        cached on the data set.
+
+        Examples
+        --------
+        >>> X = data_set.feature_array([Lag("disease_cases", 1), RollingMean("rainfall", 3), SeasonOneHot()])
+        """
+        features = tuple(features)
+        if features not in self._feature_cache:
+            array = feature_array(self.to_columnar()._columns, list(features))
+            array.flags.writeable = False
+            self._feature_cache[features] = array
+        return self._feature_cache[features]
+
+    def feature_names(self, features: Iterable[Feature]) -> list[str]:
+        """The names of the columns of feature_array(features)"""
+        if self.is_columnar:
+            return feature_names(list(features), self._columns.period_range)
+        return feature_names(list(features), covering_period_range(data.time_period for data in self.values()))
+
+    @property
+    def _data_dict(self) -> dict[Location, TemporalDataclass[FeaturesT]]:
+        if self._location_dict is None and self.is_ragged:
+            ragged = self._ragged
+            self._location_dict = {
+                location: TemporalDataclass(ragged.location_data(i)) for i, location in enumerate(ragged.locations)
+            }
+        if self._location_dict is None:
+            columns = self._columns
+            self._location_dict = {
+                location: TemporalDataclass(columns.location_data(i)) for i, location in enumerate(columns.locations)
+            }
+        return self._location_dict
+
     def __repr__(self):
+        if self.is_columnar:
+            columns = self._columns
+            return (
+                f"{self.__class__.__name__}({columns.dataclass.__name__}, {len(columns.locations)} locations, "
+                f"{columns.period_range})"
+            )
+        if self.is_ragged:
+            ragged = self._ragged
+            return (
+                f"{self.__class__.__name__}({ragged.dataclass.__name__}, {len(ragged.locations)} ragged locations, "
+                f"{ragged.period_range})"
+            )
         return f"{self.__class__.__name__}({self._data_dict})"
 
     def __getitem__(self, location: str) -> FeaturesT:
+        if self.is_columnar and self._location_dict is None:
+            return self._columns.location_data(self._columns.location_index[location])
+        if self.is_ragged and self._location_dict is None:
+            return self._ragged.location_data(self._ragged.location_index[location])
         return self._data_dict[location].data()
 
     def keys(self) -> Iterable[str]:
+        if self.is_columnar:
+            return self._columns.location_index.keys()
+        if self.is_ragged:
+            return self._ragged.location_index.keys()
         return self._data_dict.keys()
 
     def items(self) -> Iterable[Tuple[str, FeaturesT]]:
@@ -142,6 +278,10 @@ class DataSet(Generic[FeaturesT]):
 
     @property
     def period_range(self) -> PeriodRange:
+        if self.is_columnar:
+            return self._columns.period_range
+        if self.is_ragged:
+            return self._ragged.period_range
         first_period_range = self._data_dict[next(iter(self._data_dict))].data().time_period
         assert first_period_range.start_timestamp == first_period_range.start_timestamp
         assert first_period_range.end_timestamp == first_period_range.end_timestamp
@@ -149,23 +289,42 @@ class DataSet(Generic[FeaturesT]):
 
     @property
     def start_timestamp(self) -> pd.Timestamp:
+        if self.is_columnar:
+            return self._columns.period_range.start_timestamp
         return min(data.start_timestamp for data in self.data())
 
     @property
     def end_timestamp(self) -> pd.Timestamp:
+        if self.is_columnar:
+            return self._columns.period_range.end_timestamp
         return max(data.end_timestamp for data in self.data())
 
     def get_locations(self, location: Iterable[Location]) -> "DataSet[FeaturesT]":
+        if self.is_columnar:
+            return self._from_columnar(self._columns.take_locations(location))
+        if self.is_ragged:
+            return self._from_ragged(self._ragged.take_locations(location))
         return self.__class__({loc: self._data_dict[loc] for loc in location})
 
     def get_location(self, location: Location) -> FeaturesT:
+        if (self.is_columnar or self.is_ragged) and self._location_dict is None:
+            return TemporalDataclass(self[location])
         return self._data_dict[location]
 
     def restrict_time_period(self, period_range: TemporalIndexType) -> "DataSet[FeaturesT]":
+        if self.is_columnar or self.is_ragged:
+            assert isinstance(period_range, slice)
+            assert period_range.step is None
+            time_period = self._columns.period_range if self.is_columnar else self._ragged.period_range
+            start = None if period_range.start is None else time_period.searchsorted(period_range.start)
+            stop = None if period_range.stop is None else time_period.searchsorted(period_range.stop, side="right")
+            if self.is_ragged:
+                return self._from_ragged(self._ragged.slice_periods(start, stop))
+            return self._from_columnar(self._columns.slice_periods(start, stop))
         return self.__class__({loc: data.restrict_time_period(period_range) for loc, data in self._data_dict.items()})
 
     def locations(self) -> Iterable[Location]:
-        return self._data_dict.keys()
+        return self.keys()
 
     def data(self) -> Iterable[FeaturesT]:
         return self._data_dict.values()
@@ -176,25 +335,162 @@ class DataSet(Generic[FeaturesT]):
 
     def to_pandas(self) -> pd.DataFrame:
         """Join the pandas frame for all locations with locations as column"""
+        if self._has_bulk_pandas_path():
+            return self._bulk_columns().to_pandas()
         tables = [
             self._add_location_to_dataframe(data.to_pandas(), location) for location, data in self._data_dict.items()
         ]
         return pd.concat(tables)
 
+    def _has_shared_period_range(self) -> bool:
+        """If all locations have the same period range, so that converting to columnar adds no padding"""
+        if self.is_columnar:
+            return True
+        if self.is_ragged:
+            return self._ragged.has_shared_period_range
+        return len(group_by_period_range(data.time_period for data in self.values())) == 1
+
+    def _has_bulk_pandas_path(self) -> bool:
+        """If the long frame can be built directly from one-dimensional fields sharing one period range"""
+        if self.is_columnar:
+            dataclass = self._columns.dataclass
+            is_flat = all(values.ndim == 2 for values in self._columns.fields.values())
+        elif self.is_ragged:
+            dataclass = self._ragged.dataclass
+            is_flat = all(values.ndim == 1 for values in self._ragged.fields.values())
+        else:
+            if not self._has_shared_period_range():
+                return False
+            data_list = list(self.values())
+            dataclass = data_list[0].__class__
+            if not all(data.__class__ is dataclass for data in data_list):
+                return False
+            is_flat = all(
+                np.ndim(getattr(data, name)) == 1 for data in data_list for name in get_field_names(dataclass)
+            )
+        return is_flat and dataclass.topandas is TimeSeriesData.topandas
+
+    def _bulk_columns(self) -> ColumnarData | RaggedData:
+        """The ragged data if stored ragged, else the columnar data, for writing long frames"""
+        return self._ragged if self.is_ragged else self.to_columnar()._columns
+
     def interpolate(self, field_names=None):
+        if self.is_columnar or self._has_shared_period_range():
+            return self.impute("linear", field_names)[0]
         return self.__class__({loc: data.interpolate(field_names) for loc, data in self.items()})
 
+    def impute(
+        self, strategy: str = "linear", field_names: list[str] | None = None, copy: bool = True
+    ) -> tuple["DataSet[FeaturesT]", ImputationReport]:
+        """
+        Fill missing values (nan) for all locations at once, working on the (location, period) array of each field.
+
+        Parameters
+        ----------
+        strategy : str, optional
+            'linear' (interpolation, as in interpolate), 'ffill' (last valid value) or 'seasonal_mean'
+            (mean of the same month, week or day of the year for the location), by default 'linear'
+        field_names : list[str], optional
+            The fields to impute, by default all of them
+        copy : bool, optional
+            If False, the field arrays of the columnar data set are filled in place. A data set stored
+            per location is always converted to columnar arrays first. By default True
+
+        Returns
+        -------
+        tuple[DataSet[FeaturesT], ImputationReport]
+            The imputed columnar data set, and the number of values filled and still missing per field
+
+        Examples
+        --------
+        >>> imputed, report = data_set.impute("seasonal_mean", ["rainfall"])
+        """
+        columns = self.to_columnar()._columns
+        fields, report = impute_fields(columns.fields, columns.period_range, strategy, field_names, copy)
+        if not copy:
+            self._feature_cache.clear()
+        return self._from_columnar(columns.replace(fields=fields)), report
+
+    def summaries(self, quantile_levels: tuple[float, ...] = DEFAULT_QUANTILE_LEVELS) -> "DataSet[SummaryStatistics]":
+        """
+        Summary statistics over the samples of a DataSet[Samples], with a field for each of the given
+        quantile levels (see SummaryStatistics.with_quantiles). If the locations share a period range,
+        all of them are summarized at once from the stacked samples.
+        """
+        if self.is_columnar or self._has_shared_period_range():
+            columns = self.to_columnar()._columns
+            summary_class = SummaryStatistics.with_quantiles(quantile_levels)
+            fields = summarize_samples(columns.fields["samples"], summary_class.quantile_levels)
+            return self._from_columnar(columns.replace(dataclass=summary_class, fields=fields))
+        return self.__class__({location: samples.summaries(quantile_levels) for location, samples in self.items()})
+
+    def resample(
+        self, target_period_type: str | type[TimePeriod], reducers: dict[str, str] | None = None, default_reducer="mean"
+    ) -> "DataSet[FeaturesT]":
+        """
+        Aggregate the data set to a coarser period type, e.g. daily climate data to weeks or months.
+
+        The segment boundaries are computed once for each distinct period range, and all locations
+        sharing a period range are reduced together. Missing values are skipped.
+
+        Parameters
+        ----------
+        target_period_type : str | type[TimePeriod]
+            'day', 'week', 'month' or 'year', or the corresponding period class
+        reducers : dict[str, str], optional
+            Reducer ('sum', 'mean', 'max' or 'min') for each field
+        default_reducer : str, optional
+            Reducer for the fields not in reducers, by default 'mean'
+
+        Returns
+        -------
+        DataSet[FeaturesT]
+            The resampled data set, with float values
+
+        Examples
+        --------
+        >>> weekly = daily_climate.resample("week", reducers={"rainfall": "sum", "max_temperature": "max"})
+        """
+        reducers = reducers or {}
+        locations = list(self.keys())
+        data_list = None if self.is_columnar else list(self.values())
+        dataclass = self._columns.dataclass if self.is_columnar else data_list[0].__class__
+        field_names = get_field_names(dataclass)
+        unknown_fields = set(reducers) - set(field_names)
+        if unknown_fields:
+            raise ValueError(f"Reducers given for unknown fields {unknown_fields}, fields are {field_names}")
+        reducers = {name: reducers.get(name, default_reducer) for name in field_names}
+        if self.is_columnar:
+            columns = self._columns
+            new_range, resampled = resample_values(columns.period_range, columns.fields, target_period_type, reducers)
+            return self._from_columnar(columns.replace(period_range=new_range, fields=resampled))
+        new_dict = {}
+        for period_range, indices in group_by_period_range(data.time_period for data in data_list):
+            values = {name: np.array([getattr(data_list[i], name) for i in indices]) for name in field_names}
+            new_range, resampled = resample_values(period_range, values, target_period_type, reducers)
+            for row, i in enumerate(indices):
+                new_dict[locations[i]] = dataclass(new_range, **{name: resampled[name][row] for name in field_names})
+        return self.__class__(new_dict)
+
     @classmethod
     def _fill_missing(cls, data_dict: dict[str, TemporalDataclass[FeaturesT]]):
         """Fill missing values in a dictionary of TemporalDataclasses"""
-        end = max(data.end_timestamp for data in data_dict.values())
-        start = min(data.start_timestamp for data in data_dict.values())
+        period_range = cls._covering_period_range(data.data().time_period for data in data_dict.values())
         for location, data in data_dict.items():
-            data_dict[location] = data.fill_to_range(start, end)
+            data_dict[location] = data.fill_to_period_range(period_range)
         return data_dict
 
+    _covering_period_range = staticmethod(covering_period_range)
+
     @classmethod
-    def from_pandas(cls, df: pd.DataFrame, dataclass: Type[FeaturesT], fill_missing=False) -> "DataSet[FeaturesT]":
+    def from_pandas(
+        cls,
+        df: pd.DataFrame,
+        dataclass: type[FeaturesT],
+        fill_missing=False,
+        dtypes: DtypePolicy = None,
+        ragged: bool = False,
+    ) -> "DataSet[FeaturesT]":
         """
         Create a SpatioTemporalDict from a pandas dataframe.
         The dataframe needs to have a 'location' column, and a 'time_period' column.
@@ -212,6 +508,11 @@ class DataSet(Generic[FeaturesT]):
             The dataclass to use for the time series
         fill_missing : bool, optional
             If missing values should be filled, by default False
+        dtypes : DtypePolicy, optional
+            The dtypes to convert the fields to, e.g. COMPACT_DTYPES. By default the dtypes read are kept
+        ragged : bool, optional
+            If True, each location keeps its own period range in ragged storage, instead of all locations
+            being padded with nan to a shared range, by default False
 
         Returns
         -------
@@ -232,15 +533,164 @@ class DataSet(Generic[FeaturesT]):
         ... )
         >>> DataSet.from_pandas(df, HealthData)
         """
-        data_dict = {}
-        for location, data in df.groupby("location"):
-            data_dict[location] = TemporalDataclass(dataclass.from_pandas(data, fill_missing))
-        data_dict = cls._fill_missing(data_dict)
+        storage_class = RaggedData if ragged else ColumnarData
+        if dataclass.from_pandas.__func__ is TimeSeriesData.from_pandas.__func__:
+            columns = storage_class.from_pandas(df, dataclass, fill_missing)
+        else:
+            data_dict = {}
+            for location, data in df.groupby("location", observed=True):
+                data_dict[location] = TemporalDataclass(dataclass.from_pandas(data, fill_missing))
+            if not ragged:
+                data_dict = cls._fill_missing(data_dict)
+            columns = storage_class.from_location_data({loc: data.data() for loc, data in data_dict.items()})
+        if dtypes is not None:
+            columns = columns.with_dtypes(dtypes)
+        return cls._from_ragged(columns) if ragged else cls._from_columnar(columns)
+
+    def with_dtypes(self, dtypes: DtypePolicy) -> "DataSet[FeaturesT]":
+        """
+        Convert all fields to the dtypes of a policy, e.g. COMPACT_DTYPES for float32 features and
+        int32 counts, as a columnar data set. Counts with missing values get the feature dtype.
+        """
+        return self._from_columnar(self.to_columnar()._columns.with_dtypes(dtypes))
 
-        return cls(data_dict)
+    def to_csv(self, file_name: str, mode="w", chunk_size: int = 100_000):
+        """
+        Write the data set as a long csv file, as given by to_pandas.
+        When possible the rows are written in chunks of about chunk_size rows, so that the whole
+        frame is never built at once.
+        """
+        if not self._has_bulk_pandas_path():
+            self.to_pandas().to_csv(file_name, mode=mode)
+            return
+        columns = self._bulk_columns()
+        n_locations, n_periods = len(columns.locations), len(columns.period_range)
+        locations_per_chunk = max(1, chunk_size // max(n_periods, 1))
+        for start in range(0, max(n_locations, 1), locations_per_chunk):
+            chunk = columns.slice_locations(start, start + locations_per_chunk).to_pandas()
+            chunk.to_csv(file_name, mode=mode if start == 0 else "a", header=start == 0)
+
+    def to_parquet(self, file_name: str | Path, row_group_size: int = 100_000):
+        """
+        Write the data set as a parquet file with the same columns as to_csv. Fields with samples are
+        stored as a fixed size list column. Locations with different period ranges are padded with nan.
+        """
+        from .parquet import write_parquet
 
-    def to_csv(self, file_name: str, mode="w"):
-        self.to_pandas().to_csv(file_name, mode=mode)
+        write_parquet(self.to_columnar()._columns, file_name, row_group_size)
+
+    @classmethod
+    def from_parquet(
+        cls,
+        file_name: str | Path,
+        dataclass: type[FeaturesT],
+        locations: Iterable[Location] | None = None,
+        time_period: slice | None = None,
+        fill_missing=False,
+        dtypes: DtypePolicy = None,
+    ) -> "DataSet[FeaturesT]":
+        """
+        Read a parquet file written by to_parquet. Selecting locations or a time period is done when
+        reading, and row groups without matching rows are skipped.
+
+        Parameters
+        ----------
+        file_name : str | Path
+            The parquet file
+        dataclass : Type[FeaturesT]
+            The dataclass to use for the time series
+        locations : Iterable[Location], optional
+            Only read these locations
+        time_period : slice, optional
+            Only read the periods from time_period.start to time_period.stop, both inclusive
+        fill_missing : bool, optional
+            If missing values should be filled, by default False
+        dtypes : DtypePolicy, optional
+            The dtypes to convert the fields to. By default the stored dtypes are kept
+
+        Returns
+        -------
+        DataSet[FeaturesT]
+            The columnar DataSet
+        """
+        from .parquet import read_parquet
+
+        columns = read_parquet(file_name, dataclass, locations, time_period, fill_missing)
+        return cls._from_columnar(columns if dtypes is None else columns.with_dtypes(dtypes))
+
+    def to_store(self, path: str | Path):
+        """
+        Write the data set as a store directory with one .npy file per field and a json header,
+        which can be memory-mapped with open_store.
+        """
+        from .store import write_store
+
+        write_store(self.to_columnar()._columns, path)
+
+    @classmethod
+    def open_store(cls, path: str | Path, dataclass: type[FeaturesT] | None = None) -> "DataSet[FeaturesT]":
+        """
+        Memory-map a store written by to_store. Nothing is read until it is used, and
+        restrict_time_period, get_locations with consecutive locations and indexing by location give
+        views of the mapped files. Processes opening the same store share the page cache.
+
+        Parameters
+        ----------
+        path : str | Path
+            The store directory
+        dataclass : Type[FeaturesT], optional
+            The dataclass to use. By default the stored dataclass is looked up in chap_core.datatypes,
+            or created from the stored field names
+
+        Returns
+        -------
+        DataSet[FeaturesT]
+            The columnar DataSet, backed by read-only memory-mapped arrays
+        """
+        from .store import open_store
+
+        return cls._from_columnar(open_store(path, dataclass))
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the data set as a json header and one raw buffer per field, which is read back by
+        from_bytes without parsing or copying the fields
+        """
+        from .serialization import dumps
+
+        return dumps(self.to_columnar()._columns)
+
+    @classmethod
+    def from_bytes(cls, data, dataclass: type[FeaturesT] | None = None) -> "DataSet[FeaturesT]":
+        """Read data written by to_bytes. The field arrays are views of data, and read-only if data is bytes"""
+        from .serialization import loads
+
+        return cls._from_columnar(loads(data, dataclass))
+
+    def __reduce_ex__(self, protocol):
+        if not (self.is_ragged or self._has_shared_period_range()):
+            return self.__class__, (dict(self.items()),)
+        from .serialization import data_set_from_buffers, pickle_buffers
+
+        columns = self._ragged if self.is_ragged else self.to_columnar()._columns
+        header, buffers = pickle_buffers(columns, protocol)
+        field_dtypes = {name: field["dtype"] for name, field in header["fields"].items()}
+        dataclass = dataclass_reference(columns.dataclass, field_dtypes)
+        return data_set_from_buffers, (self.__class__, header, buffers, dataclass)
+
+    @classmethod
+    def from_file(cls, file_name: str | Path, dataclass: type[FeaturesT]) -> "DataSet[FeaturesT]":
+        """Read a .parquet file with from_parquet, and any other file as csv"""
+        if Path(file_name).suffix == ".parquet":
+            return cls.from_parquet(file_name, dataclass)
+        return cls.from_csv(file_name, dataclass)
+
+    def to_file(self, file_name: str | Path):
+        """Write to a .parquet file with to_parquet, and to any other file as csv"""
+        if Path(file_name).suffix == ".parquet":
+            self.to_parquet(file_name)
+        else:
+            self.to_csv(file_name)
 
     @classmethod
     def df_from_pydantic_observations(cls, observations: list[PeriodObservation]) -> TimeSeriesData:
@@ -287,16 +737,47 @@ class DataSet(Generic[FeaturesT]):
         return cls(data_dict)
 
     @classmethod
-    def from_csv(cls, file_name: str, dataclass: Type[FeaturesT]) -> "DataSet[FeaturesT]":
-        return cls.from_pandas(pd.read_csv(file_name), dataclass)
+    def from_csv(
+        cls, file_name: str, dataclass: type[FeaturesT], chunk_size: int | None = None, dtypes: DtypePolicy = None
+    ) -> "DataSet[FeaturesT]":
+        """
+        Read a long csv file as written by to_csv. If chunk_size is given, the file is streamed in chunks
+        of that many rows into preallocated field arrays, so that large files can be read without holding
+        the whole data frame in memory. The fields are converted to dtypes if given.
+        """
+        if chunk_size is not None and dataclass.from_pandas.__func__ is TimeSeriesData.from_pandas.__func__:
+            from .chunked_csv import read_csv_chunked
+
+            columns = read_csv_chunked(file_name, dataclass, chunk_size)
+            return cls._from_columnar(columns if dtypes is None else columns.with_dtypes(dtypes))
+        return cls.from_pandas(pd.read_csv(file_name), dataclass, dtypes=dtypes)
 
     def join_on_time(self, other: "DataSet[FeaturesT]") -> "DataSet[Tuple[FeaturesT, FeaturesT]]":
         """Join two SpatioTemporalDicts on time. Returns a new SpatioTemporalDict.
         Assumes other is later in time.
         """
+        if self.is_columnar and other.is_columnar and self._columns.locations == other._columns.locations:
+            columns, other_columns = self._columns, other._columns
+            fields = {
+                name: np.concatenate([values, other_columns.fields[name]], axis=1)
+                for name, values in columns.fields.items()
+            }
+            period_range = columns.period_range.concatenate(other_columns.period_range)
+            return self._from_columnar(columns.replace(period_range=period_range, fields=fields))
         return self.__class__({loc: self._data_dict[loc].join(other._data_dict[loc]) for loc in self.locations()})
 
-    def add_fields(self, new_type, **kwargs: dict[str, Callable]):
+    def add_fields(self, new_type=None, **kwargs: dict[str, Callable]):
+        """
+        Add fields computed from the data of each location. new_type defaults to the dataclass with the
+        new fields added as float fields. For a columnar data set the existing field arrays are shared
+        """
+        if self.is_columnar and len(self._columns.locations):
+            columns = self._columns
+            if new_type is None:
+                new_type = derived_dataclass(columns.dataclass, added_fields=tuple((key, float) for key in kwargs))
+            location_data = [columns.location_data(i) for i in range(len(columns.locations))]
+            new_fields = {key: np.stack([func(data) for data in location_data]) for key, func in kwargs.items()}
+            return self._from_columnar(columns.replace(dataclass=new_type, fields=columns.fields | new_fields))
         return self.__class__(
             {
                 loc: add_field(
@@ -309,36 +790,54 @@ class DataSet(Generic[FeaturesT]):
         )
 
     def remove_field(self, field_name, new_class=None):
+        if self.is_columnar:
+            columns = self._columns
+            if new_class is None:
+                new_class = remove_field(columns.dataclass, field_name)
+            fields = {name: values for name, values in columns.fields.items() if name != field_name}
+            return self._from_columnar(columns.replace(dataclass=new_class, fields=fields))
         return self.__class__({loc: remove_field(data.data(), field_name, new_class) for loc, data in self.items()})
 
+    @classmethod
+    def join(
+        cls, dataclass: type[TimeSeriesData], sources: dict[str, tuple["DataSet", str]], how: str = "inner"
+    ) -> "DataSet":
+        """
+        Join fields of several data sets into one columnar data set, aligned on location and period.
+
+        The locations are the intersection ('inner') or union ('outer') of the locations of the data sets and
+        the periods are the range covering all of them. Each field is allocated once and filled from its
+        data set with slice assignments, with nan where the data set has no value.
+
+        Parameters
+        ----------
+        dataclass : type[TimeSeriesData]
+            The dataclass of the joined data set
+        sources : dict[str, tuple[DataSet, str]]
+            For each field of dataclass, the data set to take it from and the name of the field there
+        how : str, optional
+            'inner' or 'outer', by default 'inner'
+
+        Returns
+        -------
+        DataSet
+            The joined columnar DataSet
+        """
+        converted = {}
+        for data_set, _ in sources.values():
+            if id(data_set) not in converted:
+                converted[id(data_set)] = data_set._columns if data_set.is_columnar else dict(data_set.items())
+        join_sources = {name: (converted[id(data_set)], field) for name, (data_set, field) in sources.items()}
+        return cls._from_columnar(join_columns(dataclass, join_sources, how))
+
     @classmethod
     def from_fields(
         cls,
         dataclass: type[TimeSeriesData],
         fields: dict[str, "DataSet[TimeSeriesArray]"],
     ):
-        start_timestamp = min(data.start_timestamp for data in fields.values())
-        end_timestamp = max(data.end_timestamp for data in fields.values())
-        period_range = PeriodRange(
-            start_timestamp,
-            end_timestamp,
-            fields[next(iter(fields))].period_range.delta,
-        )
-        new_dict = {}
-        field_names = list(fields.keys())
-        # all_locations = {location for field in fields.values() for location in field.keys()}
-        common_locations = set.intersection(*[set(field.keys()) for field in fields.values()])
-        # for field, data in fields.items():
-        #    assert set(data.keys()) == all_locations, (field, all_locations-set(data.keys()))
-        for location in common_locations:
-            new_dict[location] = dataclass(
-                period_range,
-                **{
-                    field: fields[field][location].fill_to_range(start_timestamp, end_timestamp).value
-                    for field in field_names
-                },
-            )
-        return cls(new_dict)
+        """Combine one TimeSeriesArray data set per field into a data set of dataclass, for the common locations"""
+        return cls.join(dataclass, {name: (field, "value") for name, field in fields.items()})
 
     def plot(self):
         for location, data in self.items():
@@ -1,5 +1,8 @@
+import dataclasses
 import functools
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from numbers import Number
 from typing import Union, Iterable, Tuple
 
@@ -8,7 +11,16 @@ import numpy as np
 import pandas as pd
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
-from pytz import utc
+
+from .iso_week import IsoWeekTable
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+
+def _day_ordinal(date: datetime) -> int:
+    """Number of days since 1970-01-01 (same origin as numpy's datetime64[D])"""
+    return date.toordinal() - _EPOCH_ORDINAL
 
 
 class DateUtilWrapper:
@@ -24,68 +36,215 @@ class DateUtilWrapper:
 
 
 class TimeStamp(DateUtilWrapper):
-    _used_attributes = ("year", "month", "day", "__str__", "__repr__")
-
-    @property
-    def week(self):
-        return self._date.isocalendar()[1]
+    """A point in time with day resolution, stored as the number of days since 1970-01-01"""
 
     def __init__(self, date: datetime):
-        self._date = date
+        self._days = _day_ordinal(date)
+
+    @classmethod
+    def _from_days(cls, days: int) -> "TimeStamp":
+        obj = cls.__new__(cls)
+        obj._days = int(days)
+        return obj
+
+    @property
+    def _date(self) -> datetime:
+        return _EPOCH + timedelta(days=self._days)
 
     @property
     def date(self) -> datetime:
         return self._date
 
+    @property
+    def year(self):
+        return _civil_from_days(self._days)[0]
+
+    @property
+    def month(self):
+        return _civil_from_days(self._days)[1]
+
+    @property
+    def day(self):
+        return _civil_from_days(self._days)[2]
+
+    @property
+    def week(self):
+        return self._date.isocalendar()[1]
+
     @classmethod
     def parse(cls, text_repr: str):
         return cls(parse(text_repr))
 
     def __le__(self, other: "TimeStamp"):
-        return self._comparison(other, "__le__")
+        return self._days <= other._days
 
     def __ge__(self, other: "TimeStamp"):
-        return self._comparison(other, "__ge__")
+        return self._days >= other._days
 
     def __gt__(self, other: "TimeStamp"):
-        return self._comparison(other, "__gt__")
+        return self._days > other._days
 
     def __lt__(self, other: "TimeStamp"):
-        return self._comparison(other, "__lt__")
+        return self._days < other._days
+
+    def __str__(self):
+        return str(self._date)
 
     def __repr__(self):
         return f"TimeStamp({self.year}-{self.month}-{self.day})"
 
     def __eq__(self, other):
-        return self._date == other._date
+        return self._days == other._days
+
+    def __hash__(self):
+        return hash(self._days)
 
     def __sub__(self, other: "TimeStamp"):
         if not isinstance(other, TimeStamp):
             return NotImplemented
-        return TimeDelta(relativedelta(self._date, other._date))
+        n_months = _relative_months(self._days, other._days)
+        remainder = self._days - _add_months(other._days, n_months)
+        return TimeDelta._from_parts(n_months, remainder, self._days - other._days)
+
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _is_leap_year(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    return _DAYS_IN_MONTH[month - 1] + (month == 2 and _is_leap_year(year))
+
+
+def _civil_from_days(days: int) -> tuple[int, int, int]:
+    """(year, month, day) for a day ordinal, using only integer arithmetic"""
+    days += 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = shifted_month + 3 if shifted_month < 10 else shifted_month - 9
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    """Day ordinal for a (year, month, day), using only integer arithmetic"""
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _relative_months(days: int, other_days: int) -> int:
+    """Whole months between two day ordinals, counted from other_days like dateutil's relativedelta"""
+    year, month, day = _civil_from_days(days)
+    other_year, other_month, other_day = _civil_from_days(other_days)
+    n_months = (year - other_year) * 12 + month - other_month
+    shifted_day = min(other_day, _days_in_month(year, month))
+    if days >= other_days and day < shifted_day:
+        n_months -= 1
+    elif days < other_days and day > shifted_day:
+        n_months += 1
+    return n_months
+
 
-    def _comparison(self, other: "TimeStamp", func_name: str):
-        return getattr(self._date.replace(tzinfo=utc), func_name)(other._date.replace(tzinfo=utc))
+def _add_months(days: int, n_months: int) -> int:
+    """Add n_months to a day ordinal, clipping the day to the end of the resulting month"""
+    if n_months == 0:
+        return days
+    year, month, day = _civil_from_days(days)
+    year, month = divmod(year * 12 + month - 1 + n_months, 12)
+    month += 1
+    return _days_from_civil(year, month, min(day, _days_in_month(year, month)))
+
+
+_PERIOD_CACHE_SIZE = 2**16
+_period_cache: OrderedDict[tuple[type, int], "TimePeriod"] = OrderedDict()
+_period_cache_lock = threading.Lock()
 
 
 class TimePeriod:
-    _used_attributes = ()
+    """
+    A single time period, identified by its class (frequency) and an integer ordinal.
+
+    Periods are immutable and hashable. Construction goes through a bounded intern cache keyed
+    by (class, ordinal), so creating the same period twice returns the same object.
+    """
+
+    __slots__ = ("_date", "_ordinal")
     _extension = None
+    _ordinal_unit = "D"
+    _ordinal_step = 1
+    _pandas_freq = "D"
 
-    def __init__(self, date: datetime | Number, *args, **kwargs):
-        if not isinstance(date, (datetime, TimeStamp)):
-            date = self.__date_from_numbers(date, *args, **kwargs)
+    def __new__(cls, date: datetime | Number, *args, **kwargs):
         if isinstance(date, TimeStamp):
-            date = date._date
-        self._date = date
+            return cls._from_ordinal(cls._ordinal_from_date(date._date))
+        if isinstance(date, datetime):
+            return cls._from_ordinal(cls._ordinal_from_date(date))
+        return cls._from_ordinal(cls._ordinal_from_numbers(date, *args, **kwargs))
+
+    @classmethod
+    def _from_ordinal(cls, ordinal: int) -> "TimePeriod":
+        ordinal = int(ordinal)
+        key = (cls, ordinal)
+        period = _period_cache.get(key)
+        if period is not None:
+            return period
+        new_period = object.__new__(cls)
+        object.__setattr__(new_period, "_ordinal", ordinal)
+        object.__setattr__(new_period, "_date", cls._date_from_ordinal(ordinal))
+        # Look up again under the lock, so threads creating the same period at once get the same object
+        with _period_cache_lock:
+            period = _period_cache.get(key)
+            if period is None:
+                if len(_period_cache) >= _PERIOD_CACHE_SIZE:
+                    # Evict the oldest entry. OrderedDict.popitem is O(1), while next(iter(...)) on a dict has to
+                    # skip the deleted slots at its front and becomes quadratic once the cache is full
+                    _period_cache.popitem(last=False)
+                _period_cache[key] = period = new_period
+        return period
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__._from_ordinal, (self._ordinal,)
+
+    def __hash__(self):
+        return hash((self.__class__, self._ordinal))
 
     @property
     def last_day(self):
         return self.end_timestamp - delta_day
 
     @classmethod
-    def __date_from_numbers(cls, year: int, month: int = 1, day: int = 1):
-        return datetime(int(year), int(month), int(day))
+    def _ordinal_from_numbers(cls, year: int, month: int = 1, day: int = 1) -> int:
+        return _day_ordinal(datetime(int(year), int(month), int(day)))
+
+    @classmethod
+    def _ordinal_from_date(cls, date: datetime) -> int:
+        return _day_ordinal(date)
+
+    @classmethod
+    def _date_from_ordinal(cls, ordinal: int) -> datetime:
+        return _EPOCH + timedelta(days=int(ordinal))
+
+    @classmethod
+    def _start_days(cls, ordinals: np.ndarray) -> np.ndarray:
+        """Day ordinals of the first day of each period in `ordinals`"""
+        return np.asarray(ordinals).astype(f"datetime64[{cls._ordinal_unit}]").astype("datetime64[D]").astype(np.int64)
+
+    @classmethod
+    def _ordinals_of_days(cls, days: np.ndarray) -> np.ndarray:
+        """Ordinals of the periods containing each day ordinal in `days`"""
+        return np.asarray(days).astype("datetime64[D]").astype(f"datetime64[{cls._ordinal_unit}]").astype(np.int64)
 
     @classmethod
     def from_id(cls, id: str):
@@ -107,47 +266,56 @@ class TimePeriod:
         return second_timestamp - first_timestamp
 
     def __eq__(self, other):
-        r = self._date == other._date
-        r2 = self._extension == other._extension
-        if not r or not r2:
-            pass
-        return r and r2
+        if not isinstance(other, TimePeriod):
+            return NotImplemented
+        return self.__class__ is other.__class__ and self._ordinal == other._ordinal
 
     def __le__(self, other: "TimePeriod"):
         if isinstance(other, TimeStamp):
-            return TimeStamp(self._date) <= other
-
-        return self._date < other._exclusive_end()
+            return self.start_timestamp <= other
+        if other.__class__ is self.__class__:
+            return self._ordinal < other._ordinal + self._ordinal_step
+        return self.start_timestamp < other.end_timestamp
 
     def __ge__(self, other: "TimePeriod"):
         if isinstance(other, TimeStamp):
-            return TimeStamp(self._exclusive_end()) > other
-        return self._exclusive_end() > other._date
+            return self.end_timestamp > other
+        if other.__class__ is self.__class__:
+            return self._ordinal + self._ordinal_step > other._ordinal
+        return self.end_timestamp > other.start_timestamp
 
     def __gt__(self, other: "TimePeriod"):
         if isinstance(other, TimeStamp):
-            return TimeStamp(self._date) > other
-        return self._date >= other._exclusive_end()
+            return self.start_timestamp > other
+        if other.__class__ is self.__class__:
+            return self._ordinal >= other._ordinal + self._ordinal_step
+        return self.start_timestamp >= other.end_timestamp
 
     def __lt__(self, other: "TimePeriod"):
         if isinstance(other, TimeStamp):
-            return TimeStamp(self._exclusive_end()) <= other
-        return self._exclusive_end() <= other._date
+            return self.end_timestamp <= other
+        if other.__class__ is self.__class__:
+            return self._ordinal + self._ordinal_step <= other._ordinal
+        return self.end_timestamp <= other.start_timestamp
 
     def __sub__(self, other: "TimePeriod"):
         if not isinstance(other, TimePeriod):
             return NotImplemented
         assert self._extension == other._extension
-        return TimeDelta(relativedelta(self._date, other._date))
+        return self.start_timestamp - other.start_timestamp
+
+    def _shifted(self, time_delta: "TimeDelta") -> "TimePeriod":
+        months, days = time_delta._months, time_delta._days
+        if self._ordinal_unit == "D" and months == 0:
+            return self._from_ordinal(self._ordinal + days)
+        if self._ordinal_unit == "M" and days == 0:
+            return self._from_ordinal(self._ordinal + months)
+        if self._ordinal_unit == "Y" and days == 0 and months % 12 == 0:
+            return self._from_ordinal(self._ordinal + months // 12)
+        return self.__class__(time_delta + self.start_timestamp)
 
     def _exclusive_end(self):
-        return self._date + self._extension
-
-    def __getattr__(self, item):
-        if item in self._used_attributes:
-            return getattr(self._date, item)
-        # return self.__getattribute__(item)
-        return super().__getattribute__(item)
+        return self._date_from_ordinal(self._ordinal + self._ordinal_step)
 
     @property
     def time_delta(self) -> "TimeDelta":
@@ -171,9 +339,22 @@ class TimePeriod:
             return Month(date)
         return Year(date)
 
+    @classmethod
+    def _to_pandas_ordinals(cls, ordinals):
+        """Convert period ordinals to the ordinals pandas uses for _pandas_freq"""
+        return ordinals
+
+    @classmethod
+    def _from_pandas_ordinals(cls, pandas_ordinals):
+        """Convert pandas period ordinals of _pandas_freq to period ordinals"""
+        return pandas_ordinals
+
     @classmethod
     def from_pandas(cls, period: pd.Period):
-        return cls.parse(str(period))
+        period_class = _pandas_period_classes.get(period.freqstr)
+        if period_class is None:
+            return cls.parse(str(period))
+        return period_class._from_ordinal(period_class._from_pandas_ordinals(period.ordinal))
 
     @classmethod
     def parse_week(cls, week: str):
@@ -189,23 +370,32 @@ class TimePeriod:
 
     @property
     def start_timestamp(self):
-        return TimeStamp(self._date)
+        return TimeStamp._from_days(_day_ordinal(self._date))
 
     @property
     def end_timestamp(self):
-        return TimeStamp(self._exclusive_end())
+        return TimeStamp._from_days(_day_ordinal(self._exclusive_end()))
 
 
 class Day(TimePeriod):
-    _used_attributes = ["year", "month", "day"]
+    __slots__ = ()
     _extension = relativedelta(days=1)
 
+    @property
+    def year(self):
+        return self._date.year
+
+    @property
+    def month(self):
+        return self._date.month
+
+    @property
+    def day(self):
+        return self._date.day
+
     def __repr__(self):
         return f"Day({self.year}-{self.month}-{self.day})"
 
-    def id(self):
-        return self._date.strftime("%Y%m%d")
-
     def topandas(self):
         return pd.Period(year=self.year, month=self.month, day=self.day, freq="D")
 
@@ -218,19 +408,23 @@ class Day(TimePeriod):
 
 
 class WeekNumbering:
-    @staticmethod
-    def get_week_info(date: datetime) -> Tuple[int, int, int]:
-        return date.isocalendar()
+    table = IsoWeekTable()
 
-    @staticmethod
-    def get_date(year: int, week: int, day: int) -> datetime:
-        return datetime.strptime(f"{year}-W{week}-{day}", "%G-W%V-%w")
+    @classmethod
+    def get_week_info(cls, date: datetime) -> Tuple[int, int, int]:
+        return (*cls.table.year_and_week_of_day(_day_ordinal(date)), date.isoweekday())
+
+    @classmethod
+    def get_date(cls, year: int, week: int, day: int) -> datetime:
+        return _EPOCH + timedelta(days=cls.table.week_start_day(year, week) + (day - 1) % 7)
 
 
 class Week(TimePeriod):
-    _used_attributes = []  #'year']
+    __slots__ = ()
     _extension = relativedelta(weeks=1)
     _week_numbering = WeekNumbering
+    _ordinal_step = 7
+    _pandas_freq = "W-MON"
 
     @property
     def id(self):
@@ -239,56 +433,78 @@ class Week(TimePeriod):
     def to_string(self):
         return f"{self.year}W{self.week}"
 
-    def __init__(self, date, *args, **kwargs):
-        if args or kwargs:
-            year = date
-            week_nr = args[0] if args else kwargs["week"]
-            self._date = self.__date_from_numbers(year, week_nr)
-            self.week = week_nr
-            self.year = year
-            # self.year = self._date.year
-        else:
-            if isinstance(date, TimeStamp):
-                date = date._date
-            year, week, day = date.isocalendar()
-            self.week = week
-            self.year = year
+    @property
+    def year(self):
+        return self._week_numbering.table.year_and_week_of_day(self._ordinal)[0]
+
+    @property
+    def week(self):
+        return self._week_numbering.table.year_and_week_of_day(self._ordinal)[1]
 
-            self._date = date
+    @classmethod
+    def _ordinal_from_numbers(cls, year: int, week: int) -> int:
+        return cls._week_numbering.table.week_start_day(int(year), int(week))
+
+    @classmethod
+    def _ordinals_of_days(cls, days: np.ndarray) -> np.ndarray:
+        days = np.asarray(days)
+        return days - (days + 3) % 7
 
     def __sub__(self, other: "TimePeriod"):
         if not isinstance(other, TimePeriod):
             return NotImplemented
         assert self._extension == other._extension
-        return TimeDelta(self._date - other._date)
+        return TimeDelta._from_parts(0, self._ordinal - other._ordinal)
 
     def __str__(self):
         return f"{self.year}W{self.week}"
 
     __repr__ = __str__
 
-    def __date_from_numbers(self, year: int, week_nr: int):
-        date = self._week_numbering.get_date(year, week_nr, 1)
-        # date = datetime.strptime(f'{year}-W{week_nr}-1', "%Y-W%W-%w")
-        assert date.isocalendar()[:2] == (year, week_nr), (
-            date.isocalendar()[:2],
-            year,
-            week_nr,
-        )
-        return date
-
     @classmethod
     def _isocalendar_week_to_date(cls, year: int, week_nr: int, day: int):
         return datetime.strptime(f"{year}-W{week_nr}-{day}", "%Y-W%V-%w")
 
+    @classmethod
+    def _to_pandas_ordinals(cls, ordinals):
+        # A week is converted to the W-MON period containing its first day, i.e. the period ending on that monday
+        return (ordinals + 2) // 7 + 1
+
+    @classmethod
+    def _from_pandas_ordinals(cls, pandas_ordinals):
+        return pandas_ordinals * 7 - 3
+
     def topandas(self):
-        # return self.__str__()
-        return pd.Period(self._date, freq="W-MON")
+        return pd.Period(ordinal=self._to_pandas_ordinals(self._ordinal), freq=self._pandas_freq)
 
 
 class Month(TimePeriod):
-    _used_attributes = ["year", "month"]
+    __slots__ = ()
     _extension = relativedelta(months=1)
+    _ordinal_unit = "M"
+    _pandas_freq = "M"
+
+    @property
+    def year(self):
+        return 1970 + self._ordinal // 12
+
+    @property
+    def month(self):
+        return self._ordinal % 12 + 1
+
+    @classmethod
+    def _ordinal_from_numbers(cls, year: int, month: int = 1) -> int:
+        if not 1 <= month <= 12:
+            raise ValueError(f"month must be in 1..12, not {month}")
+        return (int(year) - 1970) * 12 + int(month) - 1
+
+    @classmethod
+    def _ordinal_from_date(cls, date: datetime) -> int:
+        return (date.year - 1970) * 12 + date.month - 1
+
+    @classmethod
+    def _date_from_ordinal(cls, ordinal: int) -> datetime:
+        return datetime(1970 + int(ordinal) // 12, int(ordinal) % 12 + 1, 1)
 
     @property
     def id(self):
@@ -305,8 +521,26 @@ class Month(TimePeriod):
 
 
 class Year(TimePeriod):
-    _used_attributes = ["year"]
+    __slots__ = ()
     _extension = relativedelta(years=1)
+    _ordinal_unit = "Y"
+    _pandas_freq = "Y"
+
+    @property
+    def year(self):
+        return 1970 + self._ordinal
+
+    @classmethod
+    def _ordinal_from_numbers(cls, year: int) -> int:
+        return int(year) - 1970
+
+    @classmethod
+    def _ordinal_from_date(cls, date: datetime) -> int:
+        return date.year - 1970
+
+    @classmethod
+    def _date_from_ordinal(cls, ordinal: int) -> datetime:
+        return datetime(1970 + int(ordinal), 1, 1)
 
     @property
     def id(self):
@@ -322,94 +556,242 @@ class Year(TimePeriod):
         return f"{self.year}"
 
 
+_pandas_period_classes = {"D": Day, "W-MON": Week, "M": Month, "Y": Year, "Y-DEC": Year, "A-DEC": Year}
+
+
 class TimeDelta(DateUtilWrapper):
+    """
+    A calendar duration stored as a number of months and a number of days.
+
+    Deltas that result from subtracting two TimeStamps also remember the exact number of days
+    between them, so that they can be divided by day based deltas.
+    """
+
     def __init__(self, relative_delta: relativedelta):
-        self._relative_delta = relative_delta
-        self._date = None
+        self._months = relative_delta.years * 12 + relative_delta.months
+        self._days = relative_delta.days
+        self._span = None
+
+    @classmethod
+    def _from_parts(cls, months: int, days: int, span: int | None = None) -> "TimeDelta":
+        obj = cls.__new__(cls)
+        obj._months = months
+        obj._days = days
+        obj._span = span
+        return obj
+
+    @property
+    def _relative_delta(self) -> relativedelta:
+        return relativedelta(months=self._months, days=self._days)
 
     def __eq__(self, other):
-        return self._relative_delta == other._relative_delta
+        return self._months == other._months and self._days == other._days
+
+    def __hash__(self):
+        return hash((self._months, self._days))
+
+    def _add_to_days(self, days: int, sign: int = 1) -> int:
+        return _add_months(days, sign * self._months) + sign * self._days
 
     def __add__(self, other: Union[TimeStamp, TimePeriod]):
-        if not isinstance(other, (TimeStamp, TimePeriod)):
-            return NotImplemented
-        return other.__class__(other._date + self._relative_delta)
+        if isinstance(other, TimeStamp):
+            return TimeStamp._from_days(self._add_to_days(other._days))
+        if isinstance(other, TimePeriod):
+            return other._shifted(self)
+        return NotImplemented
 
     def __radd__(self, other: Union[TimeStamp, TimePeriod]):
         return self.__add__(other)
 
     def __sub__(self, other: Union[TimeStamp, TimePeriod]):
-        if not isinstance(other, (TimeStamp, TimePeriod)):
-            return NotImplemented
-        return other.__class__(other._date - self._relative_delta)
+        if isinstance(other, TimeStamp):
+            return TimeStamp._from_days(self._add_to_days(other._days, -1))
+        if isinstance(other, TimePeriod):
+            return other._shifted(self * -1)
+        return NotImplemented
 
     def __rsub__(self, other: Union[TimeStamp, TimePeriod]):
         return self.__sub__(other)
 
     def __mul__(self, other: int):
-        return self.__class__(self._relative_delta * other)
+        return self._from_parts(self._months * other, self._days * other)
 
     def __rmul__(self, other: int):
         return self.__mul__(other)
 
     def _n_months(self):
-        return self._relative_delta.months + 12 * self._relative_delta.years
+        return self._months
 
     def __floordiv__(self, divident: "TimeDelta"):
-        if divident._relative_delta.days != 0:
-            for name in ("months", "years"):
-                assert not getattr(divident._relative_delta, name, 0) > 0, f"Cannot divide by {divident}"
-                assert not getattr(self._relative_delta, name, 0) > 0, f"Cannot divide {self} by {divident}"
-
-            # assert divident._relative_delta.months == 0 and divident._relative_delta.years == 0, f'Cannot divide by {divident}'
-            # assert self._relative_delta.months == 0 and self._relative_delta.years == 0, f'Cannot divide {self} by {divident}'
-            return self._relative_delta.days // divident._relative_delta.days
-
-        return self._n_months() // divident._n_months()
+        if divident._days != 0:
+            assert divident._months == 0, f"Cannot divide by {divident}"
+            if self._months != 0:
+                assert self._span is not None, f"Cannot divide {self} by {divident}"
+                return self._span // divident._days
+            return self._days // divident._days
+        return self._months // divident._months
 
     def __mod__(self, other: "TimeDelta"):
-        assert other._relative_delta.days == 0
-        return self.__class__(relativedelta(months=self._n_months() % other._n_months()))
+        assert other._days == 0
+        return self._from_parts(self._months % other._months, 0)
 
     def __repr__(self):
         return f"TimeDelta({self._relative_delta})"
 
     def n_periods(self, start_stamp: TimeStamp, end_stamp: TimeStamp):
-        assert (
-            sum(bool(getattr(self._relative_delta, name, 0)) for name in ("days", "months", "years")) == 1
-        ), f"Cannot get number of periods for {self}"
-        if self._relative_delta.days != 0:
-            n_days_diff = (end_stamp.date - start_stamp.date).days
-            return n_days_diff // self._relative_delta.days
-        if self._relative_delta.weeks != 0:
-            n_days_diff = (end_stamp.date - start_stamp.date).days
-            return n_days_diff // (self._relative_delta.weeks * 7)
-        if self._relative_delta.months != 0 or self._relative_delta.years != 0:
-            return (end_stamp - start_stamp) // self
+        assert (self._months != 0) != (self._days != 0), f"Cannot get number of periods for {self}"
+        if self._days != 0:
+            return (end_stamp._days - start_stamp._days) // self._days
+        return _relative_months(end_stamp._days, start_stamp._days) // self._months
+
+
+@dataclasses.dataclass
+class GapReport:
+    """
+    Describes how a sequence of period ordinals deviates from a consecutive range.
+
+    missing holds indices into the range from the first to the last period that have no period in the
+    sequence. duplicates and out_of_order hold positions in the sequence that repeat, or come before,
+    the preceding period.
+    """
+
+    n_periods: int
+    missing: np.ndarray
+    duplicates: np.ndarray
+    out_of_order: np.ndarray
+
+    @classmethod
+    def from_ordinals(cls, ordinals: np.ndarray, step: int = 1) -> "GapReport":
+        diff = np.diff(ordinals)
+        duplicates = np.flatnonzero(diff == 0) + 1
+        out_of_order = np.flatnonzero(diff < 0) + 1
+        n_periods = (ordinals[-1] - ordinals[0]) // step + 1 if len(ordinals) else 0
+        if len(out_of_order) or np.all(diff == step):
+            return cls(int(n_periods), np.array([], dtype=int), duplicates, out_of_order)
+        mask = np.full(n_periods, True)
+        mask[(ordinals - ordinals[0]) // step] = False
+        return cls(int(n_periods), np.flatnonzero(mask), duplicates, out_of_order)
+
+    @property
+    def is_consecutive(self) -> bool:
+        return not (len(self.missing) or len(self.duplicates) or len(self.out_of_order))
+
+    def check(self, allow_missing=False):
+        """Raise a ValueError describing the gaps unless the periods are consecutive"""
+        if len(self.duplicates) or len(self.out_of_order) or (len(self.missing) and not allow_missing):
+            raise ValueError(f"Periods must be consecutive. {self}")
+
+    @staticmethod
+    def _summarize(name: str, indices: np.ndarray, n_shown=5) -> str:
+        shown = ", ".join(str(i) for i in indices[:n_shown]) + (", ..." if len(indices) > n_shown else "")
+        return f"{len(indices)} {name} ({shown})"
+
+    def __str__(self):
+        parts = [
+            self._summarize(name, indices)
+            for name, indices in [
+                ("missing", self.missing),
+                ("duplicates", self.duplicates),
+                ("out of order", self.out_of_order),
+            ]
+            if len(indices)
+        ]
+        return f"GapReport({', '.join(parts) or 'consecutive'})"
 
 
 class PeriodRange:
+    """
+    A consecutive range of time periods with the same frequency.
+
+    The range is stored as the integer ordinal of its first period together with the number of periods.
+    Ordinals count months, years or days since 1970 (the same origin as numpy's datetime64), and
+    weeks are represented by the day ordinal of their first day. All vectorized operations are
+    computed directly from these ordinals without creating TimePeriod objects.
+    """
+
     def __init__(
         self,
         start_timestamp: TimeStamp,
         end_timestamp: TimeStamp,
         time_delta: TimeDelta,
     ):
-        self._start_timestamp = start_timestamp
-        self._end_timestamp = end_timestamp
+        period_class = self._get_period_class(time_delta)
+        start_ordinal = period_class._ordinal_from_date(start_timestamp.date)
+        end_ordinal = period_class._ordinal_from_date(end_timestamp.date)
+        self._set_ordinals(
+            period_class,
+            start_ordinal,
+            (end_ordinal - start_ordinal) // period_class._ordinal_step,
+            time_delta,
+        )
+
+    def _set_ordinals(self, period_class: type[TimePeriod], start_ordinal: int, n_periods: int, time_delta: TimeDelta):
+        self._period_class = period_class
+        self._start_ordinal = int(start_ordinal)
+        self._n_periods = int(n_periods)
         self._time_delta = time_delta
 
+    @classmethod
+    def _from_start_ordinal(
+        cls, period_class: type[TimePeriod], start_ordinal: int, n_periods: int, time_delta: TimeDelta
+    ) -> "PeriodRange":
+        obj = cls.__new__(cls)
+        obj._set_ordinals(period_class, start_ordinal, n_periods, time_delta)
+        return obj
+
+    @staticmethod
+    def _get_period_class(time_delta: "TimeDelta") -> type[TimePeriod]:
+        if time_delta == delta_month:
+            return Month
+        elif time_delta == delta_year:
+            return Year
+        elif time_delta == delta_day:
+            return Day
+        elif time_delta == delta_week:
+            return Week
+        raise ValueError(f"Unknown time delta {time_delta}")
+
+    @property
+    def ordinals(self) -> np.ndarray:
+        """The integer ordinal of each period in the range"""
+        step = self._period_class._ordinal_step
+        return self._start_ordinal + step * np.arange(self._n_periods, dtype=np.int64)
+
+    @property
+    def _end_ordinal(self) -> int:
+        return self._start_ordinal + self._period_class._ordinal_step * self._n_periods
+
+    def _start_days(self) -> np.ndarray:
+        return self._period_class._start_days(self.ordinals)
+
+    def _end_days(self) -> np.ndarray:
+        return self._period_class._start_days(self.ordinals + self._period_class._ordinal_step)
+
+    @property
+    def _start_timestamp(self) -> TimeStamp:
+        return TimeStamp(self._period_class._date_from_ordinal(self._start_ordinal))
+
+    @property
+    def _end_timestamp(self) -> TimeStamp:
+        return TimeStamp(self._period_class._date_from_ordinal(self._end_ordinal))
+
     @property
     def month(self):
-        return np.array([p.start_timestamp.month for p in self])
+        if self._period_class._ordinal_unit == "M":
+            return self.ordinals % 12 + 1
+        return self._start_days().astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12 + 1
 
     @property
     def year(self):
-        return np.array([p.start_timestamp.year for p in self])
+        if self._period_class._ordinal_unit == "Y":
+            return self.ordinals + 1970
+        if self._period_class._ordinal_unit == "M":
+            return self.ordinals // 12 + 1970
+        return self._start_days().astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
 
     @property
     def week(self):
-        return np.array([p.start_timestamp.week for p in self])
+        return Week._week_numbering.table.year_and_week(self._start_days())[1]
 
     @property
     def delta(self):
@@ -418,33 +800,59 @@ class PeriodRange:
     @classmethod
     def from_time_periods(cls, start_period: TimePeriod, end_period: TimePeriod):
         assert start_period.time_delta == end_period.time_delta
-        return cls(
-            TimeStamp(start_period._date),
-            TimeStamp(end_period._exclusive_end()),
-            start_period.time_delta,
-        )
+        period_class = cls._get_period_class(start_period.time_delta)
+        start_ordinal = start_period._ordinal
+        n_periods = (end_period._ordinal - start_ordinal) // period_class._ordinal_step + 1
+        return cls._from_start_ordinal(period_class, start_ordinal, n_periods, start_period.time_delta)
 
     @classmethod
     def from_timestamps(cls, start_timestamp: TimeStamp, end_timestamp: TimeStamp, time_delta: TimeDelta):
         return cls(start_timestamp, end_timestamp, time_delta)
 
     def __len__(self):
-        if self._time_delta._relative_delta.days != 0:
-            assert self._time_delta._relative_delta.months == 0 and self._time_delta._relative_delta.years == 0
-            days = (self._end_timestamp._date - self._start_timestamp._date).days
-            return days // self._time_delta._relative_delta.days
-        delta = relativedelta(self._end_timestamp._date, self._start_timestamp._date)
-        return TimeDelta(delta) // self._time_delta
+        return self._n_periods
 
     def __eq__(self, other: TimePeriod) -> np.ndarray[bool]:
         """Check each period in the range for equality to the given period"""
         return self._vectorize("__eq__", other)
 
-    def _vectorize(self, funcname: str, other: TimePeriod):
+    def _other_ordinals(self, other):
         if isinstance(other, PeriodRange):
             assert len(self) == len(other)
-            return np.array([getattr(period, funcname)(other_period) for period, other_period in zip(self, other)])
-        return np.array([getattr(period, funcname)(other) for period in self])
+            return other.ordinals
+        return other._ordinal
+
+    def _other_days(self, other) -> tuple:
+        """First day and exclusive last day of other (scalars, or arrays for a PeriodRange)"""
+        if isinstance(other, TimeStamp):
+            day = _day_ordinal(other.date)
+            return day, day
+        if isinstance(other, PeriodRange):
+            assert len(self) == len(other)
+            return other._start_days(), other._end_days()
+        start = _day_ordinal(other._date)
+        return start, _day_ordinal(other._exclusive_end())
+
+    def _vectorize(self, funcname: str, other: TimePeriod):
+        if funcname in ("__eq__", "__ne__"):
+            if isinstance(other, PeriodRange):
+                other_class = other._period_class
+            else:
+                other_class = other.__class__
+            if other_class is not self._period_class:
+                return np.full(len(self), funcname == "__ne__")
+            return getattr(self.ordinals, funcname)(self._other_ordinals(other))
+        other_start, other_end = self._other_days(other)
+        is_timestamp = isinstance(other, TimeStamp)
+        if funcname == "__le__":
+            return self._start_days() <= other_start if is_timestamp else self._start_days() < other_end
+        if funcname == "__ge__":
+            return self._end_days() > other_start
+        if funcname == "__gt__":
+            return self._start_days() > other_start if is_timestamp else self._start_days() >= other_end
+        if funcname == "__lt__":
+            return self._end_days() <= other_start
+        raise ValueError(f"Unknown comparison {funcname}")
 
     def __ne__(self, other: TimePeriod) -> np.ndarray[bool]:
         """Check each period in the range for inequality to the given period"""
@@ -455,102 +863,68 @@ class PeriodRange:
     __gt__ = functools.partialmethod(_vectorize, "__gt__")
     __ge__ = functools.partialmethod(_vectorize, "__ge__")
 
-    @property
-    def _period_class(self):
-        if self._time_delta == delta_month:
-            return Month
-        elif self._time_delta == delta_year:
-            return Year
-        elif self._time_delta == delta_day:
-            return Day
-        elif self._time_delta == delta_week:
-            return Week
-        raise ValueError(f"Unknown time delta {self._time_delta}")
-
     def __iter__(self):
-        return (self._period_class((self._start_timestamp + self._time_delta * i)._date) for i in range(len(self)))
+        return (self._period_class._from_ordinal(ordinal) for ordinal in self.ordinals.tolist())
 
     def __getitem__(self, item: slice | int):
         """Slice by numeric index in the period range"""
         if isinstance(item, Number):
             if item < 0:
                 item += len(self)
-            return self._period_class((self._start_timestamp + self._time_delta * item)._date)
+            return self._period_class._from_ordinal(self._start_ordinal + self._period_class._ordinal_step * item)
         assert item.step is None
-        start = self._start_timestamp
-        end = self._end_timestamp
-        if item.stop is not None:
-            if item.stop < 0:
-                end -= self._time_delta * abs(item.stop)
-            else:
-                end = start + self._time_delta * item.stop  # Not sure about the logic here, test more
-
-        if item.start is not None:
-            offset = item.start if item.start >= 0 else len(self) + item.start
-            start = start + self._time_delta * offset
-        if start > end:
+        start, stop, _ = item.indices(len(self))
+        if start > stop:
             raise ValueError(f"Invalid slice {item} for period range {self} of length {len(self)}")
-        return PeriodRange(start, end, self._time_delta)
+        return self._from_start_ordinal(
+            self._period_class,
+            self._start_ordinal + self._period_class._ordinal_step * start,
+            stop - start,
+            self._time_delta,
+        )
 
-    def topandas(self):
-        if self._time_delta == delta_month:
-            return pd.Series([pd.Period(year=p.year, month=p.month, freq="M") for p in self])
-        elif self._time_delta == delta_year:
-            return pd.Series([pd.Period(year=p.year, freq="Y") for p in self])
-        elif self._time_delta == delta_day:
-            return pd.Series([pd.Period(year=p.year, month=p.month, day=p.day, freq="D") for p in self])
-        elif self._time_delta == delta_week:
-            return pd.Series([p.topandas() for p in self])
-        else:
-            raise ValueError(f"Cannot convert period range with time delta {self._time_delta} to pandas")
+    def _pandas_array(self, n_repeats: int = 1) -> pd.arrays.PeriodArray:
+        """The periods as a pandas PeriodArray, repeated n_repeats times after each other"""
+        period_class = self._period_class
+        pandas_ordinals = period_class._to_pandas_ordinals(self.ordinals)
+        if n_repeats != 1:
+            pandas_ordinals = np.tile(pandas_ordinals, n_repeats)
+        return pd.arrays.PeriodArray(pandas_ordinals, dtype=pd.PeriodDtype(period_class._pandas_freq))
 
-    def to_period_index(self):
-        return pd.period_range(
-            start=self[0].topandas(),
-            end=self[-1].topandas(),
-            freq=self[-1].topandas().freq,
-        )
+    def topandas(self) -> pd.Series:
+        """The periods as a pandas Series of periods, built directly from the ordinals"""
+        return pd.Series(self._pandas_array())
 
-    @classmethod
-    def from_pandas(cls, periods: Iterable[pd.Period]):
-        time_deltas = {"M": delta_month, "Y": delta_year, "D": delta_day}
-        periods = list(periods)
-        if not len(periods):
-            raise ValueError("Cannot create a period range from an empty list")
-        frequency = periods[0].freqstr
-        time_delta = time_deltas[frequency]
-        assert all(p.freqstr == frequency for p in periods), f"All periods must have the same frequency {periods}"
-        time_periods = [TimePeriod.parse(str(period)) for period in periods]
-        cls._check_consequtive(time_delta, time_periods)
-        return cls.from_time_periods(time_periods[0], time_periods[-1])
+    def to_period_index(self) -> pd.PeriodIndex:
+        return pd.PeriodIndex(self._pandas_array())
 
     @classmethod
-    def _check_consequtive_weeks(cls, time_periods, fill_missing=False):
-        period_range = pd.period_range(start=time_periods[0]._date, end=time_periods[-1]._date, freq="W")
-        # start
-        if not all(is_consective):
-            ...
+    def from_pandas(cls, periods: Iterable[pd.Period]):
+        """
+        Create a PeriodRange from consecutive pandas periods (a PeriodIndex, a Series of periods or a list).
+
+        The pandas ordinals are converted to period ordinals without creating any period objects.
+        W-MON periods are the inverse of topandas for weeks, other weekly anchors are mapped to the
+        week starting on the first day of the pandas period.
+        """
+        index = pd.PeriodIndex(periods)
+        frequency = index.freqstr
+        period_class = _pandas_period_classes.get(frequency)
+        if period_class is not None:
+            ordinals = period_class._from_pandas_ordinals(index.asi8)
+        elif frequency.startswith("W-"):
+            period_class = Week
+            ordinals = index.start_time.to_numpy().astype("datetime64[D]").astype(np.int64)
+        else:
+            raise ValueError(f"Cannot convert pandas periods with frequency {frequency} to a period range")
+        return cls.from_ordinals(period_class, ordinals)
 
     @classmethod
     def _check_consequtive(cls, time_delta, time_periods, fill_missing=False):
-        # if time_delta == delta_week:
-        # return cls._check_consequtive_weeks(time_periods, fill_missing)
-        is_consec = [p2 == p1 + time_delta for p1, p2 in zip(time_periods, time_periods[1:])]
-        if not all(is_consec):
-            if fill_missing:
-                indices = [(p - time_periods[0]) // time_delta for p in time_periods][:-1]
-                mask = np.full((time_periods[-1] - time_periods[0]) // time_delta, True)
-                mask[indices] = False
-                return np.flatnonzero(mask)
-
-            print(f"Periods {time_periods}")
-            mask = ~np.array(list(is_consec))
-            print(mask)
-            for wrong in np.flatnonzero(mask):
-                print(f"Wrong period {time_periods[wrong], time_periods[wrong + 1]} with time delta {time_delta}")
-                print(time_periods[wrong] + time_delta, time_periods[wrong + 1])
-            raise ValueError("Periods must be consecutive.")
-        return []
+        ordinals = np.fromiter((period._ordinal for period in time_periods), dtype=np.int64, count=len(time_periods))
+        report = GapReport.from_ordinals(ordinals, cls._get_period_class(time_delta)._ordinal_step)
+        report.check(fill_missing)
+        return report.missing
 
     @classmethod
     def _get_delta(cls, periods: list[TimePeriod]):
@@ -561,13 +935,35 @@ class PeriodRange:
 
     @classmethod
     def from_strings(cls, period_strings: Iterable[str], fill_missing=False):
-        periods = [TimePeriod.parse(period_string) for period_string in period_strings]
-        return cls.from_period_list(fill_missing, periods)
+        from .period_parsing import parse_period_strings
+
+        period_class, ordinals = parse_period_strings(period_strings)
+        return cls.from_ordinals(period_class, ordinals, fill_missing)
 
     @classmethod
     def from_ids(cls, ids: Iterable[str], fill_missing=False):
-        periods = [TimePeriod.from_id(id) for id in ids]
-        return cls.from_period_list(fill_missing, periods)
+        from .period_parsing import parse_period_strings
+
+        period_class, ordinals = parse_period_strings(ids)
+        return cls.from_ordinals(period_class, ordinals, fill_missing)
+
+    @classmethod
+    def from_ordinals(cls, period_class: type[TimePeriod], ordinals: np.ndarray, fill_missing=False):
+        """
+        Create a period range from the ordinals of a sorted sequence of periods.
+        If fill_missing is True, gaps are allowed and the indices of the missing periods are returned as well.
+        """
+        ordinals = np.asarray(ordinals)
+        if not len(ordinals):
+            raise ValueError("Cannot create a period range from an empty list")
+        step = period_class._ordinal_step
+        report = GapReport.from_ordinals(ordinals, step)
+        report.check(fill_missing)
+        time_delta = TimeDelta(period_class._extension)
+        ret = cls._from_start_ordinal(period_class, ordinals[0], report.n_periods, time_delta)
+        if fill_missing:
+            return ret, report.missing
+        return ret
 
     @classmethod
     def from_start_and_n_periods(cls, start_period: pd.Period, n_periods: int):
@@ -580,19 +976,11 @@ class PeriodRange:
 
     @classmethod
     def from_period_list(cls, fill_missing, periods):
-        delta = cls._get_delta(periods)
-        missing = cls._check_consequtive(delta, periods, fill_missing)
-        ret = cls.from_time_periods(periods[0], periods[-1])
-        if fill_missing:
-            assert len(ret) == len(missing) + len(periods), (
-                len(ret),
-                len(missing),
-                len(periods),
-                periods,
-                missing,
-            )
-            return ret, missing
-        return ret
+        period_class = periods[0].__class__
+        if not all(period.__class__ is period_class for period in periods):
+            raise ValueError(f"All periods must have the same time delta {periods[:5]}...")
+        ordinals = np.fromiter((period._ordinal for period in periods), dtype=np.int64, count=len(periods))
+        return cls.from_ordinals(period_class, ordinals, fill_missing)
 
     @property
     def shape(self):
@@ -606,8 +994,7 @@ class PeriodRange:
         if side not in ("left", "right"):
             raise ValueError(f"Invalid side {side}")
         assert period.time_delta == self._time_delta, (period, self._time_delta)
-        n_steps = self._time_delta.n_periods(self._start_timestamp, period.start_timestamp)
-        # n_steps = TimeDelta(relativedelta(period._date, self._start_timestamp._date)) // self._time_delta
+        n_steps = (period._ordinal - self._start_ordinal) // self._period_class._ordinal_step
         if side == "right":
             n_steps += 1
         n_steps = min(max(0, n_steps), len(self))  # if period is outside
@@ -615,8 +1002,89 @@ class PeriodRange:
 
     def concatenate(self, other: "PeriodRange") -> "PeriodRange":
         assert self._time_delta == other._time_delta
-        assert other._start_timestamp == self._end_timestamp, "Can only concnatenate when other starts where self ends"
-        return PeriodRange(self._start_timestamp, other._end_timestamp, self._time_delta)
+        assert other._start_ordinal == self._end_ordinal, "Can only concnatenate when other starts where self ends"
+        return self._from_start_ordinal(
+            self._period_class, self._start_ordinal, len(self) + len(other), self._time_delta
+        )
+
+    def _check_aligned(self, other: "PeriodRange | TimePeriod"):
+        if isinstance(other, PeriodRange):
+            other_class, other_start = other._period_class, other._start_ordinal
+        elif isinstance(other, TimePeriod):
+            other_class, other_start = other.__class__, other._ordinal
+        else:
+            raise TypeError(f"Cannot compare {self} with {other}")
+        step = self._period_class._ordinal_step
+        if other_class is not self._period_class or (other_start - self._start_ordinal) % step:
+            raise ValueError(f"Periods of {other} are not aligned with {self}")
+
+    def _with_ordinal_bounds(self, start_ordinal: int, end_ordinal: int) -> "PeriodRange":
+        n_periods = max(0, (end_ordinal - start_ordinal) // self._period_class._ordinal_step)
+        return self._from_start_ordinal(self._period_class, start_ordinal, n_periods, self._time_delta)
+
+    def overlaps(self, other: "PeriodRange") -> bool:
+        """Check if the two ranges have at least one period in common"""
+        self._check_aligned(other)
+        return max(self._start_ordinal, other._start_ordinal) < min(self._end_ordinal, other._end_ordinal)
+
+    def contains(self, other: "PeriodRange | TimePeriod") -> bool:
+        """Check if a period, or all periods of a range, are in this range"""
+        self._check_aligned(other)
+        if isinstance(other, PeriodRange):
+            return (
+                not len(other)
+                or self._start_ordinal <= other._start_ordinal
+                and other._end_ordinal <= self._end_ordinal
+            )
+        return self._start_ordinal <= other._ordinal < self._end_ordinal
+
+    def __contains__(self, item) -> bool:
+        if not isinstance(item, self._period_class):
+            return False
+        return self.contains(item)
+
+    def index_of(self, period: TimePeriod) -> int:
+        """The index of a period in the range. Raises ValueError if the period is not in the range"""
+        if not self.contains(period):
+            raise ValueError(f"{period} is not in {self}")
+        return (period._ordinal - self._start_ordinal) // self._period_class._ordinal_step
+
+    def intersection(self, other: "PeriodRange") -> "PeriodRange":
+        """The periods that are in both ranges. The result is empty if the ranges do not overlap"""
+        self._check_aligned(other)
+        start_ordinal = max(self._start_ordinal, other._start_ordinal)
+        return self._with_ordinal_bounds(start_ordinal, min(self._end_ordinal, other._end_ordinal))
+
+    def union(self, other: "PeriodRange", fill_gap: bool = False) -> "PeriodRange":
+        """
+        The periods that are in either range.
+        If the ranges are separated by a gap, a ValueError is raised unless fill_gap is True,
+        in which case the range spanning both is returned.
+        """
+        self._check_aligned(other)
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        if not fill_gap and (other._start_ordinal > self._end_ordinal or self._start_ordinal > other._end_ordinal):
+            raise ValueError(f"The union of {self} and {other} is not a consecutive range")
+        start_ordinal = min(self._start_ordinal, other._start_ordinal)
+        return self._with_ordinal_bounds(start_ordinal, max(self._end_ordinal, other._end_ordinal))
+
+    def difference(self, other: "PeriodRange") -> "PeriodRange":
+        """
+        The periods of this range that are not in other.
+        Raises a ValueError if other lies strictly inside this range, since the result would not be consecutive.
+        """
+        if not self.overlaps(other):
+            return self
+        keeps_start = self._start_ordinal < other._start_ordinal
+        keeps_end = other._end_ordinal < self._end_ordinal
+        if keeps_start and keeps_end:
+            raise ValueError(f"The difference of {self} and {other} is not a consecutive range")
+        if keeps_start:
+            return self._with_ordinal_bounds(self._start_ordinal, other._start_ordinal)
+        return self._with_ordinal_bounds(max(other._end_ordinal, self._start_ordinal), self._end_ordinal)
 
     def __array_function__(self, func, types, args, kwargs):
         if func.__name__ == "concatenate":
@@ -0,0 +1,90 @@
+"""
+Lookup table for the ISO week calendar.
+
+Day ordinals are days since 1970-01-01, the same origin as numpy's datetime64[D].
+"""
+
+import numpy as np
+
+
+class IsoWeekTable:
+    """
+    Precomputed ISO week calendar for the years first_year..last_year.
+
+    The table is built on first use and holds the monday starting week 1 of every year, and the
+    ISO (year, week) of every week in the span. Converting between (year, week) and the day
+    ordinal of the monday starting the week is then array indexing.
+
+    Examples
+    --------
+    >>> table = IsoWeekTable(2000, 2030)
+    >>> int(table.week_start_days(2021, 1))
+    18631
+    >>> [int(x) for x in table.year_and_week(18631 + 6)]
+    [2021, 1]
+    """
+
+    def __init__(self, first_year: int = 1800, last_year: int = 2300):
+        self._first_year = first_year
+        self._last_year = last_year
+        self._year_starts = None
+
+    def _build(self):
+        years = np.arange(self._first_year, self._last_year + 2)
+        jan_fourth = (years - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64) + 3
+        year_starts = jan_fourth - (jan_fourth + 3) % 7
+        n_weeks = np.diff(year_starts) // 7
+        first_week_offsets = np.repeat(np.cumsum(n_weeks) - n_weeks, n_weeks)
+        self._n_weeks = n_weeks
+        self._week_years = np.repeat(years[:-1], n_weeks)
+        self._week_numbers = np.arange(len(self._week_years)) - first_week_offsets + 1
+        self._first_week_index = int((year_starts[0] + 3) // 7)
+        self._year_starts = year_starts
+        self._year_start_list = year_starts.tolist()
+        self._n_weeks_list = n_weeks.tolist()
+        self._week_year_list = self._week_years.tolist()
+        self._week_number_list = self._week_numbers.tolist()
+
+    def _check_years(self, year):
+        if np.any((year < self._first_year) | (year > self._last_year)):
+            raise ValueError(f"Year outside the ISO week table span {self._first_year}-{self._last_year}: {year}")
+
+    def week_start_days(self, year, week):
+        """Day ordinal of the monday starting each ISO (year, week)"""
+        if self._year_starts is None:
+            self._build()
+        year, week = np.asarray(year), np.asarray(week)
+        self._check_years(year)
+        year_index = year - self._first_year
+        if np.any((week < 1) | (week > self._n_weeks[year_index])):
+            raise ValueError(f"Invalid ISO week number {week} for year {year}")
+        return self._year_starts[year_index] + (week - 1) * 7
+
+    def week_start_day(self, year: int, week: int) -> int:
+        """Day ordinal of the monday starting a single ISO (year, week)"""
+        if self._year_starts is None:
+            self._build()
+        year_index = year - self._first_year
+        if not 0 <= year_index < len(self._n_weeks_list):
+            raise ValueError(f"Year outside the ISO week table span {self._first_year}-{self._last_year}: {year}")
+        if not 1 <= week <= self._n_weeks_list[year_index]:
+            raise ValueError(f"Invalid ISO week number {week} for year {year}")
+        return self._year_start_list[year_index] + (week - 1) * 7
+
+    def year_and_week_of_day(self, day: int) -> tuple[int, int]:
+        """ISO (year, week) of a single day ordinal"""
+        if self._year_starts is None:
+            self._build()
+        week_index = (day + 3) // 7 - self._first_week_index
+        if not 0 <= week_index < len(self._week_year_list):
+            raise ValueError(f"Date outside the ISO week table span {self._first_year}-{self._last_year}")
+        return self._week_year_list[week_index], self._week_number_list[week_index]
+
+    def year_and_week(self, days):
+        """ISO (year, week) for each day ordinal"""
+        if self._year_starts is None:
+            self._build()
+        week_index = (np.asarray(days) + 3) // 7 - self._first_week_index
+        if np.any((week_index < 0) | (week_index >= len(self._week_years))):
+            raise ValueError(f"Date outside the ISO week table span {self._first_year}-{self._last_year}")
+        return self._week_years[week_index], self._week_numbers[week_index]
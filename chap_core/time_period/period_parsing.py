@@ -0,0 +1,118 @@
+"""
+Columnar parsing of period strings.
+
+The format of a column is detected once from its first distinct value, and all distinct values
+are then converted to period ordinals with vectorized string and integer operations. The result
+is scattered back to the rows, so the cost is dominated by a single pd.factorize of the column.
+"""
+
+import re
+from collections.abc import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .date_util_wrapper import Day, Month, TimePeriod, Week, WeekNumbering, Year
+
+_DATE = r"(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})"
+
+_FORMATS = {
+    "year": (Year, r"(?P<year>\d{4})"),
+    "month": (Month, r"(?P<year>\d{4})-(?P<month>\d{1,2})"),
+    "month_id": (Month, r"(?P<year>\d{4})(?P<month>\d{2})"),
+    "week_id": (Week, r"(?P<year>\d{4})W(?P<week>\d{1,2})"),
+    "day": (Day, _DATE),
+    "day_id": (Day, r"(?P<year>\d{4})(?P<month>\d{2})(?P<day>\d{2})"),
+    "week_range": (Week, _DATE + "/" + _DATE.replace("?P<", "?P<end_")),
+}
+
+
+def _month_ordinals(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    if np.any((month < 1) | (month > 12)):
+        raise ValueError(f"Invalid month in {month[(month < 1) | (month > 12)][:5]}")
+    return (year - 1970) * 12 + month - 1
+
+
+def _day_ordinals(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    month_ordinals = _month_ordinals(year, month)
+    month_start = month_ordinals.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    next_month_start = (month_ordinals + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    days = month_start + day - 1
+    if np.any((day < 1) | (days >= next_month_start)):
+        raise ValueError("Invalid day of month in period strings")
+    return days
+
+
+def _ordinals_from_groups(name: str, groups: dict[str, np.ndarray]) -> np.ndarray:
+    if name == "year":
+        return groups["year"] - 1970
+    if name in ("month", "month_id"):
+        return _month_ordinals(groups["year"], groups["month"])
+    if name in ("day", "day_id"):
+        return _day_ordinals(groups["year"], groups["month"], groups["day"])
+    if name == "week_id":
+        return WeekNumbering.table.week_start_days(groups["year"], groups["week"])
+    if name == "week_range":
+        start = _day_ordinals(groups["year"], groups["month"], groups["day"])
+        end = _day_ordinals(groups["end_year"], groups["end_month"], groups["end_day"])
+        if np.any(end - start != 6):
+            raise ValueError("Week must be 7 days")
+        return start
+    raise ValueError(f"Unknown period format {name}")
+
+
+def _detect_format(text: str) -> str | None:
+    for name, (_, pattern) in _FORMATS.items():
+        if re.fullmatch(pattern, text):
+            return name
+    return None
+
+
+def _parse_unique(unique_strings: pd.Series) -> tuple[type[TimePeriod], np.ndarray]:
+    name = _detect_format(unique_strings.iloc[0])
+    if name is not None:
+        period_class, pattern = _FORMATS[name]
+        extracted = unique_strings.str.extract(f"^{pattern}$")
+        if not extracted.isna().any(axis=None):
+            groups = {column: extracted[column].to_numpy().astype(np.int64) for column in extracted.columns}
+            return period_class, _ordinals_from_groups(name, groups)
+    return _parse_unique_with_dateutil(unique_strings)
+
+
+def _parse_unique_with_dateutil(unique_strings: pd.Series) -> tuple[type[TimePeriod], np.ndarray]:
+    periods = [TimePeriod.parse(text) for text in unique_strings]
+    period_class = periods[0].__class__
+    if not all(period.__class__ is period_class for period in periods):
+        raise ValueError(f"All periods must have the same time delta {periods}")
+    return period_class, np.array([period._ordinal for period in periods], dtype=np.int64)
+
+
+def parse_period_strings(period_strings: Iterable[str]) -> tuple[type[TimePeriod], np.ndarray]:
+    """
+    Parse a column of period strings into a period class and one ordinal per row.
+
+    Supported formats are 'YYYY', 'YYYY-MM', 'YYYYMM', 'YYYYWnn', 'YYYY-MM-DD', 'YYYYMMDD' and
+    week ranges 'YYYY-MM-DD/YYYY-MM-DD'. Columns in other formats fall back to TimePeriod.parse
+    for each distinct value.
+
+    Parameters
+    ----------
+    period_strings : Iterable[str]
+        The period strings, all in the same format
+
+    Returns
+    -------
+    tuple[type[TimePeriod], np.ndarray]
+        The period class and the ordinal of each period string
+
+    Examples
+    --------
+    >>> from chap_core.time_period.period_parsing import parse_period_strings
+    >>> parse_period_strings(["2020-01", "2020-02", "2020-01"])
+    (<class 'chap_core.time_period.date_util_wrapper.Month'>, array([600, 601, 600]))
+    """
+    codes, uniques = pd.factorize(pd.Series(period_strings, dtype=object).astype(str))
+    if not len(uniques):
+        raise ValueError("Cannot parse an empty list of periods")
+    period_class, unique_ordinals = _parse_unique(pd.Series(uniques).str.strip())
+    return period_class, unique_ordinals[codes]
@@ -0,0 +1,138 @@
+"""
+Resampling of period ranges and their values to a coarser period type.
+
+Every source period is assigned to the target period containing its middle day, so a week belongs
+to the month and the ISO year of its thursday. Since the source periods are consecutive, the periods
+belonging to one target period form a contiguous segment. The segment boundaries are computed once
+from the ordinals, and values are reduced per segment with ufunc.reduceat along the last axis, so
+any number of locations and fields sharing a period range are reduced in the same call.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable
+
+import numpy as np
+
+from .date_util_wrapper import Day, Month, PeriodRange, TimePeriod, Week, Year
+
+PERIOD_TYPES = {"day": Day, "week": Week, "month": Month, "year": Year}
+_RESOLUTIONS = (Day, Week, Month, Year)
+REDUCERS = ("sum", "mean", "max", "min")
+
+
+def get_period_type(period_type: str | type[TimePeriod]) -> type[TimePeriod]:
+    """Look up a period class from its name ('day', 'week', 'month' or 'year') or check a given class"""
+    if isinstance(period_type, str):
+        if period_type not in PERIOD_TYPES:
+            raise ValueError(f"Unknown period type {period_type}, expected one of {list(PERIOD_TYPES)}")
+        return PERIOD_TYPES[period_type]
+    if period_type not in _RESOLUTIONS:
+        raise ValueError(f"Unknown period type {period_type}")
+    return period_type
+
+
+def segment_starts(
+    period_range: PeriodRange, target_period_type: str | type[TimePeriod]
+) -> tuple[PeriodRange, np.ndarray]:
+    """
+    Find the target periods covering period_range, and the index of the first source period in each of them.
+
+    Parameters
+    ----------
+    period_range : PeriodRange
+        The source periods
+    target_period_type : str | type[TimePeriod]
+        The period type to resample to. Must be at least as coarse as the source period type
+
+    Returns
+    -------
+    tuple[PeriodRange, np.ndarray]
+        The target period range and the start index of each segment in period_range
+
+    Examples
+    --------
+    >>> from chap_core.time_period import Day, PeriodRange
+    >>> period_range = PeriodRange.from_time_periods(Day(2020, 1, 30), Day(2020, 2, 2))
+    >>> target_range, starts = segment_starts(period_range, "month")
+    >>> [period.id for period in target_range], starts.tolist()
+    (['202001', '202002'], [0, 2])
+    """
+    target_class = get_period_type(target_period_type)
+    source_class = period_range._period_class
+    if _RESOLUTIONS.index(target_class) < _RESOLUTIONS.index(source_class):
+        raise ValueError(f"Cannot resample {source_class.__name__} to the finer period type {target_class.__name__}")
+    if not len(period_range):
+        raise ValueError("Cannot resample an empty period range")
+    middle_days = (period_range._start_days() + period_range._end_days() - 1) // 2
+    target_ordinals = target_class._ordinals_of_days(middle_days)
+    starts = np.insert(np.flatnonzero(np.diff(target_ordinals)) + 1, 0, 0)
+    return PeriodRange.from_ordinals(target_class, target_ordinals[starts]), starts
+
+
+def reduce_segments(values: np.ndarray, starts: np.ndarray, reducer: str) -> np.ndarray:
+    """
+    Reduce the segments of values starting at `starts` along the last axis.
+    Missing values (nan) are skipped, and a segment with only missing values gives nan.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Array with periods along the last axis
+    starts : np.ndarray
+        Start index of each segment, as returned by segment_starts
+    reducer : str
+        One of 'sum', 'mean', 'max' and 'min'
+
+    Returns
+    -------
+    np.ndarray
+        Float array with one entry per segment along the last axis
+    """
+    values = np.asarray(values)
+    if values.dtype.kind != "f":
+        values = values.astype(float)
+    present = ~np.isnan(values)
+    counts = np.add.reduceat(present, starts, axis=-1)
+    if reducer in ("sum", "mean"):
+        reduced = np.add.reduceat(np.where(present, values, values.dtype.type(0)), starts, axis=-1)
+        if reducer == "mean":
+            reduced = np.divide(
+                reduced, counts, out=np.full(reduced.shape, np.nan, dtype=values.dtype), where=counts > 0
+            )
+    elif reducer == "max":
+        reduced = np.maximum.reduceat(np.where(present, values, values.dtype.type(-np.inf)), starts, axis=-1)
+    elif reducer == "min":
+        reduced = np.minimum.reduceat(np.where(present, values, values.dtype.type(np.inf)), starts, axis=-1)
+    else:
+        raise ValueError(f"Unknown reducer {reducer}, expected one of {REDUCERS}")
+    return np.where(counts > 0, reduced, np.nan)
+
+
+def resample_values(
+    period_range: PeriodRange,
+    values: dict[str, np.ndarray],
+    target_period_type: str | type[TimePeriod],
+    reducers: dict[str, str],
+) -> tuple[PeriodRange, dict[str, np.ndarray]]:
+    """
+    Resample named arrays with periods along the last axis, using the reducer given for each name.
+    All arrays with the same reducer are stacked and reduced together.
+    """
+    target_range, starts = segment_starts(period_range, target_period_type)
+    names_by_reducer = defaultdict(list)
+    for name in values:
+        names_by_reducer[reducers[name]].append(name)
+    resampled = {}
+    for reducer, names in names_by_reducer.items():
+        reduced = reduce_segments(np.stack([values[name] for name in names]), starts, reducer)
+        resampled.update(zip(names, reduced))
+    return target_range, resampled
+
+
+def group_by_period_range(period_ranges: Iterable[PeriodRange]) -> list[tuple[PeriodRange, list[int]]]:
+    """Group equal period ranges, returning each distinct range with the indices of its occurrences"""
+    groups = {}
+    for i, period_range in enumerate(period_ranges):
+        key = (period_range._period_class, period_range._start_ordinal, len(period_range))
+        groups.setdefault(key, (period_range, []))[1].append(i)
+    return list(groups.values())
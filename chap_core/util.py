@@ -27,6 +27,32 @@ def interpolate_nans(y):
     return y
 
 
+def interpolate_nans_along_last_axis(y):
+    """Linear interpolation of NaNs along the last axis of y, like interpolate_nans for every row at once.
+
+    Leading and trailing NaNs are set to the first and last valid value of their row, as np.interp does.
+    Rows without any valid values are left as NaN. Returns a new float array, of the same dtype as y if y is float.
+    """
+    y = np.asarray(y)
+    if y.dtype.kind != "f":
+        y = y.astype(float)
+    n = y.shape[-1]
+    positions = np.arange(n)
+    valid = ~np.isnan(y)
+    previous = np.maximum.accumulate(np.where(valid, positions, -1), axis=-1)
+    following = np.flip(np.minimum.accumulate(np.flip(np.where(valid, positions, n), axis=-1), axis=-1), axis=-1)
+    previous = np.where(previous < 0, following, previous)
+    following = np.where(following >= n, previous, following)
+    has_values = previous < n
+    previous = np.where(has_values, previous, 0)
+    following = np.where(has_values, following, 0)
+    y_previous = np.take_along_axis(y, previous, axis=-1)
+    y_following = np.take_along_axis(y, following, axis=-1)
+    span = following - previous
+    weight = np.divide(positions - previous, span, out=np.zeros(y.shape, dtype=y.dtype), where=span > 0)
+    return np.where(valid, y, y_previous + weight * (y_following - y_previous))
+
+
 def conda_available():
     return which("conda") is not None
 
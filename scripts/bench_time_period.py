@@ -0,0 +1,187 @@
+"""
+Benchmarks for chap_core.time_period.
+
+Measures the time and peak memory of parsing, iterating, indexing, comparing and converting period
+ranges of day, week, month and year frequency at several sizes. Runs offline without extra
+dependencies, and writes the results as JSON so that runs on different versions can be compared:
+
+    python scripts/bench_time_period.py --output before.json
+    python scripts/bench_time_period.py --output after.json --compare before.json
+
+Time is the best of `--repeat` runs after a warm-up run, and peak memory is measured with
+tracemalloc in a separate run. Sizes that cannot be represented for a frequency (weeks are limited
+by the ISO week table and years by datetime) are capped, and the number of periods actually used
+is reported. Scalar benchmarks (parse and searchsorted) are run on at most `--n-scalar` periods
+and report the time for all of them.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from chap_core.time_period import Day, Month, PeriodRange, TimePeriod, Week, Year
+
+SIZES = (10**3, 10**5, 10**6)
+START_PERIODS = {
+    "day": Day(1900, 1, 1),
+    "week": Week(1900, 1),
+    "month": Month(1900, 1),
+    "year": Year(1900),
+}
+MAX_PERIODS = {"day": 10**6, "week": 20_000, "month": 90_000, "year": 8_000}
+
+
+@dataclass
+class BenchmarkResult:
+    benchmark: str
+    frequency: str
+    n_periods: int
+    n_calls: int
+    seconds: float
+    median_seconds: float
+    peak_memory_bytes: int
+
+
+def make_period_range(frequency: str, n_periods: int) -> PeriodRange:
+    start = START_PERIODS[frequency]
+    return PeriodRange.from_time_periods(start, start + start.time_delta * (n_periods - 1))
+
+
+def _sample(period_range: PeriodRange, n_scalar: int) -> list[TimePeriod]:
+    indices = np.linspace(0, len(period_range) - 1, min(n_scalar, len(period_range))).astype(int)
+    return [period_range[int(i)] for i in indices]
+
+
+def make_benchmarks(period_range: PeriodRange, n_scalar: int) -> dict[str, tuple[Callable, int]]:
+    """The benchmarked functions for one period range, with the number of calls each of them makes"""
+    periods = list(period_range)
+    strings = [period.to_string() for period in periods]
+    ids = [period.id for period in periods]
+    sample = _sample(period_range, n_scalar)
+    sample_strings = [period.to_string() for period in sample]
+    middle = period_range[len(period_range) // 2]
+    n = len(period_range)
+    return {
+        "TimePeriod.parse": (lambda: [TimePeriod.parse(text) for text in sample_strings], len(sample_strings)),
+        "PeriodRange.from_strings": (lambda: PeriodRange.from_strings(strings), 1),
+        "PeriodRange.from_ids": (lambda: PeriodRange.from_ids(ids), 1),
+        "PeriodRange.__iter__": (lambda: list(period_range), 1),
+        "PeriodRange.searchsorted": (lambda: [period_range.searchsorted(period) for period in sample], len(sample)),
+        "PeriodRange.__getitem__[slice]": (lambda: period_range[n // 4 : 3 * n // 4], 1),
+        "PeriodRange.__eq__": (lambda: period_range == middle, 1),
+        "PeriodRange.__ge__": (lambda: period_range >= middle, 1),
+        "PeriodRange.topandas": (lambda: period_range.topandas(), 1),
+    }
+
+
+def measure(func: Callable, repeat: int) -> tuple[float, float, int]:
+    """Best and median time over `repeat` runs after a warm-up run, and the peak traced memory of one more run"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def run(
+    sizes=SIZES, frequencies=tuple(START_PERIODS), repeat=3, n_scalar=10**4, selected: str | None = None
+) -> list[BenchmarkResult]:
+    results = []
+    for frequency in frequencies:
+        for n_periods in sorted({min(size, MAX_PERIODS[frequency]) for size in sizes}):
+            period_range = make_period_range(frequency, n_periods)
+            for name, (func, n_calls) in make_benchmarks(period_range, n_scalar).items():
+                if selected is not None and selected not in name:
+                    continue
+                seconds, median_seconds, peak = measure(func, repeat)
+                result = BenchmarkResult(name, frequency, n_periods, n_calls, seconds, median_seconds, peak)
+                print(_format(result), file=sys.stderr)
+                results.append(result)
+    return results
+
+
+def _format(result: BenchmarkResult) -> str:
+    return (
+        f"{result.benchmark:32} {result.frequency:6} {result.n_periods:>9} "
+        f"{result.seconds * 1000:>12.3f} ms {result.peak_memory_bytes / 2**20:>10.2f} MiB"
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results: list[BenchmarkResult], baseline: dict) -> list[str]:
+    """Lines with the time and memory ratios of results to a baseline result file"""
+    baseline_results = {(r["benchmark"], r["frequency"], r["n_periods"]): r for r in baseline["results"]}
+    lines = []
+    for result in results:
+        old = baseline_results.get((result.benchmark, result.frequency, result.n_periods))
+        if old is None:
+            continue
+        time_ratio = result.seconds / old["seconds"] if old["seconds"] else float("nan")
+        memory_ratio = result.peak_memory_bytes / old["peak_memory_bytes"] if old["peak_memory_bytes"] else float("nan")
+        lines.append(
+            f"{result.benchmark:32} {result.frequency:6} {result.n_periods:>9} "
+            f"time x{time_ratio:>8.3f} memory x{memory_ratio:>8.3f}"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--frequencies", nargs="+", choices=list(START_PERIODS), default=list(START_PERIODS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--n-scalar", type=int, default=10**4)
+    parser.add_argument("--select", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.frequencies, args.repeat, args.n_scalar, args.select)
+    report = {"environment": environment(), "results": [asdict(result) for result in results]}
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare is not None:
+        for line in compare(results, json.loads(args.compare.read_text())):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
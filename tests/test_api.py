@@ -1,9 +1,13 @@
 import os
+from types import SimpleNamespace
 
 import numpy as np
 import pytest
 from chap_core.api import read_zip_folder, train_on_prediction_data
 from chap_core.api import dhis_zip_flow
+from chap_core.datatypes import ClimateData, HealthData
+from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
+from chap_core.time_period import PeriodRange
 
 
 @pytest.fixture
@@ -50,3 +54,12 @@ def test_train_on_prediction_data(data_path):
         model_name="external",
         model_path="https://github.com/knutdrand/external_rmodel_example.git",
     )
+
+
+def test_train_on_prediction_data_requires_climate_for_all_locations():
+    period_range = PeriodRange.from_strings(["2020-01", "2020-02"])
+    health = DataSet({location: HealthData(period_range, np.array([1, 2])) for location in ("a", "b")})
+    climate = DataSet({"a": ClimateData(period_range, np.zeros(2), np.zeros(2), np.zeros(2))})
+    data = SimpleNamespace(health_data=health, climate_data=climate, population_data={"a": 10, "b": 20})
+    with pytest.raises(KeyError, match="not in climate data"):
+        train_on_prediction_data(data, model_name="naive_model")
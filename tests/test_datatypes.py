@@ -1,12 +1,31 @@
+import pickle
+
 import pandas as pd
 import numpy as np
 import pytest
 from bionumpy.util.testing import assert_bnpdataclass_equal
-from chap_core.datatypes import ClimateHealthTimeSeries, HealthData, Samples
+from chap_core.datatypes import (
+    ClimateHealthTimeSeries,
+    HealthData,
+    Samples,
+    SummaryStatistics,
+    TimeSeriesData,
+    add_field,
+    remove_field,
+    tsdataclass,
+)
 from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
 from chap_core.time_period import PeriodRange
 
 
+@tsdataclass
+class WeightedHealthData(HealthData):
+    weight: float
+
+    def weighted_cases(self):
+        return self.disease_cases * self.weight
+
+
 def test_climate_health_time_series_from_csv(tmp_path):
     """Test the from_csv method."""
     data = pd.DataFrame(
@@ -73,3 +92,77 @@ def test_samples(samples, tmp_path):
     samples.to_csv(path)
     samples2 = Samples.from_csv(path)
     assert_bnpdataclass_equal(samples, samples2)
+
+
+@pytest.mark.parametrize("n_samples", [1, 2, 101])
+def test_samples_summaries_match_numpy(n_samples):
+    samples = np.random.default_rng(0).normal(size=(4, n_samples))
+    summaries = Samples(PeriodRange.from_strings(["2020", "2021", "2022", "2023"]), samples).summaries()
+    assert type(summaries) is SummaryStatistics
+    np.testing.assert_array_equal(summaries.median, np.median(samples, axis=-1))
+    np.testing.assert_array_equal(summaries.quantile_low, np.quantile(samples, 0.25, axis=-1))
+    np.testing.assert_array_equal(summaries.quantile_high, np.quantile(samples, 0.75, axis=-1))
+    np.testing.assert_array_equal(summaries.std, np.std(samples, axis=-1))
+
+
+def test_summaries_with_quantile_levels():
+    samples = np.random.default_rng(0).normal(size=(2, 3, 50))
+    period_range = PeriodRange.from_strings(["2020", "2021", "2022"])
+    data_set = DataSet.from_columns(Samples, period_range, ["a", "b"], {"samples": samples})
+    summaries = data_set.summaries((0.975, 0.025, 0.5))
+    assert summaries["a"].__class__.quantile_levels == (0.025, 0.5, 0.975)
+    np.testing.assert_array_equal(summaries["b"].quantile_2_5, np.quantile(samples[1], 0.025, axis=-1))
+    np.testing.assert_array_equal(summaries["b"].quantile_low, summaries["b"].quantile_2_5)
+    np.testing.assert_array_equal(summaries["a"].quantile_97_5, np.quantile(samples[0], 0.975, axis=-1))
+    assert summaries["a"].__class__ is SummaryStatistics.with_quantiles((0.025, 0.5, 0.975))
+
+
+def test_derived_dataclasses_are_cached():
+    period_range = PeriodRange.from_strings(["2020-01", "2020-02"])
+    data = ClimateHealthTimeSeries(period_range, np.array([1.0, 2.0]), np.array([3.0, 4.0]), np.array([5, 6]))
+    without_cases = remove_field(data, "disease_cases")
+    assert without_cases.__class__ is remove_field(ClimateHealthTimeSeries, "disease_cases")
+    assert without_cases.__class__.__name__ == "ClimateHealthTimeSeries"
+    assert np.shares_memory(without_cases.rainfall, data.rainfall)
+    with_population = add_field(data, population=np.array([10.0, 20.0]))
+    assert with_population.__class__ is add_field(data, population=np.zeros(2)).__class__
+
+    data_set = DataSet.from_columns(
+        ClimateHealthTimeSeries,
+        period_range,
+        ["a", "b"],
+        {
+            "rainfall": np.zeros((2, 2)),
+            "mean_temperature": np.ones((2, 2)),
+            "disease_cases": np.ones((2, 2), dtype=int),
+        },
+    )
+    added = data_set.add_fields(population=lambda data: data.mean_temperature * 10)
+    assert np.shares_memory(added.field_array("rainfall"), data_set.field_array("rainfall"))
+    np.testing.assert_array_equal(added["b"].population, [10.0, 10.0])
+    assert added.remove_field("population")["a"].__class__ is remove_field(added["a"], "population").__class__
+
+
+def test_pickle_keeps_dataclasses():
+    period_range = PeriodRange.from_strings(["2020-01", "2020-02"])
+    weighted = WeightedHealthData(period_range, np.array([1, 2]), np.array([0.5, 1.0]))
+    restored = pickle.loads(pickle.dumps(weighted))
+    assert restored.__class__ is WeightedHealthData
+    np.testing.assert_array_equal(restored.weighted_cases(), [0.5, 2.0])
+    with_population = add_field(weighted, population=np.array([10.0, 20.0]))
+    assert pickle.loads(pickle.dumps(with_population)).__class__ is with_population.__class__
+    quantiles = SummaryStatistics.with_quantiles((0.1, 0.9))
+    summary = quantiles(
+        period_range, **{name: np.zeros(2) for name in quantiles.__dataclass_fields__ if name != "time_period"}
+    )
+    assert pickle.loads(pickle.dumps(summary)).__class__.quantile_levels == (0.1, 0.9)
+    data_set = DataSet({"a": with_population, "b": with_population}).to_columnar()
+    assert pickle.loads(pickle.dumps(data_set, protocol=5))["a"].__class__ is with_population.__class__
+
+    @tsdataclass
+    class LocalData(TimeSeriesData):
+        value: float
+
+    local = pickle.loads(pickle.dumps(LocalData(period_range, np.array([1.0, 2.0]))))
+    assert local.__class__.__name__ == "LocalData"
+    np.testing.assert_array_equal(local.value, [1.0, 2.0])
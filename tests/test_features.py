@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from chap_core.datatypes import HealthData
+from chap_core.spatio_temporal_data.features import (
+    Anomaly,
+    Lag,
+    RollingMean,
+    RollingSum,
+    SeasonCyclical,
+    SeasonOneHot,
+    rolling_sum,
+    season_one_hot,
+)
+from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
+from chap_core.time_period import Month, PeriodRange, Week
+
+
+@pytest.fixture
+def data_set():
+    period_range = PeriodRange.from_time_periods(Month(2020, 1), Month(2021, 12))
+    values = np.vstack([np.arange(24.0), np.arange(24.0) * 2])
+    return DataSet.from_columns(HealthData, period_range, ["a", "b"], {"disease_cases": values})
+
+
+def test_rolling_sum():
+    values = np.array([[1.0, 2.0, 3.0, np.nan, 5.0, 6.0]])
+    np.testing.assert_array_equal(rolling_sum(values, 2), [[np.nan, 3, 5, np.nan, np.nan, 11]])
+
+
+@pytest.mark.parametrize("window", [0, -1])
+def test_rolling_window_must_be_positive(window):
+    with pytest.raises(ValueError):
+        rolling_sum(np.zeros((1, 3)), window)
+    with pytest.raises(ValueError):
+        RollingSum("disease_cases", window)
+    with pytest.raises(ValueError):
+        RollingMean("disease_cases", window)
+    with pytest.raises(ValueError):
+        Lag("disease_cases", -1)
+
+
+def test_season_one_hot_folds_week_53():
+    one_hot = season_one_hot(PeriodRange.from_time_periods(Week(2020, 52), Week(2021, 1)))
+    assert one_hot.shape == (3, 52)
+    assert one_hot[0, 51] and one_hot[1, 51] and one_hot[2, 0]
+
+
+def test_feature_array(data_set):
+    features = [Lag("disease_cases", 2), RollingSum("disease_cases", 3), RollingMean("disease_cases", 3)]
+    features += [SeasonOneHot(), SeasonCyclical(), Anomaly("disease_cases")]
+    array = data_set.feature_array(features)
+    names = data_set.feature_names(features)
+    assert array.shape == (2, 24, len(names)) == (2, 24, 3 + 12 + 2 + 1)
+    np.testing.assert_array_equal(array[1, :4, 0], [np.nan, np.nan, 0, 2])
+    np.testing.assert_array_equal(array[0, 2:5, 1], [3, 6, 9])
+    np.testing.assert_array_equal(array[0, 2:5, 2], [1, 2, 3])
+    assert names[3] == "season_1" and np.all(array[:, [0, 12], 3] == 1)
+    np.testing.assert_allclose(array[0, :, names.index("disease_cases_anomaly")], [-6.0] * 12 + [6.0] * 12)
+    assert data_set.feature_array(features) is array
+    assert not array.flags.writeable
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from chap_core.datatypes import ClimateData, HealthData
+from chap_core.spatio_temporal_data.imputation import forward_fill, impute_fields, seasonal_mean_fill
+from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
+from chap_core.time_period import Month, PeriodRange, Year
+
+
+@pytest.fixture
+def period_range():
+    return PeriodRange.from_time_periods(Month(2020, 1), Month(2021, 12))
+
+
+def test_forward_fill():
+    values = np.array([[np.nan, 1.0, np.nan, np.nan, 4.0], [2.0, np.nan, 3.0, np.nan, np.nan]])
+    np.testing.assert_array_equal(forward_fill(values), [[np.nan, 1, 1, 1, 4], [2, 2, 3, 3, 3]])
+
+
+def test_seasonal_mean_fill(period_range):
+    values = np.tile(np.arange(24.0), (2, 1))
+    values[0, 2] = np.nan
+    values[1, [3, 15]] = np.nan
+    filled = seasonal_mean_fill(values, period_range)
+    assert filled[0, 2] == 14.0
+    assert np.isnan(filled[1, 3]) and np.isnan(filled[1, 15])
+    np.testing.assert_array_equal(np.delete(filled[0], 2), np.delete(values[0], 2))
+
+
+def test_seasonal_mean_needs_seasons():
+    with pytest.raises(ValueError):
+        seasonal_mean_fill(np.zeros((1, 3)), PeriodRange.from_time_periods(Year(2020), Year(2022)))
+
+
+def test_impute_fields_copy_and_report(period_range):
+    values = np.arange(48.0).reshape(2, 24)
+    values[0, [1, 2]] = np.nan
+    fields = {"disease_cases": values, "population": np.ones((2, 24), dtype=int)}
+    new_fields, report = impute_fields(fields, period_range, "linear")
+    assert report.n_filled == {"disease_cases": 2, "population": 0}
+    assert report.total_filled == 2
+    assert np.isnan(values[0, 1])
+    np.testing.assert_array_equal(new_fields["disease_cases"][0, :4], [0, 1, 2, 3])
+    assert new_fields["population"] is fields["population"]
+    impute_fields(fields, period_range, "ffill", ["disease_cases"], copy=False)
+    np.testing.assert_array_equal(values[0, :4], [0, 0, 0, 3])
+
+
+def test_dataset_impute_matches_interpolate(period_range):
+    rainfall = np.random.default_rng(0).random((2, 24))
+    rainfall[0, [0, 5, 6]] = np.nan
+    data_set = DataSet(
+        {
+            location: ClimateData(period_range, row.copy(), row + 1, row + 2)
+            for location, row in zip(["oslo", "bergen"], rainfall)
+        }
+    )
+    imputed, report = data_set.impute("linear", ["rainfall"])
+    assert report.n_filled["rainfall"] == 3
+    for location, data in data_set.items():
+        expected = data.interpolate(["rainfall"])
+        np.testing.assert_allclose(imputed[location].rainfall, expected.rainfall)
+
+
+def test_impute_unknown_strategy(period_range):
+    data_set = DataSet.from_columns(HealthData, period_range, ["a"], {"disease_cases": np.zeros((1, 24))})
+    with pytest.raises(ValueError):
+        data_set.impute("spline")
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from chap_core.assessment.dataset_splitting import train_test_generator
+from chap_core.assessment.prediction_evaluator import (
+    PredictionJobError,
+    _get_forecast_generators,
+    _wait_for_job,
+    predict_test_sets,
+)
+from chap_core.datatypes import Samples
+from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
+
+
+class LastValuePredictor:
+    def predict(self, historic_data: DataSet, future_data: DataSet) -> DataSet:
+        if future_data.period_range[0].month == 10:
+            raise ValueError("No prediction for October")
+        return DataSet(
+            {
+                location: Samples(
+                    future_data[location].time_period,
+                    np.full((len(future_data[location]), 10), historic_data[location].disease_cases[-1]),
+                )
+                for location in future_data.keys()
+            }
+        )
+
+
+def _test_sets(data):
+    return train_test_generator(data, 2, 4)[1]
+
+
+def _assert_same_predictions(results, expected):
+    assert isinstance(results[2], ValueError)
+    for result, expected_result in zip(results[:2] + results[3:], expected[:2] + expected[3:]):
+        assert list(result.period_range) == list(expected_result.period_range)
+        np.testing.assert_array_equal(result["oslo"].samples, expected_result["oslo"].samples)
+
+
+def test_serial_predictions(full_data):
+    predictor = LastValuePredictor()
+    with pytest.raises(ValueError):
+        list(predict_test_sets(predictor, _test_sets(full_data)))
+    with pytest.raises(ValueError):
+        list(predict_test_sets(predictor, _test_sets(full_data), skip_failed=True))
+    serial = list(predict_test_sets(predictor, _test_sets(full_data), skip_failed=True, skip_errors=(ValueError,)))
+    assert [isinstance(result, ValueError) for result in serial] == [False, False, True, False]
+    assert [result.period_range[0].month for result in serial[:2] + serial[3:]] == [8, 9, 11]
+
+
+def test_thread_executor_predictions_in_order(full_data):
+    predictor = LastValuePredictor()
+    serial = list(predict_test_sets(predictor, _test_sets(full_data), skip_failed=True, skip_errors=(ValueError,)))
+    with ThreadPoolExecutor(2) as executor:
+        threaded = list(
+            predict_test_sets(
+                predictor, _test_sets(full_data), 2, executor, skip_failed=True, skip_errors=(ValueError,)
+            )
+        )
+    _assert_same_predictions(threaded, serial)
+
+
+def test_process_pool_predictions_in_order(full_data):
+    predictor = LastValuePredictor()
+    serial = list(predict_test_sets(predictor, _test_sets(full_data), skip_failed=True, skip_errors=(ValueError,)))
+    processes = list(
+        predict_test_sets(predictor, _test_sets(full_data), n_jobs=2, skip_failed=True, skip_errors=(ValueError,))
+    )
+    _assert_same_predictions(processes, serial)
+
+
+def test_forecast_generators_skip_failed(full_data):
+    predictor = LastValuePredictor()
+    truth = {location: None for location in full_data.keys()}
+    with pytest.raises(ValueError):
+        _get_forecast_generators(predictor, _test_sets(full_data), truth, n_jobs=2)
+    forecasts, tss = _get_forecast_generators(
+        predictor, _test_sets(full_data), truth, n_jobs=2, skip_failed=True, skip_errors=(ValueError,)
+    )
+    assert len(forecasts) == len(tss) == 3 * len(truth)
+
+
+class StatusJob:
+    def __init__(self, status):
+        self.status = status
+        self.result = "result"
+        self.canceled = False
+
+    @property
+    def is_finished(self):
+        return self.status == "finished"
+
+    def cancel(self):
+        self.canceled = True
+
+
+def test_wait_for_job():
+    assert _wait_for_job(StatusJob("finished"), poll_interval=0) == "result"
+    for status in ("failed", "stopped", "canceled"):
+        with pytest.raises(PredictionJobError):
+            _wait_for_job(StatusJob(status), poll_interval=0)
+    deferred = StatusJob("deferred")
+    with pytest.raises(TimeoutError):
+        _wait_for_job(deferred, poll_interval=0.01, timeout=0.05)
+    assert deferred.canceled
+    job = StatusJob("started")
+    with pytest.raises(TimeoutError):
+        _wait_for_job(job, poll_interval=0.01, timeout=0.05)
+    assert job.canceled
@@ -1,14 +1,23 @@
+import pickle
 import tempfile
 
 import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
 
 from chap_core.datatypes import (
     ClimateHealthTimeSeries,
     ClimateData,
+    COMPACT_DTYPES,
+    DEFAULT_DTYPES,
+    HealthData,
+    Samples,
     TimeSeriesData,
 )
+from chap_core.spatio_temporal_data.store import make_header
 from chap_core.spatio_temporal_data.temporal_dataclass import DataSet
-from chap_core.time_period import Month, PeriodRange
+from chap_core.time_period import Day, Month, PeriodRange, Week
 from tempfile import NamedTemporaryFile
 
 
@@ -68,3 +77,327 @@ def test_get_location(health_population_data):
 def test_getitem(health_population_data):
     location_data = health_population_data["FRmrFTE63D0"]
     assert isinstance(location_data, TimeSeriesData)
+
+
+def test_resample_daily_to_weekly():
+    period_range = PeriodRange.from_time_periods(Day(2020, 1, 6), Day(2020, 1, 19))
+    data = DataSet(
+        {
+            location: ClimateData(period_range, np.ones(14) * i, np.arange(14.0), np.arange(14.0))
+            for i, location in enumerate(["oslo", "bergen"])
+        }
+    )
+    weekly = data.resample("week", reducers={"rainfall": "sum", "max_temperature": "max"})
+    assert list(weekly["oslo"].time_period) == [Week(2020, 2), Week(2020, 3)]
+    assert np.all(weekly["bergen"].rainfall == [7.0, 7.0])
+    assert np.all(weekly["oslo"].mean_temperature == [3.0, 10.0])
+    assert np.all(weekly["oslo"].max_temperature == [6.0, 13.0])
+
+
+def _two_location_climate_data(values):
+    period_range = PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 5))
+    return DataSet(
+        {
+            location: ClimateData(period_range, row, row + 1, row + 2)
+            for location, row in zip(["oslo", "bergen"], values)
+        }
+    )
+
+
+def test_columnar_views_and_restrict():
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    columnar = data_set.to_columnar()
+    assert columnar.is_columnar and not data_set.is_columnar
+    rainfall = columnar.field_array("rainfall")
+    assert rainfall.shape == (2, 5)
+    assert np.shares_memory(columnar["bergen"].rainfall, rainfall)
+    restricted = columnar.restrict_time_period(slice(Month(2020, 2), Month(2020, 3)))
+    assert list(restricted.period_range) == list(
+        data_set.restrict_time_period(slice(Month(2020, 2), Month(2020, 3))).period_range
+    )
+    np.testing.assert_array_equal(restricted["bergen"].rainfall, [6.0, 7.0])
+    assert list(restricted.get_locations(["bergen"]).keys()) == ["bergen"]
+
+
+def test_columnar_matches_dict_mode():
+    values = np.arange(10.0).reshape(2, 5)
+    values[0, 1:3] = np.nan
+    values[1, 4] = np.nan
+    data_set = _two_location_climate_data(values)
+    columnar = data_set.to_columnar()
+    expected, result = data_set.to_pandas(), columnar.to_pandas()
+    assert list(result.columns) == list(expected.columns)
+    assert list(result.location) == list(expected.location)
+    np.testing.assert_array_equal(result.rainfall, expected.rainfall)
+    interpolated = columnar.interpolate(["rainfall"])
+    for location, data in data_set.interpolate(["rainfall"]).items():
+        np.testing.assert_allclose(interpolated[location].rainfall, data.rainfall)
+    np.testing.assert_array_equal(
+        interpolated.field_array("mean_temperature"), columnar.field_array("mean_temperature")
+    )
+
+
+def test_from_pandas_pads_to_covering_range():
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    df = data_set.to_pandas()
+    df = df[~((df.location == "oslo") & (df.time_period == df.time_period.iloc[0]))]
+    read = DataSet.from_pandas(df, ClimateData, fill_missing=True)
+    assert read.is_columnar
+    assert np.isnan(read["oslo"].rainfall[0])
+    np.testing.assert_array_equal(read["bergen"].rainfall, data_set["bergen"].rainfall)
+
+
+def test_samples_summaries():
+    period_range = PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 3))
+    samples = np.random.default_rng(0).normal(size=(2, 3, 50))
+    data_set = DataSet.from_columns(Samples, period_range, ["a", "b"], {"samples": samples})
+    summaries = data_set.summaries()
+    for location, samples in data_set.items():
+        expected = samples.summaries()
+        np.testing.assert_allclose(summaries[location].median, expected.median)
+        np.testing.assert_allclose(summaries[location].quantile_high, expected.quantile_high)
+
+
+def test_from_pandas_matches_per_location_parsing():
+    df = pd.DataFrame(
+        {
+            "location": ["b", "a", "b", "a", "a"],
+            "time_period": ["2020-02", "2020-01", "2020-03", "2020-02", "2020-04"],
+            "disease_cases": [1, 2, 3, 4, 5],
+        }
+    )
+    data_set = DataSet.from_pandas(df, HealthData, fill_missing=True)
+    assert list(data_set.keys()) == ["a", "b"]
+    assert list(data_set.period_range) == list(PeriodRange.from_strings(["2020-01", "2020-02", "2020-03", "2020-04"]))
+    np.testing.assert_array_equal(data_set["a"].disease_cases, [2, 4, np.nan, 5])
+    np.testing.assert_array_equal(data_set["b"].disease_cases, [np.nan, 1, 3, np.nan])
+    with pytest.raises(ValueError):
+        DataSet.from_pandas(df, HealthData)
+    with pytest.raises(ValueError):
+        DataSet.from_pandas(df.iloc[::-1], HealthData, fill_missing=True)
+
+
+def test_bulk_to_pandas_and_chunked_to_csv():
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    df = data_set.to_pandas()
+    assert isinstance(df.location.dtype, pd.CategoricalDtype)
+    expected = pd.concat(
+        [data_set._add_location_to_dataframe(data.to_pandas(), location) for location, data in data_set.items()]
+    )
+    pd.testing.assert_frame_equal(df.astype({"location": object}), expected)
+    with tempfile.TemporaryDirectory() as directory:
+        data_set.to_csv(f"{directory}/chunked.csv", chunk_size=3)
+        expected.to_csv(f"{directory}/expected.csv")
+        with open(f"{directory}/chunked.csv") as chunked, open(f"{directory}/expected.csv") as whole:
+            assert chunked.read() == whole.read()
+
+
+def test_parquet_roundtrip_with_filters(tmp_path):
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    data_set.to_parquet(tmp_path / "climate.parquet", row_group_size=5)
+    read = DataSet.from_file(tmp_path / "climate.parquet", ClimateData)
+    assert list(read.keys()) == ["bergen", "oslo"]
+    assert list(read.period_range) == list(data_set.period_range)
+    np.testing.assert_array_equal(read["oslo"].rainfall, data_set["oslo"].rainfall)
+    subset = DataSet.from_parquet(
+        tmp_path / "climate.parquet", ClimateData, locations=["oslo"], time_period=slice(Month(2020, 2), Month(2020, 3))
+    )
+    assert list(subset.keys()) == ["oslo"]
+    np.testing.assert_array_equal(subset["oslo"].rainfall, [1.0, 2.0])
+
+
+def test_parquet_row_groups_split_by_period(tmp_path):
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    data_set.to_parquet(tmp_path / "climate.parquet", row_group_size=4)
+    metadata = pq.ParquetFile(tmp_path / "climate.parquet").metadata
+    column = metadata.schema.names.index("period_start_day")
+    bounds = [
+        (metadata.row_group(i).column(column).statistics.min, metadata.row_group(i).column(column).statistics.max)
+        for i in range(metadata.num_row_groups)
+    ]
+    assert metadata.num_row_groups == 3
+    assert all(maximum < next_minimum for (_, maximum), (next_minimum, _) in zip(bounds, bounds[1:]))
+
+
+def test_parquet_time_filter_with_csv_period_strings(tmp_path):
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    df = data_set.to_pandas()
+    df["time_period"] = df["time_period"].astype(str)
+    assert df["time_period"].iloc[0] == "2020-01"
+    df.to_parquet(tmp_path / "climate.parquet")
+    subset = DataSet.from_parquet(
+        tmp_path / "climate.parquet", ClimateData, time_period=slice(Month(2020, 2), Month(2020, 3))
+    )
+    assert list(subset.period_range) == [Month(2020, 2), Month(2020, 3)]
+    np.testing.assert_array_equal(subset["bergen"].rainfall, [6.0, 7.0])
+
+
+def test_samples_parquet_roundtrip(tmp_path):
+    period_range = PeriodRange.from_time_periods(Week(2020, 1), Week(2020, 4))
+    samples = np.random.default_rng(0).normal(size=(2, 4, 100))
+    data_set = DataSet.from_columns(Samples, period_range, ["a", "b"], {"samples": samples})
+    data_set.to_file(tmp_path / "samples.parquet")
+    read = DataSet.from_file(tmp_path / "samples.parquet", Samples)
+    assert list(read.period_range) == list(period_range)
+    np.testing.assert_array_equal(read["b"].samples, samples[1])
+
+
+def test_memory_mapped_store(tmp_path):
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    data_set.to_store(tmp_path / "store")
+    opened = DataSet.open_store(tmp_path / "store")
+    rainfall = opened.field_array("rainfall")
+    assert isinstance(rainfall, np.memmap)
+    assert list(opened.keys()) == ["oslo", "bergen"]
+    restricted = opened.restrict_time_period(slice(Month(2020, 2), Month(2020, 3))).get_locations(["bergen"])
+    assert np.shares_memory(restricted.field_array("rainfall"), rainfall)
+    np.testing.assert_array_equal(restricted["bergen"].rainfall, [6.0, 7.0])
+    np.testing.assert_array_equal(opened["oslo"].max_temperature, data_set["oslo"].max_temperature)
+
+
+def test_store_overwrite_replaces_whole_store(tmp_path):
+    _two_location_climate_data(np.arange(10.0).reshape(2, 5)).to_store(tmp_path / "store")
+    period_range = PeriodRange.from_time_periods(Week(2020, 1), Week(2020, 3))
+    samples = np.arange(12.0).reshape(1, 3, 4)
+    DataSet.from_columns(Samples, period_range, ["a"], {"samples": samples}).to_store(tmp_path / "store")
+    opened = DataSet.open_store(tmp_path / "store")
+    assert list(opened.keys()) == ["a"]
+    assert list(opened.period_range) == list(period_range)
+    np.testing.assert_array_equal(opened["a"].samples, samples[0])
+    assert sorted(path.name for path in (tmp_path / "store").iterdir()) == ["header.json", "samples.npy"]
+    assert [path.name for path in tmp_path.iterdir()] == ["store"]
+
+
+def test_store_header_of_empty_period_range():
+    period_range = PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 5))[:0]
+    columns = DataSet.from_columns(Samples, period_range, ["a"], {"samples": np.zeros((1, 0, 4))})
+    with pytest.raises(ValueError):
+        make_header(columns.to_columnar()._columns)
+
+
+def test_chunked_from_csv(tmp_path):
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5))
+    df = data_set.to_pandas()
+    df = df[~((df.location == "oslo") & (df.time_period == df.time_period.iloc[0]))]
+    df.to_csv(tmp_path / "climate.csv")
+    expected = DataSet.from_csv(tmp_path / "climate.csv", ClimateData)
+    streamed = DataSet.from_csv(tmp_path / "climate.csv", ClimateData, chunk_size=3)
+    assert list(streamed.keys()) == list(expected.keys())
+    assert list(streamed.period_range) == list(expected.period_range)
+    np.testing.assert_array_equal(streamed.field_array("rainfall"), expected.field_array("rainfall"))
+    df.iloc[::-1].to_csv(tmp_path / "reversed.csv")
+    with pytest.raises(ValueError):
+        DataSet.from_csv(tmp_path / "reversed.csv", ClimateData, chunk_size=3)
+
+
+def test_compact_dtypes():
+    df = pd.DataFrame(
+        {
+            "location": ["a", "a", "a", "b", "b"],
+            "time_period": ["2020-01", "2020-02", "2020-03", "2020-01", "2020-02"],
+            "disease_cases": [1, 2, 3, 4, 5],
+        }
+    )
+    complete = DataSet.from_pandas(df.iloc[:3], HealthData, dtypes=COMPACT_DTYPES)
+    assert complete.field_array("disease_cases").dtype == np.int32
+    padded = DataSet.from_pandas(df, HealthData, dtypes=COMPACT_DTYPES)
+    assert padded.field_array("disease_cases").dtype == np.float32
+    assert np.isnan(padded["b"].disease_cases[-1])
+    assert padded.interpolate().field_array("disease_cases").dtype == np.float32
+    climate = _two_location_climate_data(np.arange(10.0).reshape(2, 5)).with_dtypes(COMPACT_DTYPES)
+    assert climate.field_array("rainfall").dtype == np.float32
+    np.testing.assert_array_equal(climate["bergen"].rainfall, np.arange(5.0, 10.0))
+    assert climate.with_dtypes(DEFAULT_DTYPES).field_array("rainfall").dtype == np.float64
+
+
+def test_pickle_and_bytes_roundtrip():
+    data_set = _two_location_climate_data(np.arange(10.0).reshape(2, 5)).to_columnar()
+    buffers = []
+    pickled = pickle.dumps(data_set, protocol=5, buffer_callback=buffers.append)
+    assert len(buffers) == 3
+    for read in (pickle.loads(pickled, buffers=buffers), DataSet.from_bytes(data_set.to_bytes())):
+        assert list(read.keys()) == ["oslo", "bergen"]
+        assert list(read.period_range) == list(data_set.period_range)
+        np.testing.assert_array_equal(read.field_array("rainfall"), data_set.field_array("rainfall"))
+    uneven = DataSet(
+        {
+            "a": HealthData(PeriodRange.from_strings(["2020-01", "2020-02"]), np.array([1, 2])),
+            "b": HealthData(PeriodRange.from_strings(["2020-02"]), np.array([3])),
+        }
+    )
+    read = pickle.loads(pickle.dumps(uneven, protocol=4))
+    assert list(read["b"].time_period) == list(uneven["b"].time_period)
+    np.testing.assert_array_equal(read["a"].disease_cases, [1, 2])
+
+
+def test_join_inner_and_outer():
+    climate = _two_location_climate_data(np.arange(10.0).reshape(2, 5)).to_columnar()
+    health = DataSet(
+        {
+            "oslo": HealthData(PeriodRange.from_time_periods(Month(2020, 4), Month(2020, 7)), np.array([1, 2, 3, 4])),
+            "trondheim": HealthData(PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 2)), np.array([5, 6])),
+        }
+    )
+    sources = {
+        "disease_cases": (health, "disease_cases"),
+        "rainfall": (climate, "rainfall"),
+        "mean_temperature": (climate, "mean_temperature"),
+    }
+    inner = DataSet.join(ClimateHealthTimeSeries, sources)
+    assert list(inner.keys()) == ["oslo"]
+    assert list(inner.period_range) == list(PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 7)))
+    np.testing.assert_array_equal(inner["oslo"].disease_cases, [np.nan] * 3 + [1, 2, 3, 4])
+    np.testing.assert_array_equal(inner["oslo"].rainfall, [0, 1, 2, 3, 4, np.nan, np.nan])
+    outer = DataSet.join(ClimateHealthTimeSeries, sources, how="outer")
+    assert list(outer.keys()) == ["oslo", "trondheim", "bergen"]
+    np.testing.assert_array_equal(outer["trondheim"].disease_cases, [5, 6] + [np.nan] * 5)
+    assert np.all(np.isnan(outer["trondheim"].rainfall))
+    complete = DataSet.join(
+        ClimateData, {name: (climate, name) for name in ("rainfall", "mean_temperature", "max_temperature")}
+    )
+    assert complete.field_array("rainfall").dtype == np.float64
+    np.testing.assert_array_equal(complete.field_array("max_temperature"), climate.field_array("max_temperature"))
+
+
+def test_ragged_mode():
+    df = pd.DataFrame(
+        {
+            "location": ["b", "b", "b", "a", "a"],
+            "time_period": ["2020-01", "2020-02", "2020-03", "2020-02", "2020-03"],
+            "disease_cases": [1, 2, 3, 4, 5],
+        }
+    )
+    data_set = DataSet.from_pandas(df, HealthData, ragged=True)
+    assert data_set.is_ragged and not data_set.is_columnar
+    assert data_set._ragged.fields["disease_cases"].shape == (5,)
+    assert list(data_set["a"].time_period) == list(PeriodRange.from_strings(["2020-02", "2020-03"]))
+    np.testing.assert_array_equal(data_set["b"].disease_cases, [1, 2, 3])
+    per_location = DataSet(dict(data_set.items()))
+    ragged_frame = data_set.to_pandas().astype({"location": object})
+    pd.testing.assert_frame_equal(ragged_frame, per_location.to_pandas())
+    restricted = data_set.restrict_time_period(slice(None, Month(2020, 2)))
+    assert restricted.is_ragged
+    np.testing.assert_array_equal(restricted["a"].disease_cases, [4])
+    np.testing.assert_array_equal(restricted["b"].disease_cases, [1, 2])
+    np.testing.assert_array_equal(data_set.field_array("disease_cases"), [[np.nan, 4, 5], [1, 2, 3]])
+    np.testing.assert_array_equal(data_set.get_locations(["b"]).to_pandas().disease_cases, [1, 2, 3])
+    np.testing.assert_array_equal(per_location.to_ragged().to_pandas().disease_cases, [4, 5, 1, 2, 3])
+
+
+def test_ragged_period_range_and_pickle():
+    df = pd.DataFrame(
+        {
+            "location": ["a", "a", "b", "b", "b"],
+            "time_period": ["2001-01", "2001-02", "2001-02", "2001-03", "2001-04"],
+            "disease_cases": [1, 2, 3, 4, 5],
+        }
+    )
+    data_set = DataSet.from_pandas(df, HealthData, ragged=True)
+    assert list(data_set.period_range) == list(PeriodRange.from_time_periods(Month(2001, 1), Month(2001, 4)))
+    for protocol in (4, 5):
+        read = pickle.loads(pickle.dumps(data_set, protocol=protocol))
+        assert read.is_ragged
+        assert list(read.period_range) == list(data_set.period_range)
+        assert list(read["b"].time_period) == list(data_set["b"].time_period)
+        np.testing.assert_array_equal(read["a"].disease_cases, [1, 2])
+        np.testing.assert_array_equal(read["b"].disease_cases, [3, 4, 5])
@@ -0,0 +1,23 @@
+import importlib.util
+import json
+from pathlib import Path
+
+BENCHMARK_SCRIPT = Path(__file__).parents[2] / "scripts" / "bench_time_period.py"
+
+
+def _load_benchmarks():
+    spec = importlib.util.spec_from_file_location("bench_time_period", BENCHMARK_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmarks_run_and_report_json(tmp_path):
+    main = _load_benchmarks().main
+    output = tmp_path / "results.json"
+    main(["--sizes", "10", "--repeat", "1", "--n-scalar", "5", "--output", str(output)])
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert {result["frequency"] for result in results} == {"day", "week", "month", "year"}
+    assert all(result["n_periods"] == 10 and result["seconds"] >= 0 for result in results)
+    main(["--sizes", "10", "--repeat", "1", "--frequencies", "month", "--compare", str(output)])
@@ -1,19 +1,27 @@
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import numpy as np
 import pandas as pd
 import pytest
+from dateutil.relativedelta import relativedelta
 
+from chap_core.time_period import date_util_wrapper
 from chap_core.time_period.date_util_wrapper import (
     TimePeriod,
     TimeStamp,
     delta_month,
     PeriodRange,
     delta_year,
+    delta_day,
+    delta_week,
     Month,
     Day,
     Year,
     Week,
+    GapReport,
 )
 
 
@@ -205,6 +213,30 @@ def test_from_pandas_inconsecutive(period_range):
         period_range = PeriodRange.from_pandas(series)
 
 
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (Month(2019, 11), Month(2021, 2)),
+        (Week(2019, 50), Week(2021, 3)),
+        (Day(2020, 2, 20), Day(2020, 3, 5)),
+        (Year(2018), Year(2022)),
+    ],
+)
+def test_pandas_roundtrip(start, end):
+    period_range = PeriodRange.from_time_periods(start, end)
+    series = period_range.topandas()
+    assert list(series) == [period.topandas() for period in period_range]
+    assert list(PeriodRange.from_pandas(series)) == list(period_range)
+    assert list(PeriodRange.from_pandas(period_range.to_period_index())) == list(period_range)
+    assert TimePeriod.from_pandas(series[0]) == start
+
+
+def test_from_pandas_week_anchors():
+    period_range = PeriodRange.from_pandas(pd.period_range("2020-01-06", periods=3, freq="W-SUN"))
+    assert period_range[0] == Week(2020, 2)
+    assert PeriodRange.from_pandas([Week(2020, 2).topandas(), Week(2020, 3).topandas()])[1] == Week(2020, 3)
+
+
 @pytest.mark.parametrize(
     "periods, missing",
     [
@@ -240,3 +272,158 @@ def test_from_start_and_n_periods():
     period_range = PeriodRange.from_start_and_n_periods(start_period, n_periods)
     assert len(period_range) == n_periods
     assert period_range[0] == TimePeriod.from_pandas(start_period)
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (Month(2019, 11), Month(2021, 2)),
+        (Week(2019, 50), Week(2021, 3)),
+        (Day(2020, 2, 20), Day(2020, 3, 5)),
+        (Year(2018), Year(2022)),
+    ],
+)
+def test_vectorized_calendar_fields(start, end):
+    period_range = PeriodRange.from_time_periods(start, end)
+    periods = list(period_range)
+    assert periods[0] == start
+    assert periods[-1] == end
+    assert np.all(period_range.year == [p.start_timestamp.year for p in periods])
+    assert np.all(period_range.month == [p.start_timestamp.month for p in periods])
+    assert np.all(period_range.week == [p.start_timestamp.week for p in periods])
+
+
+def test_period_range_ordinals(period_range):
+    assert np.all(np.diff(period_range.ordinals) == 1)
+    assert period_range.ordinals[0] == (2020 - 1970) * 12
+    weeks = PeriodRange.from_time_periods(Week(2020, 1), Week(2020, 3))
+    assert np.all(np.diff(weeks.ordinals) == 7)
+
+
+def test_period_range_compare_with_timestamp(period_range, edge_timestamps):
+    for timestamp in edge_timestamps:
+        periods = list(period_range)
+        assert np.all((period_range <= timestamp) == [p <= timestamp for p in periods])
+        assert np.all((period_range < timestamp) == [p < timestamp for p in periods])
+        assert np.all((period_range >= timestamp) == [p >= timestamp for p in periods])
+        assert np.all((period_range > timestamp) == [p > timestamp for p in periods])
+
+
+def test_period_range_compare_other_frequency(period_range):
+    assert not np.any(period_range == Year(2020))
+    assert np.all(period_range != Year(2020))
+    assert np.all((period_range <= Year(2020)) == (period_range.year <= 2020))
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        ("2020-01-31", "2020-02-29"),
+        ("2020-01-31", "2020-03-01"),
+        ("2021-03-15", "2020-01-20"),
+        ("2019-12-30", "2023-05-02"),
+    ],
+)
+def test_timestamp_difference(start, end):
+    start, end = TimeStamp.parse(start), TimeStamp.parse(end)
+    difference = end - start
+    relative = relativedelta(end.date, start.date)
+    assert difference // delta_month == relative.years * 12 + relative.months
+    assert difference // delta_day == (end.date - start.date).days
+    assert delta_week.n_periods(start, end) == (end.date - start.date).days // 7
+    assert start + difference == end
+
+
+def test_timestamp_arithmetic():
+    timestamp = TimeStamp.parse("2020-01-31")
+    assert timestamp + delta_month == TimeStamp.parse("2020-02-29")
+    assert timestamp - delta_year == TimeStamp.parse("2019-01-31")
+    assert (timestamp.year, timestamp.month, timestamp.day) == (2020, 1, 31)
+    assert TimeStamp.parse("2019-12-31") < timestamp <= TimeStamp.parse("2020-01-31")
+
+
+@pytest.mark.parametrize(
+    "make_period",
+    [lambda: Month(2020, 3), lambda: Week(2023, 2), lambda: Day(2020, 2, 29), lambda: Year(2021)],
+)
+def test_periods_are_interned(make_period):
+    period = make_period()
+    assert make_period() is period
+    assert pickle.loads(pickle.dumps(period)) is period
+    assert {period: 1}[make_period()] == 1
+    assert len({period, make_period(), period + period.time_delta}) == 2
+
+
+def test_periods_are_interned_across_threads(monkeypatch):
+    monkeypatch.setattr(date_util_wrapper, "_PERIOD_CACHE_SIZE", 64)
+    monkeypatch.setattr(date_util_wrapper, "_period_cache", OrderedDict())
+    with ThreadPoolExecutor(8) as executor:
+        batches = list(executor.map(lambda _: [Day(2020, 1, 1) + i * delta_day for i in range(200)], range(8)))
+    assert len(date_util_wrapper._period_cache) <= 64
+    assert all(period == expected for batch in batches for period, expected in zip(batch, batches[0]))
+    assert Day(2020, 1, 1) is Day(2020, 1, 1)
+
+
+def test_period_is_immutable(period1):
+    with pytest.raises(AttributeError):
+        period1.year = 2021
+    assert not hasattr(period1, "__dict__")
+
+
+def test_period_construction_is_normalized():
+    assert Month(datetime(2020, 1, 15)) is Month(2020, 1)
+    assert Month(TimeStamp.parse("2020-01-15")) == Month(2020, 1)
+    assert Week(datetime(2023, 1, 9)) is Week(2023, 2)
+
+
+def test_gap_report():
+    report = GapReport.from_ordinals(np.array([0, 1, 1, 4, 3]))
+    assert list(report.duplicates) == [2]
+    assert list(report.out_of_order) == [4]
+    assert not report.is_consecutive
+    report = GapReport.from_ordinals(np.array([0, 7, 28]), step=7)
+    assert report.n_periods == 5
+    assert list(report.missing) == [2, 3]
+    assert "2 missing (2, 3)" in str(report)
+
+
+@pytest.mark.parametrize("periods", [["2020-01", "2020-01", "2020-02"], ["2020-02", "2020-01"]])
+def test_from_strings_unsorted(periods):
+    with pytest.raises(ValueError):
+        PeriodRange.from_strings(periods, fill_missing=True)
+
+
+def test_from_period_list_fill_missing_large():
+    periods = list(PeriodRange.from_time_periods(Day(2000, 1, 1), Day(2010, 12, 31)))
+    kept = periods[:100] + periods[200:]
+    period_range, missing = PeriodRange.from_period_list(True, kept)
+    assert len(period_range) == len(periods)
+    assert list(missing) == list(range(100, 200))
+
+
+def test_period_range_set_operations():
+    first = PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 12))
+    second = PeriodRange.from_time_periods(Month(2020, 6), Month(2021, 3))
+    later = PeriodRange.from_time_periods(Month(2022, 1), Month(2022, 3))
+    assert list(first.intersection(second)) == list(PeriodRange.from_time_periods(Month(2020, 6), Month(2020, 12)))
+    assert list(first.union(second)) == list(PeriodRange.from_time_periods(Month(2020, 1), Month(2021, 3)))
+    assert list(first.difference(second)) == list(PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 5)))
+    assert list(second.difference(first)) == list(PeriodRange.from_time_periods(Month(2021, 1), Month(2021, 3)))
+    assert first.overlaps(second) and not first.overlaps(later)
+    assert len(first.intersection(later)) == 0
+    assert first.union(later, fill_gap=True)[-1] == Month(2022, 3)
+    with pytest.raises(ValueError):
+        first.union(later)
+    with pytest.raises(ValueError):
+        first.difference(first[2:4])
+
+
+def test_period_range_contains_and_index_of():
+    period_range = PeriodRange.from_time_periods(Week(2020, 1), Week(2020, 10))
+    assert period_range.contains(period_range[3:5])
+    assert Week(2020, 5) in period_range
+    assert Week(2020, 11) not in period_range
+    assert Month(2020, 1) not in period_range
+    assert period_range.index_of(Week(2020, 5)) == 4
+    with pytest.raises(ValueError):
+        period_range.index_of(Week(2021, 1))
@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from chap_core.time_period import PeriodRange, Week
+from chap_core.time_period.iso_week import IsoWeekTable
+
+EPOCH = date(1970, 1, 1)
+
+
+@pytest.fixture
+def table():
+    return IsoWeekTable(1990, 2040)
+
+
+def test_year_and_week(table):
+    days = np.arange(7400, 25000)
+    years, weeks = table.year_and_week(days)
+    expected = [(EPOCH + timedelta(days=int(day))).isocalendar()[:2] for day in days]
+    assert list(zip(years.tolist(), weeks.tolist())) == expected
+    assert table.year_and_week_of_day(int(days[100])) == expected[100]
+
+
+@pytest.mark.parametrize("year, week", [(2015, 53), (2020, 53), (2021, 1), (2024, 52)])
+def test_week_start_days(table, year, week):
+    monday = date.fromisocalendar(year, week, 1)
+    assert table.week_start_day(year, week) == (monday - EPOCH).days
+    assert table.week_start_days(np.array([year]), np.array([week]))[0] == (monday - EPOCH).days
+
+
+@pytest.mark.parametrize("year, week", [(2021, 53), (2020, 0), (1980, 1)])
+def test_invalid_week(table, year, week):
+    with pytest.raises(ValueError):
+        table.week_start_day(year, week)
+    with pytest.raises(ValueError):
+        table.week_start_days(np.array([year]), np.array([week]))
+
+
+def test_weekly_period_range_week():
+    period_range = PeriodRange.from_time_periods(Week(2019, 50), Week(2021, 2))
+    assert list(period_range.week) == [period.week for period in period_range]
+    assert list(period_range.week[:5]) == [50, 51, 52, 1, 2]
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from chap_core.time_period import PeriodRange
+from chap_core.time_period.date_util_wrapper import TimePeriod, Month, Week, Day, Year
+from chap_core.time_period.period_parsing import parse_period_strings
+
+
+@pytest.mark.parametrize(
+    "period_strings, period_class",
+    [
+        (["2020", "2021", "2022"], Year),
+        (["2020-11", "2020-12", "2021-01"], Month),
+        (["2020-1", "2020-2", "2020-3"], Month),
+        (["2020W52", "2020W53", "2021W01"], Week),
+        (["2020-02-28", "2020-02-29", "2020-03-01"], Day),
+        (["2019-12-30/2020-01-05", "2020-01-06/2020-01-12"], Week),
+    ],
+)
+def test_parse_period_strings(period_strings, period_class):
+    parsed_class, ordinals = parse_period_strings(period_strings)
+    assert parsed_class is period_class
+    assert list(ordinals) == [TimePeriod.parse(s)._ordinal for s in period_strings]
+
+
+@pytest.mark.parametrize(
+    "ids, period_class",
+    [
+        (["202011", "202012", "202101"], Month),
+        (["2020W52", "2020W53", "2021W01"], Week),
+        (["20200228", "20200229", "20200301"], Day),
+    ],
+)
+def test_parse_period_ids(ids, period_class):
+    parsed_class, ordinals = parse_period_strings(ids)
+    assert parsed_class is period_class
+    assert list(ordinals) == [TimePeriod.from_id(id)._ordinal for id in ids]
+
+
+def test_parse_repeated_strings():
+    strings = ["2020-01", "2020-02", "2020-03"] * 1000
+    _, ordinals = parse_period_strings(strings)
+    assert len(ordinals) == len(strings)
+    assert np.all(ordinals[::3] == ordinals[0])
+
+
+@pytest.mark.parametrize("period_strings", [["2020-13"], ["2020W54"], ["2021-02-29"], ["2020-01-01/2020-01-09"]])
+def test_parse_invalid_strings(period_strings):
+    with pytest.raises(ValueError):
+        parse_period_strings(period_strings)
+
+
+def test_from_ids():
+    period_range = PeriodRange.from_ids(["2020W51", "2020W52", "2020W53", "2021W01"])
+    assert len(period_range) == 4
+    assert period_range[0] == Week(2020, 51)
+    assert period_range[-1] == Week(2021, 1)
+
+
+def test_from_strings_inconsecutive():
+    with pytest.raises(ValueError):
+        PeriodRange.from_strings(["2020-01", "2020-03"])
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from chap_core.time_period import Day, Month, PeriodRange, Week, Year
+from chap_core.time_period.resampling import reduce_segments, segment_starts
+
+
+def test_segment_starts_day_to_month():
+    period_range = PeriodRange.from_time_periods(Day(2020, 1, 30), Day(2020, 3, 1))
+    target_range, starts = segment_starts(period_range, Month)
+    assert list(target_range) == [Month(2020, 1), Month(2020, 2), Month(2020, 3)]
+    assert_array_equal(starts, [0, 2, 31])
+
+
+def test_weeks_are_resampled_to_their_iso_year():
+    period_range = PeriodRange.from_time_periods(Week(2019, 51), Week(2020, 2))
+    target_range, starts = segment_starts(period_range, "year")
+    assert list(target_range) == [Year(2019), Year(2020)]
+    assert_array_equal(starts, [0, 2])
+
+
+def test_resample_to_finer_period_type_fails():
+    with pytest.raises(ValueError):
+        segment_starts(PeriodRange.from_time_periods(Month(2020, 1), Month(2020, 3)), Day)
+
+
+@pytest.mark.parametrize(
+    "reducer, expected",
+    [
+        ("sum", [3.0, 12.0, np.nan]),
+        ("mean", [1.5, 4.0, np.nan]),
+        ("max", [2.0, 5.0, np.nan]),
+        ("min", [1.0, 3.0, np.nan]),
+    ],
+)
+def test_reduce_segments_skips_missing(reducer, expected):
+    values = np.array([[1.0, 2.0, 3.0, np.nan, 4.0, 5.0, np.nan]])
+    reduced = reduce_segments(values, np.array([0, 2, 6]), reducer)
+    assert_array_equal(reduced, [expected])